@@ -0,0 +1,51 @@
+"""add planting_grids table
+
+Revision ID: 3b7e2c9d41f6
+Revises: 65bddf16ae44
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from geoalchemy2 import Geometry
+from sqlalchemy.dialects import postgresql
+
+revision: str = "3b7e2c9d41f6"
+down_revision: Union[str, Sequence[str], None] = "65bddf16ae44"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "planting_grids",
+        sa.Column(
+            "farm_id",
+            sa.Integer(),
+            sa.ForeignKey("farms.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("point_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "geometry",
+            Geometry(geometry_type="MULTIPOINT", srid=4326, spatial_index=False),
+            nullable=False,
+        ),
+        sa.Column("slopes", postgresql.ARRAY(sa.REAL()), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+
+    op.create_index(
+        "idx_planting_grids_geom",
+        "planting_grids",
+        ["geometry"],
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_planting_grids_geom")
+    op.drop_table("planting_grids")
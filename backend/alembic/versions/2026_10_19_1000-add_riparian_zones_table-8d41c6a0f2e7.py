@@ -0,0 +1,57 @@
+"""add riparian_zones table
+
+Revision ID: 8d41c6a0f2e7
+Revises: 3b7e2c9d41f6
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from geoalchemy2 import Geometry
+
+revision: str = "8d41c6a0f2e7"
+down_revision: Union[str, Sequence[str], None] = "3b7e2c9d41f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "riparian_zones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "waterway_id",
+            sa.Integer(),
+            sa.ForeignKey("waterways.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column(
+            "geometry",
+            Geometry(geometry_type="MULTIPOLYGON", srid=32751, spatial_index=False),
+            nullable=False,
+        ),
+    )
+
+    op.create_index(
+        "idx_riparian_zones_geom",
+        "riparian_zones",
+        ["geometry"],
+        postgresql_using="gist",
+    )
+
+    # Populate from the waterways already imported (UTM 51S, 15 m buffer - CRS_ANALYSIS / RIPARIAN_BUFFER_M)
+    op.execute(
+        """
+        INSERT INTO riparian_zones (waterway_id, geometry)
+        SELECT w.id, ST_Multi(ST_Subdivide(ST_Buffer(ST_Transform(w.geometry, 32751), 15.0)))
+        FROM waterways w
+        """
+    )
+    op.execute("ANALYZE riparian_zones")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_riparian_zones_geom")
+    op.drop_table("riparian_zones")
@@ -0,0 +1,28 @@
+"""add spatial index on boundary geometry
+
+Revision ID: c5f17e93ab20
+Revises: 8d41c6a0f2e7
+Create Date: 2026-10-19 11:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "c5f17e93ab20"
+down_revision: Union[str, Sequence[str], None] = "8d41c6a0f2e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_boundary_geom",
+        "boundary",
+        ["boundary"],
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_boundary_geom")
@@ -159,6 +159,11 @@ class MixedWorkloadUser(HttpUser):
         """All-farms JSON report - bulk DB read."""
         self.client.get("/reports/farms", headers=self.headers)
 
+    @task(1)
+    def stream_all_farms_report(self):
+        """All-farms JSON report streamed from a server-side cursor - compare with the buffered list."""
+        self.client.get("/reports/farms/stream", headers=self.headers)
+
     @task(1)
     def get_users(self):
         """User list - admin read."""
@@ -6,6 +6,7 @@ from src.config import settings
 
 logger = logging.getLogger(__name__)
 _redis: Redis | None = None
+_redis_bytes: Redis | None = None
 
 
 def get_redis() -> Redis | None:
@@ -15,6 +16,14 @@ def get_redis() -> Redis | None:
     return _redis
 
 
+def get_redis_bytes() -> Redis | None:
+    """Client without response decoding, for binary values such as vector tiles."""
+    global _redis_bytes
+    if _redis_bytes is None and settings.REDIS_URL:
+        _redis_bytes = from_url(settings.REDIS_URL)
+    return _redis_bytes
+
+
 async def get(key: str) -> str | None:
     redis = get_redis()
     if not redis:
@@ -26,6 +35,18 @@ async def get(key: str) -> str | None:
         return None
 
 
+async def get_many(keys: list[str]) -> list[str | None]:
+    """Values of many keys in one round trip (MGET), None for misses."""
+    redis = get_redis()
+    if not redis or not keys:
+        return [None] * len(keys)
+    try:
+        return await redis.mget(keys)
+    except Exception as e:
+        logger.warning("Redis mget failed for %d keys: %s", len(keys), e)
+        return [None] * len(keys)
+
+
 async def set(key: str, value: str, ttl: int = 3600) -> None:
     redis = get_redis()
     if not redis:
@@ -44,3 +65,24 @@ async def invalidate(*keys: str) -> None:
         await redis.delete(*keys)
     except Exception as e:
         logger.warning("Redis invalidate failed for keys %s: %s", keys, e)
+
+
+async def get_bytes(key: str) -> bytes | None:
+    redis = get_redis_bytes()
+    if not redis:
+        return None
+    try:
+        return await redis.get(key)
+    except Exception as e:
+        logger.warning("Redis get failed for key %s: %s", key, e)
+        return None
+
+
+async def set_bytes(key: str, value: bytes, ttl: int = 3600) -> None:
+    redis = get_redis_bytes()
+    if not redis:
+        return
+    try:
+        await redis.set(key, value, ex=ttl)
+    except Exception as e:
+        logger.warning("Redis set failed for key %s: %s", key, e)
@@ -27,6 +27,33 @@ class Settings(BaseSettings):
     TESTING: bool = False
     REDIS_URL: str = Field(default="")
 
+    # DEM source for sapling estimation: "database" queries dem_table, "local" reads a tiled GeoTIFF/.npy memmap
+    DEM_SOURCE: str = Field(default="database")
+    DEM_PATH: str = Field(default="")  # Empty uses gis/sapling_estimation/data/DEM.tif
+    SLOPE_PATH: str = Field(default="")  # Empty uses gis/sapling_estimation/data/slope.tif when it has been built
+    DEM_TILE_CACHE_SIZE: int = Field(default=64)
+    # In-process cache of per-farm terrain and planting layouts reused across spacing/max_slope variants
+    SAPLING_CACHE_MAX_FARMS: int = Field(default=128)
+    SAPLING_CACHE_MAX_LAYOUTS: int = Field(default=8)
+    SAPLING_TERRAIN_CHECK_SECONDS: float = Field(default=60.0)  # How often cached terrain is checked against a DEM re-import
+    # Metric CRS the planting grid is laid out in: "EPSG:3857", a UTM zone such as "EPSG:32751" (CRS_ANALYSIS), or "utm" for each farm's zone
+    SAPLING_WORKING_CRS: str = Field(default="EPSG:3857")
+    # Planting grid storage: "rows" writes one planting_estimates row per point, "packed" one planting_grids row per farm
+    PLANTING_GRID_STORAGE: str = Field(default="rows")
+    # Environmental profile extraction: one combined GEE request, or one request per dataset in parallel
+    # (concurrent), where a failed or slow dataset falls back to the stored farm value
+    PROFILE_CONCURRENT_EXTRACTION: bool = Field(default=False)
+    PROFILE_EXTRACTION_TIMEOUT: float = Field(default=30.0)  # Seconds before the stored farm values are used
+    # Soil pH/texture point lookups: "database" queries PostGIS per farm, "memory" uses in-process STRtrees of the polygons
+    SOIL_LOOKUP_SOURCE: str = Field(default="database")
+    SOIL_INDEX_REFRESH_SECONDS: float = Field(default=60.0)  # How often the in-memory index checks for a re-import
+    # Load the imputation model at startup instead of on the first request that needs it
+    IMPUTATION_WARM_UP: bool = Field(default=True)
+    # Also load it when src.main is imported, so workers forked by gunicorn --preload inherit one copy
+    IMPUTATION_PRELOAD: bool = Field(default=False)
+    # Farms fetched per round trip by the server-side cursor of GET /reports/farms/stream
+    REPORT_STREAM_BATCH_SIZE: int = Field(default=200)
+
     email_verification_expiry_minutes: int = 10
     password_reset_expiry_minutes: int = 10
     frontend_base_url: str = "http://localhost:3000"
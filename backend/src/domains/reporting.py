@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -67,3 +67,10 @@ class FarmReportContract(BaseModel):
             exclusions=[],
             generated_at=datetime.now(timezone.utc),
         )
+
+
+class FarmReportPage(BaseModel):
+    """One page of farm reports; pass next_cursor back as cursor for the next page."""
+
+    items: List[FarmReportContract]
+    next_cursor: Optional[str] = None
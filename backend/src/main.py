@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import time
@@ -8,11 +9,13 @@ from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError, ResponseValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from imputation import warm_up
 from pydantic import ValidationError
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
+from src.config import settings
 from src.dependencies import limiter
 from src.routers import (
     ahp,
@@ -27,6 +30,7 @@ from src.routers import (
     sapling_estimation,
     soil_texture,
     species,
+    tiles,
     user,
 )
 from src.services.epi_processing import EpiCSVError
@@ -42,10 +46,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"Failed to initialize GEE: {e}")
 
+    if settings.IMPUTATION_WARM_UP:
+        await asyncio.to_thread(_warm_up_imputation)
+
     yield
     print("Shutting down application...")
 
 
+def _warm_up_imputation():
+    try:
+        warm_up()
+        print("Imputation model loaded.")
+    except Exception as e:
+        print(f"Failed to load imputation model: {e}")
+
+
+# Under gunicorn --preload this runs in the master before workers fork, so they
+# share the loaded model copy-on-write instead of each loading their own
+if settings.IMPUTATION_PRELOAD:
+    _warm_up_imputation()
+
+
 app = FastAPI(
     title="Planting Optimisation Tool API",
     version="1.0.0",
@@ -85,6 +106,7 @@ app.include_router(batch_estimation.router)
 app.include_router(ahp.router)
 app.include_router(reporting.router)
 app.include_router(global_weights.router)
+app.include_router(tiles.router)
 
 
 @app.exception_handler(RequestValidationError)
@@ -11,7 +11,9 @@ from src.models.farm import Farm
 from src.models.global_weights import GlobalWeights, GlobalWeightsRun
 from src.models.parameters import Parameter
 from src.models.planting_estimates import PlantingEstimate
+from src.models.planting_grids import PlantingGrid
 from src.models.recommendations import Recommendation
+from src.models.riparian_zones import RiparianZone
 from src.models.soil_ph import SoilPH
 from src.models.soil_texture import SoilTexture
 from src.models.soil_texture_spatial import SoilTextureSpatial
@@ -35,6 +37,8 @@ __all__ = [
     "AuditLog",
     "AuthToken",
     "PlantingEstimate",
+    "PlantingGrid",
+    "RiparianZone",
     "SpeciesExclusionRule",
     "SpeciesDependency",
     "GlobalWeights",
@@ -1,5 +1,5 @@
 from geoalchemy2 import Geometry
-from sqlalchemy import ForeignKey, Integer
+from sqlalchemy import ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -24,5 +24,14 @@ class FarmBoundary(Base):
         lazy="select",
     )
 
+    # Spatial index for the bbox/polygon and nearest-farm queries
+    __table_args__ = (
+        Index(
+            "idx_boundary_geom",
+            "boundary",
+            postgresql_using="gist",
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"FarmBoundary(id={self.id!r}, boundary={self.boundary!r})"
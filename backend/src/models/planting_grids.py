@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from geoalchemy2 import Geometry
+from sqlalchemy import REAL, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from src.database import Base
+
+
+class PlantingGrid(Base):
+    """Compact planting grid: all planting points of a farm packed into one MultiPoint row.
+
+    slopes[i] is the slope at the i-th point of the MultiPoint.
+    """
+
+    __tablename__ = "planting_grids"
+
+    farm_id: Mapped[int] = mapped_column(
+        ForeignKey("farms.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    point_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    geometry: Mapped[str] = mapped_column(
+        Geometry(geometry_type="MULTIPOINT", srid=4326, spatial_index=False),
+        nullable=False,
+    )
+
+    slopes: Mapped[list[float]] = mapped_column(ARRAY(REAL), nullable=False)
+
+    # SHA-256 of the float32 coordinates and slopes, served as the grid ETag
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index(
+            "idx_planting_grids_geom",
+            "geometry",
+            postgresql_using="gist",
+        ),
+    )
+
+    def __repr__(self):
+        return f"PlantingGrid(farm_id={self.farm_id}, point_count={self.point_count})"
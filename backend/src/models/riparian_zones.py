@@ -0,0 +1,49 @@
+# Riparian zone table model
+# Precomputed riparian buffers around waterways, rebuilt by services.riparian.rebuild_riparian_zones
+from typing import Optional
+
+import geoalchemy2
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+from src.schemas.constants import CRS_ANALYSIS
+
+
+class RiparianZone(Base):
+    """One subdivided piece of a waterway's riparian buffer, in UTM Zone 51S (EPSG:32751).
+
+    Each waterway is buffered by RIPARIAN_BUFFER_M and split with ST_Subdivide, so
+    the GiST index holds many small bounding boxes instead of one per river.
+    """
+
+    __tablename__ = "riparian_zones"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    waterway_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("waterways.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+
+    geometry: Mapped[object] = mapped_column(
+        geoalchemy2.types.Geometry(
+            geometry_type="MULTIPOLYGON",
+            srid=CRS_ANALYSIS,
+            dimension=2,
+            spatial_index=False,
+            name="geometry",
+            nullable=False,
+        ),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index(
+            "idx_riparian_zones_geom",
+            "geometry",
+            postgresql_using="gist",
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"RiparianZone(id={self.id!r}, waterway_id={self.waterway_id!r})"
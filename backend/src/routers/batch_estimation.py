@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, Request
+import logging
+import os
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_db_session
+from src.database import AsyncSessionLocal, get_db_session
 from src.dependencies import get_user_id, limiter, require_role
-from src.schemas.batch_estimation import SaplingBatchEstimationRequest, SaplingBatchEstimationResponse
+from src.schemas.batch_estimation import (
+    SaplingBatchEstimationRequest,
+    SaplingBatchEstimationResponse,
+    SaplingRegionEstimationAccepted,
+    SaplingRegionEstimationRequest,
+)
 from src.schemas.user import Role, UserRead
+from src.services import region_estimation as region_estimation_service
 from src.services.batch_estimation import SaplingBatchEstimationService
 
 router = APIRouter(prefix="/sapling_estimation", tags=["Sapling Calculator"])
 
+logger = logging.getLogger(__name__)
+
 
 @router.post(
     "/batch_calculate",
@@ -50,3 +61,49 @@ async def get_batch_estimation(
         spacing_y=data.spacing_y,
         max_slope=data.max_slope,
     )
+
+
+async def _run_region_job(data: SaplingRegionEstimationRequest):
+    # Background jobs outlive the request session, so the job opens its own
+    async with AsyncSessionLocal() as session:
+        try:
+            await region_estimation_service.run_region_estimation_job(
+                session,
+                spacing_x=data.spacing_x,
+                spacing_y=data.spacing_y,
+                max_slope=data.max_slope,
+                farm_ids=data.farm_ids,
+                workers=data.workers,
+            )
+        except Exception:
+            logger.exception("Region estimation job failed")
+
+
+@router.post(
+    "/region_calculate",
+    response_model=SaplingRegionEstimationAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+@limiter.limit("1/minute", key_func=get_user_id)
+async def start_region_estimation(
+    request: Request,
+    data: SaplingRegionEstimationRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: UserRead = Depends(require_role(Role.ADMIN)),
+):
+    """- Starts a region-wide sapling estimation for all farms (or the given farm_ids) as a background job.
+
+    Farms are estimated in a process pool against the local DEM/slope raster and results are written in bulk.
+    Progress and the final throughput/timing summary are logged; use scripts/estimate_region.py for an interactive run.
+
+    Requires ADMIN.
+    """
+    terrain_path, _ = region_estimation_service.local_terrain_source()
+    if not os.path.exists(terrain_path):
+        raise HTTPException(status_code=409, detail="Region estimation needs a local DEM or slope raster; run scripts/import_dem.py first.")
+
+    farm_count = await region_estimation_service.count_region_farms(db, data.farm_ids)
+    background_tasks.add_task(_run_region_job, data)
+
+    return {"status": "accepted", "farm_count": farm_count}
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src import cache
 from src.database import get_db_session
 from src.dependencies import get_user_id, limiter, require_role
-from src.schemas.environmental_profile import FarmProfileResponse
+from src.schemas.environmental_profile import FarmProfileBatchRequest, FarmProfileBatchResponse, FarmProfileResponse
 from src.schemas.user import Role, UserRead
 from src.services import environmental_profile as environmental_profile_service
 from src.services import farm as farm_service
@@ -15,6 +15,60 @@ from src.services.environmental_profile import ImputationError
 router = APIRouter(prefix="/profile", tags=["Environmental Profile"])
 
 
+@router.post(
+    "/batch",
+    response_model=FarmProfileBatchResponse,
+    response_model_exclude_none=True,
+)
+@limiter.limit("10/minute", key_func=get_user_id)
+async def get_farm_profiles_batch(
+    request: Request,
+    data: FarmProfileBatchRequest,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: UserRead = Depends(require_role(Role.OFFICER)),
+):
+    """- Build environmental profiles for many farms in one request.
+
+    - **farm_ids**: IDs of the farms to profile (up to 1000)
+    - **Returns**: farm_count, results (one profile per farm, in request order) and
+     missing_farm_ids (not found, not accessible or without a boundary).
+
+    Cached profiles are reused; the rest share set-based PostGIS lookups, batched
+    Google Earth Engine extraction and one imputation pass.
+    Requires OFFICER role or higher.
+    """
+    if current_user.role == Role.OFFICER:
+        user_id_filter = current_user.id
+    else:
+        user_id_filter = None
+
+    farm_ids = list(dict.fromkeys(data.farm_ids))
+    farms = await farm_service.get_farm_by_id(db, farm_ids, user_id=user_id_filter)
+    accessible_ids = [farm_id for farm_id in farm_ids if farm_id in {farm.id for farm in farms}]
+
+    cached = await cache.get_many([f"profile:{farm_id}" for farm_id in accessible_ids])
+    profiles = {farm_id: json.loads(value) for farm_id, value in zip(accessible_ids, cached) if value}
+
+    service = environmental_profile_service.EnvironmentalProfileService()
+    uncached_ids = [farm_id for farm_id in accessible_ids if farm_id not in profiles]
+
+    try:
+        computed = await service.run_environmental_profiles(db, uncached_ids)
+    except ImputationError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+    for farm_id, profile_data in computed.items():
+        await cache.set(f"profile:{farm_id}", json.dumps(profile_data))
+    profiles.update(computed)
+
+    results = [profiles[farm_id] for farm_id in farm_ids if farm_id in profiles]
+    return {
+        "farm_count": len(results),
+        "results": results,
+        "missing_farm_ids": [farm_id for farm_id in farm_ids if farm_id not in profiles],
+    }
+
+
 @router.get(
     "/{farm_id}",
     response_model=FarmProfileResponse,
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database import get_db_session
 from src.dependencies import get_current_user, require_role
-from src.schemas.farm import FarmBoundaryResponse, FarmCreate, FarmRead, FarmUpdate
+from src.schemas.farm import FarmAreaQuery, FarmBoundaryResponse, FarmCreate, FarmLocationPage, FarmRead, FarmUpdate
 from src.schemas.user import Role, UserRead
 from src.services import farm as farm_service
 
@@ -31,6 +31,78 @@ async def create_farm(
     return await farm_service.create_farm_record(db=db, farm_data=farm_data, user_id=current_user.id)
 
 
+# Spatial queries are declared before /{farm_id} so their paths are not taken as a farm ID.
+@router.get("/bbox", response_model=FarmLocationPage)
+async def list_farms_in_bbox(
+    min_lon: float = Query(ge=-180, le=180),
+    min_lat: float = Query(ge=-90, le=90),
+    max_lon: float = Query(ge=-180, le=180),
+    max_lat: float = Query(ge=-90, le=90),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: UserRead = Depends(get_current_user),
+):
+    """Lists farms whose boundary intersects a WGS84 bounding box, ordered by ID.
+
+    Pass next_cursor back as cursor to fetch the next page.
+    OFFICER: only their own farms. SUPERVISOR / ADMIN: all farms.
+    """
+    if min_lon >= max_lon or min_lat >= max_lat:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bounding box minimums must be below the maximums.")
+
+    area = farm_service.bbox_envelope(min_lon, min_lat, max_lon, max_lat)
+    return await _farm_location_page(farm_service.list_farms_in_area(db, area, user_id=_owner_filter(current_user), limit=limit, cursor=cursor))
+
+
+@router.post("/within", response_model=FarmLocationPage)
+async def list_farms_within(
+    query: FarmAreaQuery,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: UserRead = Depends(get_current_user),
+):
+    """Lists farms whose boundary intersects a GeoJSON Polygon or MultiPolygon (WGS84), ordered by ID.
+
+    Pass next_cursor back as cursor to fetch the next page.
+    OFFICER: only their own farms. SUPERVISOR / ADMIN: all farms.
+    """
+    try:
+        area = farm_service.area_from_geojson(query.geometry)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    return await _farm_location_page(farm_service.list_farms_in_area(db, area, user_id=_owner_filter(current_user), limit=query.limit, cursor=query.cursor))
+
+
+@router.get("/nearest", response_model=FarmLocationPage)
+async def list_nearest_farms(
+    latitude: float = Query(ge=-90, le=90),
+    longitude: float = Query(ge=-180, le=180),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: UserRead = Depends(get_current_user),
+):
+    """Lists farms nearest to a point, closest boundary first, with distance_m in metres.
+
+    Pass next_cursor back as cursor to fetch the next page.
+    OFFICER: only their own farms. SUPERVISOR / ADMIN: all farms.
+    """
+    return await _farm_location_page(farm_service.list_nearest_farms(db, latitude, longitude, user_id=_owner_filter(current_user), limit=limit, cursor=cursor))
+
+
+def _owner_filter(current_user: UserRead) -> int | None:
+    return current_user.id if current_user.role == Role.OFFICER else None
+
+
+async def _farm_location_page(query) -> dict:
+    try:
+        farms, next_cursor = await query
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return {"items": farms, "next_cursor": next_cursor}
+
+
 # NOTE: When a farm boundary update endpoint is added, invalidate cached results for that farm:
 #   await cache.invalidate(f"profile:{farm_id}", f"sapling:{farm_id}", f"rec:{farm_id}")
 
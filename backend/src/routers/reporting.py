@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
 from src.database import get_db_session
 from src.dependencies import get_user_id, limiter, require_role
-from src.domains.reporting import FarmReportContract
+from src.domains.reporting import FarmReportContract, FarmReportPage
 from src.schemas.user import Role, UserRead
 from src.services import reporting as reporting_service
 from src.services import reporting_export
@@ -50,6 +51,52 @@ async def get_all_farms_report(
     return await reporting_service.get_all_farms_report(db, user_id=user_id_filter)
 
 
+@router.get("/farms/page", response_model=FarmReportPage)
+@limiter.limit("10/minute", key_func=get_user_id)
+async def get_farms_report_page(
+    request: Request,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    current_user: UserRead = Depends(require_role(Role.SUPERVISOR)),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Returns farm reports one page at a time, ordered by farm ID.
+    Pass next_cursor back as cursor to fetch the next page. Supervisors see only their own farms.
+    """
+    user_id_filter = None if current_user.role == Role.ADMIN else current_user.id
+    try:
+        reports, next_cursor = await reporting_service.get_farms_report_page(db, user_id=user_id_filter, limit=limit, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return {"items": reports, "next_cursor": next_cursor}
+
+
+@router.get("/farms/stream")
+@limiter.limit("10/minute", key_func=get_user_id)
+async def stream_all_farms_report(
+    request: Request,
+    current_user: UserRead = Depends(require_role(Role.SUPERVISOR)),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Streams the same JSON list as GET /reports/farms, serialising each report as it is read.
+    Supervisors see only their own farms. Admins see all farms.
+    """
+    user_id_filter = None if current_user.role == Role.ADMIN else current_user.id
+    reports = reporting_service.stream_farms_report(db, user_id=user_id_filter, batch_size=settings.REPORT_STREAM_BATCH_SIZE)
+
+    return StreamingResponse(_json_array(reports), media_type="application/json")
+
+
+async def _json_array(reports):
+    yield "["
+    separator = ""
+    async for report in reports:
+        yield separator + report.model_dump_json()
+        separator = ","
+    yield "]"
+
+
 @router.get("/farms/export/docx")
 @limiter.limit("10/minute", key_func=get_user_id)
 async def export_all_farms_report_docx(
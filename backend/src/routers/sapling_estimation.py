@@ -1,6 +1,7 @@
+import asyncio
 import json
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src import cache
@@ -33,6 +34,8 @@ async def get_sapling_estimation(
     - spacing_x: horizontal spacing between saplings
     - spacing_y: vertical spacing between saplings
     - max_slope: maximum allowed slope
+    - lattice: planting pattern (rectangular, staggered, triangular or hexagonal; default rectangular).
+      triangular and hexagonal are the same equilateral layout, ~15% more trees than a square grid
 
     Returns:
     - pre_slope_count
@@ -50,18 +53,22 @@ async def get_sapling_estimation(
     spacing_x = data.spacing_x
     spacing_y = data.spacing_y
     max_slope = data.max_slope
+    lattice = data.lattice
 
     farms = await farm_service.get_farm_by_id(db, [farm_id], user_id=user_id_filter)
     if not farms:
         raise HTTPException(status_code=404, detail=f"Farm with ID {farm_id} not found.")
 
+    # Rectangular keeps the original key so it stays shared with the batch and region jobs
     cache_key = f"sapling:{farm_id}:{spacing_x}:{spacing_y}:{max_slope}"
+    if lattice != "rectangular":
+        cache_key += f":{lattice}"
     cached = await cache.get(cache_key)
     if cached:
         return SaplingEstimationResponse(**json.loads(cached))
 
     service = sapling_estimation_service.SaplingEstimationService()
-    estimation_data = await service.run_estimation(db, farm_id, spacing_x=spacing_x, spacing_y=spacing_y, max_slope=max_slope)
+    estimation_data = await service.run_estimation(db, farm_id, spacing_x=spacing_x, spacing_y=spacing_y, max_slope=max_slope, lattice=lattice)
 
     if not estimation_data:
         raise HTTPException(status_code=404, detail=f"Farm boundary not found for farm_id: {farm_id}")
@@ -70,7 +77,53 @@ async def get_sapling_estimation(
     return estimation_data
 
 
-@router.get("/{farm_id}/grid", response_model=PlantingGridResponse)
+# Media types the planting grid can be served as, mapped to the service encoder format
+GRID_MEDIA_TYPES = {
+    "application/json": "geojson",
+    "application/geo+json": "geojson",
+    "application/flatgeobuf": "flatgeobuf",
+    "application/vnd.apache.arrow.stream": "arrow",
+}
+
+
+def negotiate_grid_media_type(accept: str | None) -> str | None:
+    """Picks the planting grid media type from an Accept header, or None if none is acceptable."""
+    if not accept:
+        return "application/json"
+
+    candidates = []
+    for position, entry in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in entry.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, media_type.lower()))
+
+    for _, _, media_type in sorted(candidates):
+        if media_type in ("*/*", "application/*"):
+            return "application/json"
+        if media_type == "application/vnd.apache.arrow.stream" and sapling_estimation_service.pa is None:
+            continue
+        if media_type in GRID_MEDIA_TYPES:
+            return media_type
+
+    return None
+
+
+@router.get(
+    "/{farm_id}/grid",
+    response_model=PlantingGridResponse,
+    responses={
+        200: {"content": {"application/flatgeobuf": {}, "application/vnd.apache.arrow.stream": {}}},
+        304: {"description": "Packed grid unchanged since the ETag sent in If-None-Match"},
+        406: {"description": "No acceptable grid format"},
+    },
+)
 @limiter.limit("10/minute", key_func=get_user_id)
 async def get_planting_grid(
     request: Request,
@@ -85,8 +138,34 @@ async def get_planting_grid(
     implementation.
     Officers are not directly associated with farms as owners in the current implementation.
     Restrict to owned farms once the RBAC implementation is complete.
+
+    The format follows the Accept header: GeoJSON (default), FlatGeobuf (application/flatgeobuf)
+    or a GeoArrow IPC stream (application/vnd.apache.arrow.stream, requires pyarrow).
+
+    Packed grids (PLANTING_GRID_STORAGE=packed) are served with their content hash as ETag,
+    and a matching If-None-Match returns 304 without transferring the grid.
     """
-    grid = await sapling_estimation_service.get_planting_grid(db, farm_id)
-    if not grid["features"]:
+    media_type = negotiate_grid_media_type(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(status_code=406, detail=f"Supported grid formats: {', '.join(GRID_MEDIA_TYPES)}")
+    grid_format = GRID_MEDIA_TYPES[media_type]
+
+    headers = {"Vary": "Accept"}
+    content_hash = await sapling_estimation_service.get_planting_grid_hash(db, farm_id)
+    if content_hash is not None:
+        headers["ETag"] = f'"{content_hash}-{grid_format}"'
+        if_none_match = request.headers.get("if-none-match", "")
+        if headers["ETag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+    if grid_format == "geojson":
+        geojson = await sapling_estimation_service.get_planting_grid_geojson(db, farm_id)
+        if geojson is None:
+            raise HTTPException(status_code=404, detail=f"No planting estimates found for farm {farm_id}.")
+        return Response(content=geojson, media_type=media_type, headers=headers)
+
+    grid_arrays = await sapling_estimation_service.get_planting_grid_arrays(db, farm_id)
+    if grid_arrays is None:
         raise HTTPException(status_code=404, detail=f"No planting estimates found for farm {farm_id}.")
-    return grid
+    content = await asyncio.to_thread(sapling_estimation_service.encode_planting_grid, grid_arrays, grid_format)
+    return Response(content=content, media_type=media_type, headers=headers)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import get_db_session
+from src.dependencies import get_current_user
+from src.schemas.user import UserRead
+from src.services import tiles as tiles_service
+
+router = APIRouter(prefix="/tiles", tags=["Tiles"])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+@router.get(
+    "/{layer}/{z}/{x}/{y}.mvt",
+    response_class=Response,
+    responses={
+        200: {"content": {MVT_MEDIA_TYPE: {}}},
+        204: {"description": "Tile has no features"},
+        304: {"description": "Tile unchanged since the ETag sent in If-None-Match"},
+    },
+)
+async def get_tile(
+    request: Request,
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: UserRead = Depends(get_current_user),
+):
+    """
+    Returns one Mapbox Vector Tile of a map layer. Requires any authenticated role.
+
+    Layers: boundary, planting_estimates, planting_grids, waterways, soil_ph, soil_texture_spatial.
+    Point layers are only tiled from zoom 14; lower zooms return 204.
+    """
+    if layer not in tiles_service.TILE_LAYERS:
+        raise HTTPException(status_code=404, detail=f"Unknown tile layer: {layer}")
+
+    if not tiles_service.is_valid_tile(z, x, y):
+        raise HTTPException(status_code=400, detail=f"Invalid tile coordinates: {z}/{x}/{y}")
+
+    tile = await tiles_service.get_tile(db, layer, z, x, y)
+
+    if not tile:
+        return Response(status_code=204)
+
+    headers = {
+        "ETag": tiles_service.tile_etag(tile),
+        "Cache-Control": f"private, max-age={tiles_service.TILE_LAYERS[layer]['ttl']}",
+    }
+
+    if headers["ETag"] in [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE, headers=headers)
@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SaplingBatchEstimationRequest(BaseModel):
@@ -26,3 +26,16 @@ class SaplingBatchEstimationResponse(BaseModel):
     status: str = "success"
     farm_count: int
     results: List[SaplingBatchEstimationItem]
+
+
+class SaplingRegionEstimationRequest(BaseModel):
+    spacing_x: float
+    spacing_y: float
+    max_slope: float
+    farm_ids: Optional[List[int]] = None  # None estimates every farm with a boundary
+    workers: Optional[int] = Field(default=None, ge=1)  # None uses one process per CPU
+
+
+class SaplingRegionEstimationAccepted(BaseModel):
+    status: str = "accepted"
+    farm_count: int
@@ -1,7 +1,7 @@
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from src.schemas.constants import (
     RAINFALL_MAX,
@@ -11,6 +11,9 @@ from src.schemas.constants import (
 )
 from src.schemas.farm import FarmBase
 
+# Upper bound on farms per POST /profile/batch request
+PROFILE_BATCH_MAX_FARMS = 1000
+
 
 class FarmProfileResponse(FarmBase):
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
@@ -62,3 +65,14 @@ class FarmProfileResponse(FarmBase):
     temperature_celsius_imputed: Optional[bool] = None
     rainfall_mm_imputed: Optional[bool] = None
     ph_imputed: Optional[bool] = None
+
+
+class FarmProfileBatchRequest(BaseModel):
+    farm_ids: List[int] = Field(min_length=1, max_length=PROFILE_BATCH_MAX_FARMS)
+
+
+class FarmProfileBatchResponse(BaseModel):
+    status: str = "success"
+    farm_count: int
+    results: List[FarmProfileResponse]
+    missing_farm_ids: List[int] = []  # Not found, not accessible or without a boundary
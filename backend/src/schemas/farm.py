@@ -160,3 +160,23 @@ class FarmBoundaryResponse(BaseModel):
     type: str
     geometry: dict
     properties: dict
+
+
+# Spatial farm queries (bbox / polygon / nearest), paginated with an opaque cursor
+class FarmLocation(BaseModel):
+    id: int
+    latitude: float
+    longitude: float
+    area_ha: Optional[float] = None
+    distance_m: Optional[float] = None  # Nearest-farm queries only: metres from the point to the boundary
+
+
+class FarmLocationPage(BaseModel):
+    items: List[FarmLocation]
+    next_cursor: Optional[str] = None  # Pass back as cursor for the next page; None on the last page
+
+
+class FarmAreaQuery(BaseModel):
+    geometry: dict = Field(title="GeoJSON Polygon or MultiPolygon in WGS84")
+    limit: int = Field(default=100, ge=1, le=1000)
+    cursor: Optional[str] = None
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -13,6 +13,8 @@ class SaplingEstimationRequest(BaseModel):
     spacing_x: float
     spacing_y: float
     max_slope: float
+    # Planting pattern: square/rectangular grid, offset rows, or equilateral triangles (hexagonal is the same layout)
+    lattice: Literal["rectangular", "staggered", "triangular", "hexagonal"] = "rectangular"
 
 
 class SaplingEstimationResponse(BaseModel):
@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+
+from src.database import AsyncSessionLocal
+from src.services.region_estimation import run_region_estimation_job
+
+
+async def estimate_region(spacing_x: float, spacing_y: float, max_slope: float, farm_ids: list[int] | None, workers: int | None):
+    print("Starting region sapling estimation...", flush=True)
+
+    async with AsyncSessionLocal() as session:
+        report = await run_region_estimation_job(
+            session,
+            spacing_x=spacing_x,
+            spacing_y=spacing_y,
+            max_slope=max_slope,
+            farm_ids=farm_ids,
+            workers=workers,
+        )
+
+    for result in report["results"]:
+        if result["status"] != "success":
+            print(f"Farm {result['farm_id']} failed: {result.get('message')}", flush=True)
+
+    print(
+        f"Estimated {report['succeeded']}/{report['farm_count']} farms in {report['elapsed_seconds']:.1f}s ({report['farms_per_second']:.2f} farms/s)",
+        flush=True,
+    )
+    if report["farm_count"]:
+        print(
+            f"Per farm: mean {report['farm_seconds_mean']:.2f}s | p50 {report['farm_seconds_p50']:.2f}s | p95 {report['farm_seconds_p95']:.2f}s | max {report['farm_seconds_max']:.2f}s",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate saplings for every farm in a process pool.")
+    parser.add_argument("--spacing-x", type=float, required=True)
+    parser.add_argument("--spacing-y", type=float, required=True)
+    parser.add_argument("--max-slope", type=float, required=True)
+    parser.add_argument("--farm-ids", type=int, nargs="*", default=None, help="Limit the run to these farms")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    asyncio.run(estimate_region(args.spacing_x, args.spacing_y, args.max_slope, args.farm_ids, args.workers))
@@ -2,10 +2,49 @@ import asyncio
 import os
 
 import rasterio
+from sapling_estimation.slope_raster import iter_slope_blocks, open_slope_raster, write_slope_block
 from sqlalchemy import text
 
 from src.database import AsyncSessionLocal
 
+# Each dem_table tile holds two bands:
+#   band 1 - elevation (m)
+#   band 2 - slope (degrees), precomputed here so sapling estimation never runs np.gradient per request
+_INSERT_TILE = text(
+    """
+    INSERT INTO dem_table (rast)
+    VALUES (
+        ST_SetValues(
+            ST_SetValues(
+                ST_AddBand(
+                    ST_AddBand(
+                        ST_MakeEmptyRaster(
+                            :width, :height,
+                            :ulx, :uly,
+                            :scale_x, :scale_y,
+                            0, 0,
+                            :srid
+                        ),
+                        1,
+                        '32BF'
+                    ),
+                    2,
+                    '32BF'
+                ),
+                1,
+                1,
+                1,
+                :values
+            ),
+            2,
+            1,
+            1,
+            :slope_values
+        )
+    )
+    """
+)
+
 
 async def ingest_dem():
     print("Starting DEM ingestion (chunked full DEM)...", flush=True)
@@ -13,12 +52,13 @@ async def ingest_dem():
     # Locate DEM file
     base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
     dem_path = os.path.join(base_dir, "..", "gis", "sapling_estimation", "data", "DEM.tif")
+    slope_path = os.path.join(base_dir, "..", "gis", "sapling_estimation", "data", "slope.tif")
 
     if not os.path.exists(dem_path):
         raise FileNotFoundError(f"DEM file not found: {dem_path}")
 
     async with AsyncSessionLocal() as session:
-        with rasterio.open(dem_path) as src:
+        with rasterio.open(dem_path) as src, open_slope_raster(src, slope_path) as slope_dst:
             transform = src.transform
             srid = src.crs.to_epsg()
 
@@ -32,67 +72,39 @@ async def ingest_dem():
 
             tile_count = 0
 
-            # Loop through DEM in chunks
-            for i in range(0, src.height, tile_size):
-                for j in range(0, src.width, tile_size):
-                    window = src.read(
-                        1,
-                        window=(
-                            (i, min(i + tile_size, src.height)),
-                            (j, min(j + tile_size, src.width)),
-                        ),
-                    ).astype(float)
-
-                    height, width = window.shape
-
-                    # Calculate tile origin
-                    ulx = transform.c + j * transform.a
-                    uly = transform.f + i * transform.e
-
-                    values = window.tolist()
-
-                    await session.execute(
-                        text(
-                            """
-                            INSERT INTO dem_table (rast)
-                            VALUES (
-                                ST_SetValues(
-                                    ST_AddBand(
-                                        ST_MakeEmptyRaster(
-                                            :width, :height,
-                                            :ulx, :uly,
-                                            :scale_x, :scale_y,
-                                            0, 0,
-                                            :srid
-                                        ),
-                                        1,
-                                        '32BF'
-                                    ),
-                                    1,
-                                    1,
-                                    1,
-                                    :values
-                                )
-                            )
-                            """
-                        ),
-                        {
-                            "width": width,
-                            "height": height,
-                            "ulx": float(ulx),
-                            "uly": float(uly),
-                            "scale_x": float(transform.a),
-                            "scale_y": float(transform.e),
-                            "srid": int(srid),
-                            "values": values,
-                        },
-                    )
-
-                    tile_count += 1
+            # One haloed read and one slope computation per block feed both the dem_table tile
+            # and the local slope raster for DEM_SOURCE=local
+            for i, j, window, slope in iter_slope_blocks(src, block_size=tile_size):
+                height, width = slope.shape
+
+                # Calculate tile origin
+                ulx = transform.c + j * transform.a
+                uly = transform.f + i * transform.e
+
+                await session.execute(
+                    _INSERT_TILE,
+                    {
+                        "width": width,
+                        "height": height,
+                        "ulx": float(ulx),
+                        "uly": float(uly),
+                        "scale_x": float(transform.a),
+                        "scale_y": float(transform.e),
+                        "srid": int(srid),
+                        "values": window.tolist(),
+                        "slope_values": slope.tolist(),
+                    },
+                )
+                write_slope_block(slope_dst, i, j, slope)
+
+                tile_count += 1
 
                 # Commit after each row of tiles
-                await session.commit()
-                print(f"Committed row block {i} | tiles inserted: {tile_count}", flush=True)
+                if j + width >= src.width:
+                    await session.commit()
+                    print(f"Committed row block {i} | tiles inserted: {tile_count}", flush=True)
+
+    print(f"Slope raster written to {slope_path}", flush=True)
 
     print(f"DEM ingestion completed successfully. Total tiles: {tile_count}", flush=True)
 
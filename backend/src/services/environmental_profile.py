@@ -1,10 +1,16 @@
-from core.farm_profile import build_farm_profile
+import asyncio
+import math
+import time
+
+from core.extract_data import DEFAULT_BATCH_SIZE
+from core.farm_profile import batch_create_profiles, build_farm_profile
 from geoalchemy2.shape import to_shape
-from imputation import TARGET_FEATURES, impute_missing
+from imputation import TARGET_FEATURES, impute_missing, impute_missing_batch
 from shapely.geometry import MultiPolygon, Polygon
-from sqlalchemy import select
+from sqlalchemy import case, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
 from src.models.boundaries import FarmBoundary
 from src.models.farm import Farm
 from src.models.soil_texture import SoilTexture
@@ -16,19 +22,181 @@ from src.schemas.constants import (
     TEMPERATURE_MAX,
     TEMPERATURE_MIN,
 )
-from src.services.riparian import get_riparian_flags
-from src.services.soil_ph import get_soil_ph_for_point
-from src.services.soil_texture_spatial import get_soil_texture_for_point
+from src.services.riparian import get_riparian_flags, get_riparian_flags_for_farms
+from src.services.soil_ph import get_soil_ph_for_point, get_soil_ph_for_points
+from src.services.soil_texture_spatial import get_soil_texture_for_point, get_soil_texture_for_points
 
 # Maps from farm_profile.py output keys to imputation service keys
 _TO_IMPUTER = {"slope_degrees": "slope", "soil_ph": "ph"}
 _FROM_IMPUTER = {v: k for k, v in _TO_IMPUTER.items()}
 
+# Farm columns used when a profile field could not be extracted
+_FARM_COLUMNS = {"slope_degrees": "slope", "soil_ph": "ph"}
+
 
 class ImputationError(Exception):
     """Raised when imputation fails or produces implausible values."""
 
 
+async def get_local_inputs_for_farms(
+    db: AsyncSession,
+    points: dict[int, tuple[float, float]],
+    soil_texture_ids: dict[int, int | None] | None = None,
+) -> dict[int, dict]:
+    """
+    Resolve the local inputs of many farm profiles with the set-based lookups.
+
+    Bulk equivalent of the riparian, soil pH and soil texture lookups in
+    run_environmental_profile: get_riparian_flags_for_farms for the boundaries,
+    and get_soil_ph_for_points / get_soil_texture_for_points at each farm's
+    centroid, so SOIL_LOOKUP_SOURCE applies to both paths. Texture falls back to
+    the name of the farm's soil_texture_id, and pH outside SOIL_PH_MIN..SOIL_PH_MAX
+    is returned as None.
+
+    Args:
+        points:           {farm_id: (latitude, longitude)} of the first polygon's centroid.
+        soil_texture_ids: {farm_id: soil_texture_id} used when no texture polygon matches.
+
+    Returns:
+        {farm_id: {"riparian", "distance_to_nearest_waterway_m", "soil_ph", "soil_texture"}}.
+        Farms without a boundary are left out.
+    """
+    if not points:
+        return {}
+
+    riparian_flags = await get_riparian_flags_for_farms(db, list(points))
+    ph_values = await get_soil_ph_for_points(db, points)
+    textures = await get_soil_texture_for_points(db, points)
+
+    soil_texture_ids = soil_texture_ids or {}
+    fallback_ids = {soil_texture_ids[farm_id] for farm_id in points if textures.get(farm_id) is None and soil_texture_ids.get(farm_id) is not None}
+    fallback_names = {}
+    if fallback_ids:
+        result = await db.execute(select(SoilTexture.id, SoilTexture.name).where(SoilTexture.id.in_(fallback_ids)))
+        fallback_names = dict(result.all())
+
+    inputs = {}
+    for farm_id, flags in riparian_flags.items():
+        ph = ph_values.get(farm_id)
+        texture = textures.get(farm_id)
+        inputs[farm_id] = {
+            **flags,
+            "soil_ph": ph if ph is not None and SOIL_PH_MIN <= ph <= SOIL_PH_MAX else None,
+            "soil_texture": texture if texture is not None else fallback_names.get(soil_texture_ids.get(farm_id)),
+        }
+
+    return inputs
+
+
+def _format_geometry(shapely_geom) -> tuple[list | None, object | None]:
+    """GIS parser geometry ([[(lat, lon), ...]]) and centroid of the first polygon, or (None, None)."""
+    if isinstance(shapely_geom, MultiPolygon):
+        target_poly = list(shapely_geom.geoms)[0]
+    elif isinstance(shapely_geom, Polygon):
+        target_poly = shapely_geom
+    else:
+        return None, None
+
+    lat_lon_ring = [(lat, lon) for (lon, lat) in list(target_poly.exterior.coords)]
+    return [lat_lon_ring], target_poly.centroid
+
+
+def _resolve_profile(profile: dict, farm_id: int, farm_record: Farm, local_ph: float | None, local_texture: str | None) -> dict:
+    """Fill failed fields from the farm record, or replace a failed profile with the stored values."""
+    # Datasets that failed in a partial profile take the stored farm value; the imputer fills what is still missing
+    if profile.get("status") == "partial":
+        for field in profile.pop("failed_fields", []):
+            profile[field] = getattr(farm_record, _FARM_COLUMNS.get(field, field), None)
+        profile["status"] = "success"
+
+    if profile.get("status") != "failed":
+        profile["data_source"] = "hybrid"
+        return profile
+
+    return {
+        "id": farm_id,
+        "rainfall_mm": farm_record.rainfall_mm,
+        "temperature_celsius": farm_record.temperature_celsius,
+        "elevation_m": farm_record.elevation_m,
+        "soil_ph": (local_ph if local_ph is not None else (farm_record.ph if farm_record.ph is not None and 5 <= farm_record.ph <= 8.5 else None)),
+        "soil_texture_id": farm_record.soil_texture_id,
+        "soil_texture": local_texture,
+        "area_ha": farm_record.area_ha,
+        "latitude": farm_record.latitude,
+        "longitude": farm_record.longitude,
+        "coastal": farm_record.coastal,
+        "riparian": farm_record.riparian,
+        "nitrogen_fixing": farm_record.nitrogen_fixing,
+        "shade_tolerant": farm_record.shade_tolerant,
+        "bank_stabilising": farm_record.bank_stabilising,
+        "slope_degrees": farm_record.slope,
+        "status": "success",
+        "data_source": "fallback",
+    }
+
+
+def _imputation_input(profile: dict) -> dict | None:
+    """Imputer-keyed copy of the profile when a target feature is missing, else None."""
+    # Null out values that the schema validators would reject as out of range,
+    # so they are treated as missing and picked up by the imputer rather than
+    # silently becoming None only after Pydantic validation.
+    rainfall = profile.get("rainfall_mm")
+    if rainfall is not None and not (RAINFALL_MIN <= rainfall <= RAINFALL_MAX):
+        profile["rainfall_mm"] = None
+
+    temp = profile.get("temperature_celsius")
+    if temp is not None and not (TEMPERATURE_MIN <= temp <= TEMPERATURE_MAX):
+        profile["temperature_celsius"] = None
+
+    # TARGET_FEATURES uses imputer naming (slope, ph).
+    # farm_profile uses slope_degrees and soil_ph — remap before passing.
+    imputer_profile = {_TO_IMPUTER.get(k, k): v for k, v in profile.items()}
+
+    if any(imputer_profile.get(f) is None for f in TARGET_FEATURES):
+        return imputer_profile
+    return None
+
+
+def _impute_profiles(imputer_profiles: list[dict]) -> list[tuple[dict, list[str]]]:
+    """(filled, imputed_fields) per imputer profile, from one batched model call."""
+    try:
+        return impute_missing_batch(imputer_profiles)
+    except RuntimeError as exc:
+        raise ImputationError(f"Imputation model unavailable: {exc}") from exc
+
+
+def _apply_imputation(profile: dict, filled: dict, imputed_fields: list[str]):
+    # Merge filled values back, remapping imputer keys to profile keys
+    for field in imputed_fields:
+        profile_key = _FROM_IMPUTER.get(field, field)
+        profile[profile_key] = filled[field]
+
+    # Record which fields were imputed (using DB column naming)
+    for field in imputed_fields:
+        profile[f"{field}_imputed"] = True
+
+
+def _normalize_profile(profile: dict) -> dict:
+    """Round values to the precision enforced by the pydantic schema."""
+    # Round temp to int
+    if profile.get("temperature_celsius") is not None:
+        profile["temperature_celsius"] = int(round(float(profile["temperature_celsius"])))
+
+    # Round rainfall to int
+    if profile.get("rainfall_mm") is not None:
+        profile["rainfall_mm"] = int(round(float(profile["rainfall_mm"])))
+
+    # Round pH to 1 decimal place
+    if profile.get("soil_ph") is not None:
+        profile["soil_ph"] = round(float(profile["soil_ph"]), 1)
+
+    # Round slope to 2 decimal places
+    if profile.get("slope_degrees") is not None:
+        profile["slope_degrees"] = round(float(profile["slope_degrees"]), 2)
+
+    return profile
+
+
 class EnvironmentalProfileService:
     @staticmethod
     async def run_environmental_profile(db: AsyncSession, farm_id: int):
@@ -48,21 +216,11 @@ class EnvironmentalProfileService:
         # Geometry parsing
         shapely_geom = to_shape(boundary_record.boundary)
 
-        target_poly = None
-
-        if isinstance(shapely_geom, MultiPolygon):
-            target_poly = list(shapely_geom.geoms)[0]
-        elif isinstance(shapely_geom, Polygon):
-            target_poly = shapely_geom
-        else:
+        # Format for GIS parser, with the centroid for local raster queries
+        formatted_geometry, centroid = _format_geometry(shapely_geom)
+        if formatted_geometry is None:
             return None
 
-        # Format for GIS parser
-        lat_lon_ring = [(lat, lon) for (lon, lat) in list(target_poly.exterior.coords)]
-        formatted_geometry = [lat_lon_ring]
-
-        # Get centroid for local raster queries
-        centroid = target_poly.centroid
         lat, lon = centroid.y, centroid.x
 
         # Get riparian flag from PostGIS intersection query
@@ -90,79 +248,40 @@ class EnvironmentalProfileService:
             if texture:
                 local_texture = texture.name
 
-        # Call GEE + Hybrid logic
-        profile = build_farm_profile(
-            geometry=formatted_geometry,
-            farm_id=farm_id,
-            riparian=riparian,
-            soil_ph=local_ph,
-            soil_texture=local_texture,
-        )
-
-        if profile and profile.get("status") != "failed":
-            profile["data_source"] = "hybrid"
+        # Call GEE + Hybrid logic off the event loop; a stalled GEE request falls back to the stored farm values
+        timeout = settings.PROFILE_EXTRACTION_TIMEOUT
+        try:
+            profile = await asyncio.wait_for(
+                asyncio.to_thread(
+                    build_farm_profile,
+                    geometry=formatted_geometry,
+                    farm_id=farm_id,
+                    riparian=riparian,
+                    concurrent=settings.PROFILE_CONCURRENT_EXTRACTION,
+                    timeout=timeout,
+                    soil_ph=local_ph,
+                    soil_texture=local_texture,
+                ),
+                # Concurrent extraction enforces the timeout per dataset and returns a partial profile
+                timeout=timeout * 2 if settings.PROFILE_CONCURRENT_EXTRACTION else timeout,
+            )
+        except asyncio.TimeoutError:
+            profile = {"id": farm_id, "status": "failed", "error": f"GEE extraction timed out after {timeout}s"}
 
         if profile is None:
             return None
 
-        if profile.get("status") == "failed":
-            profile = {
-                "id": farm_id,
-                "rainfall_mm": farm_record.rainfall_mm,
-                "temperature_celsius": farm_record.temperature_celsius,
-                "elevation_m": farm_record.elevation_m,
-                "soil_ph": (local_ph if local_ph is not None else (farm_record.ph if farm_record.ph is not None and 5 <= farm_record.ph <= 8.5 else None)),
-                "soil_texture_id": farm_record.soil_texture_id,
-                "soil_texture": local_texture,
-                "area_ha": farm_record.area_ha,
-                "latitude": farm_record.latitude,
-                "longitude": farm_record.longitude,
-                "coastal": farm_record.coastal,
-                "riparian": farm_record.riparian,
-                "nitrogen_fixing": farm_record.nitrogen_fixing,
-                "shade_tolerant": farm_record.shade_tolerant,
-                "bank_stabilising": farm_record.bank_stabilising,
-                "slope_degrees": farm_record.slope,
-                "status": "success",
-                "data_source": "fallback",
-            }
+        profile = _resolve_profile(profile, farm_id, farm_record, local_ph, local_texture)
 
         # --- Imputation ---------------------------------------------------
-        # Skip imputation if GEE failed — error profiles lack base features
-        # (latitude, longitude, area_ha, coastal, riparian) entirely.
-        if profile.get("status") == "failed":
-            return profile
-        # Null out values that the schema validators would reject as out of range,
-        # so they are treated as missing and picked up by the imputer rather than
-        # silently becoming None only after Pydantic validation.
-        rainfall = profile.get("rainfall_mm")
-        if rainfall is not None and not (RAINFALL_MIN <= rainfall <= RAINFALL_MAX):
-            profile["rainfall_mm"] = None
-
-        temp = profile.get("temperature_celsius")
-        if temp is not None and not (TEMPERATURE_MIN <= temp <= TEMPERATURE_MAX):
-            profile["temperature_celsius"] = None
-
-        # TARGET_FEATURES uses imputer naming (slope, ph).
-        # farm_profile uses slope_degrees and soil_ph — remap before passing.
-        imputer_profile = {_TO_IMPUTER.get(k, k): v for k, v in profile.items()}
-
-        missing_targets = [f for f in TARGET_FEATURES if imputer_profile.get(f) is None]
-
-        if missing_targets:
+        imputer_profile = _imputation_input(profile)
+
+        if imputer_profile is not None:
             try:
                 filled, imputed_fields = impute_missing(imputer_profile)
             except RuntimeError as exc:
                 raise ImputationError(f"Imputation model unavailable: {exc}") from exc
-
-            # Merge filled values back, remapping imputer keys to profile keys
-            for field in imputed_fields:
-                profile_key = _FROM_IMPUTER.get(field, field)
-                profile[profile_key] = filled[field]
-
-            # Record which fields were imputed (using DB column naming)
-            for field in imputed_fields:
-                profile[f"{field}_imputed"] = True
+            _apply_imputation(profile, filled, imputed_fields)
 
             # Persist imputation flags to the Farm DB record
             if farm_record is not None:
@@ -171,22 +290,92 @@ class EnvironmentalProfileService:
                 await db.commit()
         # ------------------------------------------------------------------
 
-        # Data Normalization to enforce pydantic schema
+        return _normalize_profile(profile)
 
-        # Round temp to int
-        if profile.get("temperature_celsius") is not None:
-            profile["temperature_celsius"] = int(round(float(profile["temperature_celsius"])))
+    @staticmethod
+    async def run_environmental_profiles(db: AsyncSession, farm_ids: list[int]) -> dict[int, dict]:
+        """
+        Set-based run_environmental_profile for many farms.
+
+        Farms and boundaries are loaded in one query, the riparian/soil lookups run
+        as one set-based query, GEE extraction is batched, imputation runs over all
+        incomplete profiles together and the imputation flags are persisted in one
+        UPDATE. Returns {farm_id: profile}; farms without a boundary are left out.
+        """
+        if not farm_ids:
+            return {}
+
+        result = await db.execute(select(Farm, FarmBoundary).join(FarmBoundary, FarmBoundary.id == Farm.id).where(Farm.id.in_(farm_ids)))
+
+        farm_records = {}
+        geometries = {}
+        points = {}
+        for farm_record, boundary_record in result.all():
+            formatted_geometry, centroid = _format_geometry(to_shape(boundary_record.boundary))
+            if formatted_geometry is None:
+                continue
+            farm_records[farm_record.id] = farm_record
+            geometries[farm_record.id] = formatted_geometry
+            points[farm_record.id] = (centroid.y, centroid.x)
+
+        local_inputs = await get_local_inputs_for_farms(db, points, {farm_id: farm.soil_texture_id for farm_id, farm in farm_records.items()})
+
+        gee_farms = []
+        for farm_id, formatted_geometry in geometries.items():
+            inputs = local_inputs.get(farm_id)
+            if inputs is None:
+                continue
+
+            farm_record = farm_records[farm_id]
+            gee_farms.append(
+                {
+                    "geometry": formatted_geometry,
+                    "farm_id": farm_record.id,
+                    "riparian": inputs["riparian"],
+                    "soil_ph": inputs["soil_ph"],
+                    "soil_texture": inputs["soil_texture"],
+                }
+            )
+
+        if not gee_farms:
+            return {}
+
+        # One GEE request per DEFAULT_BATCH_SIZE farms, off the event loop; a stalled extraction falls back to the stored farm values.
+        # wait_for cannot stop the worker thread, so the same deadline is passed in and it sends no further GEE batch once it has passed.
+        timeout = settings.PROFILE_EXTRACTION_TIMEOUT * math.ceil(len(gee_farms) / DEFAULT_BATCH_SIZE)
+        deadline = time.monotonic() + timeout
+        try:
+            extracted = await asyncio.wait_for(asyncio.to_thread(batch_create_profiles, gee_farms, records=True, deadline=deadline), timeout=timeout)
+        except asyncio.TimeoutError:
+            extracted = [{"id": farm["farm_id"], "status": "failed", "error": f"GEE extraction timed out after {timeout}s"} for farm in gee_farms]
+
+        profiles = {}
+        for farm, profile in zip(gee_farms, extracted):
+            farm_id = farm["farm_id"]
+            profiles[farm_id] = _resolve_profile(profile, farm_id, farm_records[farm_id], farm["soil_ph"], farm["soil_texture"])
 
-        # Round rainfall to int
-        if profile.get("rainfall_mm") is not None:
-            profile["rainfall_mm"] = int(round(float(profile["rainfall_mm"])))
+        # --- Imputation ---------------------------------------------------
+        pending = {farm_id: _imputation_input(profile) for farm_id, profile in profiles.items()}
+        pending = {farm_id: imputer_profile for farm_id, imputer_profile in pending.items() if imputer_profile is not None}
 
-        # Round pH to 1 decimal place
-        if profile.get("soil_ph") is not None:
-            profile["soil_ph"] = round(float(profile["soil_ph"]), 1)
+        if pending:
+            imputed_by_field = {field: [] for field in TARGET_FEATURES}
 
-        # Round slope to 2 decimal places
-        if profile.get("slope_degrees") is not None:
-            profile["slope_degrees"] = round(float(profile["slope_degrees"]), 2)
+            for farm_id, (filled, imputed_fields) in zip(pending, _impute_profiles(list(pending.values()))):
+                _apply_imputation(profiles[farm_id], filled, imputed_fields)
+                for field in imputed_fields:
+                    imputed_by_field[field].append(farm_id)
+
+            # Persist imputation flags to the Farm DB records in one UPDATE
+            flagged = {field: ids for field, ids in imputed_by_field.items() if ids}
+            if flagged:
+                await db.execute(
+                    update(Farm)
+                    .where(Farm.id.in_({farm_id for ids in flagged.values() for farm_id in ids}))
+                    .values({f"{field}_imputed": case((Farm.id.in_(ids), True), else_=getattr(Farm, f"{field}_imputed")) for field, ids in flagged.items()})
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        # ------------------------------------------------------------------
 
-        return profile
+        return {farm_id: _normalize_profile(profile) for farm_id, profile in profiles.items()}
@@ -1,8 +1,12 @@
+import base64
+import binascii
+import json
 from typing import Union
 
-from geoalchemy2.shape import to_shape
-from shapely.geometry import mapping
-from sqlalchemy import select
+from geoalchemy2 import Geography
+from geoalchemy2.shape import from_shape, to_shape
+from shapely.geometry import MultiPolygon, Polygon, mapping, shape
+from sqlalchemy import Float, cast, func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -156,3 +160,129 @@ async def delete_farm_record(db: AsyncSession, farm_id: int) -> bool:
     await db.delete(db_farm)
     await db.commit()
     return True
+
+
+# Cursor keys and the JSON types their values must have before they are bound into a query
+_CURSOR_TYPES = {"id": (int,), "knn": (int, float)}
+
+
+def encode_cursor(values: dict) -> str:
+    """Opaque pagination cursor (URL-safe base64 JSON)."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, *keys: str) -> dict:
+    """Inverse of encode_cursor. Raises ValueError if the cursor is malformed, lacks a key or a value has the wrong type."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+    if not isinstance(values, dict) or any(not _valid_cursor_value(key, values.get(key)) for key in keys):
+        raise ValueError("Invalid cursor.")
+    return values
+
+
+def _valid_cursor_value(key: str, value) -> bool:
+    # bool is a subclass of int but never a valid ID or distance
+    return isinstance(value, _CURSOR_TYPES[key]) and not isinstance(value, bool)
+
+
+def area_from_geojson(geometry: dict):
+    """PostGIS element for a GeoJSON Polygon/MultiPolygon. Raises ValueError if it is not a valid polygon."""
+    try:
+        area = shape(geometry)
+    except (AttributeError, KeyError, TypeError, ValueError) as exc:
+        raise ValueError("geometry must be a GeoJSON Polygon or MultiPolygon.") from exc
+    if not isinstance(area, (Polygon, MultiPolygon)) or area.is_empty or not area.is_valid:
+        raise ValueError("geometry must be a valid GeoJSON Polygon or MultiPolygon.")
+    return from_shape(area, srid=4326)
+
+
+def bbox_envelope(min_lon: float, min_lat: float, max_lon: float, max_lat: float):
+    """PostGIS envelope for a WGS84 bounding box."""
+    return func.ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, 4326)
+
+
+async def list_farms_in_area(
+    db: AsyncSession,
+    area,
+    user_id: int | None = None,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """Farms whose boundary intersects the area, by ID, one page at a time.
+
+    area is a PostGIS geometry in EPSG:4326 (see area_from_geojson / bbox_envelope);
+    the ST_Intersects filter runs on the GiST index of boundary.boundary.
+    If user_id is provided, results are filtered to that owner only.
+    Returns (farms, next_cursor); next_cursor is None on the last page.
+    """
+    stmt = (
+        select(Farm.id, Farm.latitude, Farm.longitude, Farm.area_ha)
+        .join(FarmBoundary, FarmBoundary.id == Farm.id)
+        .where(func.ST_Intersects(FarmBoundary.boundary, area))
+        .order_by(Farm.id)
+        .limit(limit + 1)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Farm.user_id == user_id)
+    if cursor is not None:
+        stmt = stmt.where(Farm.id > decode_cursor(cursor, "id")["id"])
+
+    rows = (await db.execute(stmt)).all()
+    farms = [dict(row._mapping) for row in rows[:limit]]
+    next_cursor = encode_cursor({"id": farms[-1]["id"]}) if len(rows) > limit else None
+    return farms, next_cursor
+
+
+async def list_nearest_farms(
+    db: AsyncSession,
+    latitude: float,
+    longitude: float,
+    user_id: int | None = None,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """Farms ordered by distance from the point to their boundary, one page at a time.
+
+    Pages are selected with the KNN operator (<->) on the GiST index of boundary.boundary,
+    which measures planar distance in degrees; distance_m is the geodesic distance in
+    metres (0 inside the boundary). Degrees of longitude and latitude differ in length by
+    up to ~1% near the equator, so each page is re-sorted by distance_m, but a farm on a
+    later page can be slightly nearer than the last farm of the page before it.
+    The cursor carries the last (KNN distance, farm ID), so later pages continue
+    after it. If user_id is provided, results are filtered to that owner only.
+    Returns (farms, next_cursor); next_cursor is None on the last page.
+    """
+    point = func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326)
+    knn = FarmBoundary.boundary.op("<->", return_type=Float)(point)
+
+    stmt = (
+        select(
+            Farm.id,
+            Farm.latitude,
+            Farm.longitude,
+            Farm.area_ha,
+            func.ST_Distance(cast(FarmBoundary.boundary, Geography(srid=4326)), cast(point, Geography(srid=4326))).label("distance_m"),
+            knn.label("knn"),
+        )
+        .join(FarmBoundary, FarmBoundary.id == Farm.id)
+        .order_by(knn, Farm.id)
+        .limit(limit + 1)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Farm.user_id == user_id)
+    if cursor is not None:
+        after = decode_cursor(cursor, "knn", "id")
+        stmt = stmt.where(tuple_(knn, Farm.id) > tuple_(after["knn"], after["id"]))
+
+    rows = (await db.execute(stmt)).all()
+    farms = []
+    for row in rows[:limit]:
+        farm = dict(row._mapping)
+        farm["distance_m"] = round(float(farm["distance_m"]), 1)
+        farms.append(farm)
+    farms.sort(key=lambda farm: (farm["distance_m"], farm["id"]))
+
+    next_cursor = encode_cursor({"knn": rows[limit - 1].knn, "id": rows[limit - 1].id}) if len(rows) > limit else None
+    return farms, next_cursor
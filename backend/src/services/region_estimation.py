@@ -0,0 +1,90 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+from sapling_estimation.region_batch import run_region_estimation, summarize_region_run
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import cache
+from src.config import settings
+from src.models.boundaries import FarmBoundary
+from src.services.sapling_estimation import local_terrain_source, write_planting_grids
+
+logger = logging.getLogger(__name__)
+
+# Estimation metrics, as returned (and cached) by SaplingEstimationService.run_estimation
+_METRIC_FIELDS = ("pre_slope_count", "aligned_count", "optimal_angle", "rotation_average", "rotation_std_dev")
+
+# Result fields kept per farm in the run report (the grid coordinates are written to the DB, not reported)
+_REPORT_FIELDS = ("farm_id", "status", "message", *_METRIC_FIELDS, "seconds")
+
+
+class RegionEstimationError(Exception):
+    """Raised when a region run cannot start."""
+
+
+async def count_region_farms(db: AsyncSession, farm_ids: list[int] | None = None) -> int:
+    query = select(func.count()).select_from(FarmBoundary)
+    if farm_ids:
+        query = query.where(FarmBoundary.id.in_(farm_ids))
+    result = await db.execute(query)
+    return result.scalar_one()
+
+
+async def run_region_estimation_job(
+    db: AsyncSession,
+    spacing_x: float,
+    spacing_y: float,
+    max_slope: float,
+    farm_ids: list[int] | None = None,
+    workers: int | None = None,
+) -> dict:
+    """Estimates saplings for every farm with a boundary (or the given farm_ids) in a process pool.
+
+    Farms are estimated against the local terrain file (see local_terrain_source), so the run does not
+    depend on DEM_SOURCE. Results are written in bulk and committed per completed chunk of farms.
+    Returns the run summary (throughput, per-farm timing) and the per-farm results.
+    """
+    terrain_path, array_key = local_terrain_source()
+    if not os.path.exists(terrain_path):
+        raise RegionEstimationError(f"Region estimation needs a local DEM or slope raster, none found at {terrain_path}")
+
+    query = select(FarmBoundary.id, func.ST_AsBinary(FarmBoundary.boundary)).order_by(FarmBoundary.id)
+    if farm_ids:
+        query = query.where(FarmBoundary.id.in_(farm_ids))
+    rows = await db.execute(query)
+    farms = [(farm_id, bytes(wkb)) for farm_id, wkb in rows.all()]
+
+    start = time.perf_counter()
+    chunks = run_region_estimation(farms, terrain_path, spacing_x, spacing_y, max_slope, workers=workers, array_key=array_key, working_crs=settings.SAPLING_WORKING_CRS)
+
+    results = []
+    try:
+        while True:
+            # The pool blocks while waiting for chunks; keep that off the event loop
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+
+            # One DELETE per table and one INSERT for the whole chunk
+            await write_planting_grids(db, {result["farm_id"]: (result["xs"], result["ys"], result["slopes"]) for result in chunk if result["status"] == "success"})
+            await db.commit()
+            results.extend({field: result[field] for field in _REPORT_FIELDS if field in result} for result in chunk)
+
+            for result in chunk:
+                if result["status"] == "success":
+                    cache_key = f"sapling:{result['farm_id']}:{spacing_x}:{spacing_y}:{max_slope}"
+                    await cache.set(cache_key, json.dumps({"id": result["farm_id"], **{field: result[field] for field in _METRIC_FIELDS}}))
+
+            logger.info("Region estimation: %d/%d farms done", len(results), len(farms))
+    finally:
+        # Stops the pool if a write, commit or chunk failed; closing waits for running chunks, so keep it off the event loop
+        await asyncio.to_thread(chunks.close)
+
+    summary = summarize_region_run(results, time.perf_counter() - start)
+    logger.info("Region estimation finished: %s", summary)
+
+    return {"status": "success", **summary, "results": sorted(results, key=lambda result: result["farm_id"])}
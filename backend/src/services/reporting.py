@@ -1,12 +1,14 @@
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from src.domains.reporting import FarmReportContract, FarmReportMetadata, RecommendationReportEntry
 from src.models.farm import Farm
 from src.models.recommendations import Recommendation
+from src.services.farm import decode_cursor, encode_cursor
 
 
 async def get_farm_report(db: AsyncSession, farm_id: int, user_id: int | None = None) -> FarmReportContract | None:
@@ -22,13 +24,7 @@ async def get_farm_report(db: AsyncSession, farm_id: int, user_id: int | None =
     if farm is None:
         return None
 
-    recs_result = await db.execute(
-        select(Recommendation).options(selectinload(Recommendation.species)).where(Recommendation.farm_id == farm_id).where(Recommendation.rank_overall >= 0).order_by(Recommendation.rank_overall)
-    )
-    recommendations = list(recs_result.scalars().all())
-
-    excl_result = await db.execute(select(Recommendation).options(selectinload(Recommendation.species)).where(Recommendation.farm_id == farm_id).where(Recommendation.rank_overall == -1))
-    exclusions = list(excl_result.scalars().all())
+    recommendations, exclusions = (await _recommendations_by_farm(db, [farm_id])).get(farm_id, ([], []))
 
     return _assemble_report(farm, recommendations, exclusions)
 
@@ -37,27 +33,86 @@ async def get_all_farms_report(db: AsyncSession, user_id: int | None = None) ->
     """Retrieves all farms and their saved recommendations.
     If user_id is provided, only farms belonging to that user are included.
     """
-    farm_stmt = select(Farm).options(selectinload(Farm.soil_texture), selectinload(Farm.farm_supervisor))
-    # Admins see all farms, supervisors see only their own
+    farm_result = await db.execute(_farms_stmt(user_id))
+    farms = list(farm_result.scalars().all())
+
+    # One recommendations query for the whole farm set, selected with the same filter as the farms
+    farm_ids = select(Farm.id)
     if user_id is not None:
-        farm_stmt = farm_stmt.where(Farm.user_id == user_id)
+        farm_ids = farm_ids.where(Farm.user_id == user_id)
+    recommendations_by_farm = await _recommendations_by_farm(db, farm_ids)
+
+    return [_assemble_report(farm, *recommendations_by_farm.get(farm.id, ([], []))) for farm in farms]
+
+
+async def get_farms_report_page(
+    db: AsyncSession,
+    user_id: int | None = None,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list[FarmReportContract], str | None]:
+    """One page of farm reports ordered by farm ID.
+    If user_id is provided, only farms belonging to that user are included.
+    Returns (reports, next_cursor); next_cursor is None on the last page.
+    Raises ValueError if the cursor is invalid.
+    """
+    farm_stmt = _farms_stmt(user_id).order_by(Farm.id).limit(limit + 1)
+    if cursor is not None:
+        farm_stmt = farm_stmt.where(Farm.id > decode_cursor(cursor, "id")["id"])
 
     farm_result = await db.execute(farm_stmt)
     farms = list(farm_result.scalars().all())
+    page = farms[:limit]
+
+    recommendations_by_farm = await _recommendations_by_farm(db, [farm.id for farm in page])
+    reports = [_assemble_report(farm, *recommendations_by_farm.get(farm.id, ([], []))) for farm in page]
+    next_cursor = encode_cursor({"id": page[-1].id}) if len(farms) > limit else None
+    return reports, next_cursor
 
-    reports = []
-    for farm in farms:
-        recs_result = await db.execute(
-            select(Recommendation).options(selectinload(Recommendation.species)).where(Recommendation.farm_id == farm.id).where(Recommendation.rank_overall >= 0).order_by(Recommendation.rank_overall)
-        )
-        recommendations = list(recs_result.scalars().all())
 
-        excl_result = await db.execute(select(Recommendation).options(selectinload(Recommendation.species)).where(Recommendation.farm_id == farm.id).where(Recommendation.rank_overall == -1))
-        exclusions = list(excl_result.scalars().all())
+async def stream_farms_report(db: AsyncSession, user_id: int | None = None, batch_size: int = 200) -> AsyncIterator[FarmReportContract]:
+    """Yields farm reports in farm ID order from a server-side cursor.
+    Farms are fetched batch_size at a time, with one recommendations query per batch,
+    so memory use is bounded by the batch rather than the number of farms.
+    If user_id is provided, only farms belonging to that user are included.
+    """
+    farm_stmt = _farms_stmt(user_id).order_by(Farm.id).execution_options(yield_per=batch_size)
+    farm_result = await db.stream(farm_stmt)
+
+    async for farms in farm_result.scalars().partitions():
+        recommendations_by_farm = await _recommendations_by_farm(db, [farm.id for farm in farms])
+        for farm in farms:
+            yield _assemble_report(farm, *recommendations_by_farm.get(farm.id, ([], [])))
+
+
+def _farms_stmt(user_id: int | None):
+    stmt = select(Farm).options(selectinload(Farm.soil_texture), selectinload(Farm.farm_supervisor))
+    # Admins see all farms, supervisors see only their own
+    if user_id is not None:
+        stmt = stmt.where(Farm.user_id == user_id)
+    return stmt
+
+
+async def _recommendations_by_farm(db: AsyncSession, farm_ids) -> dict[int, tuple[list[Recommendation], list[Recommendation]]]:
+    """Saved recommendations of many farms in one query, with species joined.
+
+    farm_ids is a list of IDs or a select of farm IDs. Returns {farm_id: (ranked, excluded)},
+    ranked in rank_overall order; farms without recommendations are left out.
+    """
+    result = await db.execute(
+        select(Recommendation)
+        .options(joinedload(Recommendation.species))
+        .where(Recommendation.farm_id.in_(farm_ids))
+        .where((Recommendation.rank_overall >= 0) | (Recommendation.rank_overall == -1))
+        .order_by(Recommendation.farm_id, Recommendation.rank_overall, Recommendation.id)
+    )
 
-        reports.append(_assemble_report(farm, recommendations, exclusions))
+    by_farm = {}
+    for rec in result.scalars().all():
+        ranked, excluded = by_farm.setdefault(rec.farm_id, ([], []))
+        (excluded if rec.rank_overall == -1 else ranked).append(rec)
 
-    return reports
+    return by_farm
 
 
 def _assemble_report(farm: Farm, recommendations: list[Recommendation], exclusions: list[Recommendation]) -> FarmReportContract:
@@ -1,10 +1,55 @@
 from geoalchemy2.shape import from_shape
-from sqlalchemy import func, select
+from sqlalchemy import delete, exists, func, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.models.riparian_zones import RiparianZone
 from src.models.waterways import Waterway
 from src.schemas.constants import CRS_ANALYSIS, RIPARIAN_BUFFER_M
 
+# The nearest-waterway distance is found in two index-driven steps. A KNN (<->) scan takes the
+# first few waterways by planar distance in degrees and measures them in UTM; that distance is an
+# upper bound. Degrees are not metres (a degree of longitude is shorter than one of latitude), so
+# every waterway within that bound is then measured exactly, found with ST_DWithin on the index.
+NEAREST_WATERWAY_CANDIDATES = 5
+
+# Lower bound on the length of a degree of latitude or longitude anywhere below ~25° latitude,
+# so bound_m / MIN_METRES_PER_DEGREE is a degree radius that contains every waterway within bound_m
+MIN_METRES_PER_DEGREE = 100_000.0
+
+
+async def rebuild_riparian_zones(db: AsyncSession) -> int:
+    """
+    Rebuild the precomputed riparian zones from the waterways table.
+
+    Every waterway is projected to UTM Zone 51S (EPSG:32751), buffered by
+    RIPARIAN_BUFFER_M and split with ST_Subdivide so the GiST index on
+    riparian_zones stays selective. Run after (re)importing waterways; the
+    caller commits.
+
+    Args:
+        db: Async database session.
+
+    Returns:
+        Number of riparian zone pieces written.
+    """
+
+    await db.execute(delete(RiparianZone))
+
+    zones = select(
+        Waterway.id,
+        func.ST_Multi(
+            func.ST_Subdivide(
+                func.ST_Buffer(
+                    func.ST_Transform(Waterway.geometry, CRS_ANALYSIS),
+                    RIPARIAN_BUFFER_M,
+                )
+            )
+        ),
+    )
+    await db.execute(insert(RiparianZone).from_select(["waterway_id", "geometry"], zones))
+
+    return (await db.execute(select(func.count()).select_from(RiparianZone))).scalar_one()
+
 
 async def get_riparian_flags(
     db: AsyncSession,
@@ -13,10 +58,12 @@ async def get_riparian_flags(
     """
     Check if a farm boundary intersects a riparian zone.
 
-    This function uses PostGIS spatial queries to determine if the farm geometry
-    intersects with a buffered area around waterways.
+    The riparian flag is an index-driven ST_Intersects against the precomputed
+    riparian_zones table (see rebuild_riparian_zones). The distance to the
+    nearest waterway is exact: a KNN (<->) scan of the waterways index bounds it,
+    then every waterway within that bound is measured (see NEAREST_WATERWAY_CANDIDATES).
 
-    Both geometries are transformed to UTM Zone 51S (EPSG:32751) for
+    Both geometries are compared in UTM Zone 51S (EPSG:32751) for
     metre-accurate distance calculations.
 
     Args:
@@ -26,36 +73,41 @@ async def get_riparian_flags(
     Returns:
         {
             "riparian": bool,
+            "distance_to_nearest_waterway_m": float | None,
         }
     """
 
-    farm_geom_utm = func.ST_Transform(
-        from_shape(shapely_farm_geom, srid=4326),
-        CRS_ANALYSIS,
-    )
+    farm_geom = from_shape(shapely_farm_geom, srid=4326)
+    farm_geom_utm = func.ST_Transform(farm_geom, CRS_ANALYSIS)
 
-    waterway_geom_utm = func.ST_Transform(
-        Waterway.geometry,
-        CRS_ANALYSIS,
-    )
+    riparian = exists().where(func.ST_Intersects(RiparianZone.geometry, farm_geom_utm))
 
-    stmt = select(
-        func.bool_or(
-            func.ST_Intersects(
-                farm_geom_utm,
-                func.ST_Buffer(
-                    waterway_geom_utm,
-                    RIPARIAN_BUFFER_M,
-                ),
-            )
-        ).label("riparian"),
+    nearest = select(Waterway.geometry).order_by(Waterway.geometry.op("<->")(func.ST_Boundary(farm_geom))).limit(NEAREST_WATERWAY_CANDIDATES).subquery()
+    bound = select(
         func.min(
             func.ST_Distance(
                 func.ST_Boundary(farm_geom_utm),
-                waterway_geom_utm,
+                func.ST_Transform(nearest.c.geometry, CRS_ANALYSIS),
+            )
+        )
+    ).scalar_subquery()
+    distance = (
+        select(
+            func.min(
+                func.ST_Distance(
+                    func.ST_Boundary(farm_geom_utm),
+                    func.ST_Transform(Waterway.geometry, CRS_ANALYSIS),
+                )
             )
-        ).label("distance_to_waterway_m"),
-    ).select_from(Waterway)
+        )
+        .where(func.ST_DWithin(Waterway.geometry, func.ST_Boundary(farm_geom), bound / MIN_METRES_PER_DEGREE))
+        .scalar_subquery()
+    )
+
+    stmt = select(
+        riparian.label("riparian"),
+        distance.label("distance_to_waterway_m"),
+    )
 
     row = (await db.execute(stmt)).first()
 
@@ -63,3 +115,75 @@ async def get_riparian_flags(
         "riparian": bool(row.riparian),
         "distance_to_nearest_waterway_m": None if row.distance_to_waterway_m is None else round(float(row.distance_to_waterway_m), 1),
     }
+
+
+async def get_riparian_flags_for_farms(
+    db: AsyncSession,
+    farm_ids: list[int],
+) -> dict[int, dict]:
+    """
+    Set-based get_riparian_flags for many farms in one query.
+
+    The farm IDs are unnested and joined to their boundaries; each boundary is
+    resolved with a LATERAL ST_Intersects against riparian_zones and the
+    KNN-bounded exact nearest-waterway lookup of get_riparian_flags, so all use
+    the GiST indexes.
+
+    Args:
+        db:       Async database session.
+        farm_ids: Farm IDs to check.
+
+    Returns:
+        {farm_id: {"riparian": bool, "distance_to_nearest_waterway_m": float | None}}.
+        Farms without a boundary are left out.
+    """
+
+    if not farm_ids:
+        return {}
+
+    query = text(
+        """
+        SELECT b.id AS farm_id, r.riparian, d.distance
+        FROM unnest(CAST(:farm_ids AS integer[])) AS f(id)
+        JOIN boundary b ON b.id = f.id
+        CROSS JOIN LATERAL (
+            SELECT EXISTS (
+                SELECT 1
+                FROM riparian_zones z
+                WHERE ST_Intersects(z.geometry, ST_Transform(b.boundary, :crs))
+            ) AS riparian
+        ) r
+        CROSS JOIN LATERAL (
+            SELECT min(ST_Distance(ST_Boundary(ST_Transform(b.boundary, :crs)), ST_Transform(n.geometry, :crs))) AS bound
+            FROM (
+                SELECT w.geometry
+                FROM waterways w
+                ORDER BY w.geometry <-> ST_Boundary(b.boundary)
+                LIMIT :candidates
+            ) n
+        ) k
+        CROSS JOIN LATERAL (
+            SELECT min(ST_Distance(ST_Boundary(ST_Transform(b.boundary, :crs)), ST_Transform(w.geometry, :crs))) AS distance
+            FROM waterways w
+            WHERE ST_DWithin(w.geometry, ST_Boundary(b.boundary), k.bound / :metres_per_degree)
+        ) d;
+        """
+    )
+
+    result = await db.execute(
+        query,
+        {
+            "farm_ids": list(farm_ids),
+            "crs": CRS_ANALYSIS,
+            "candidates": NEAREST_WATERWAY_CANDIDATES,
+            "metres_per_degree": MIN_METRES_PER_DEGREE,
+        },
+    )
+
+    return {
+        row.farm_id: {
+            "riparian": bool(row.riparian),
+            "distance_to_nearest_waterway_m": None if row.distance is None else round(float(row.distance), 1),
+        }
+        for row in result
+    }
@@ -1,11 +1,322 @@
-from geoalchemy2.shape import from_shape, to_shape
+import asyncio
+import hashlib
+import io
+import os
+import time
+
+import geopandas as gpd
+import numpy as np
+from geoalchemy2.shape import to_shape
+from sapling_estimation.dem_source import DEFAULT_DEM_PATH, DEFAULT_SLOPE_PATH, get_dem_tile_store, get_slope_tile_store
 from sapling_estimation.estimate import sapling_estimation
-from shapely.geometry import mapping
-from sqlalchemy import delete, select, text
+from sapling_estimation.estimation_cache import EstimationCache
+from sapling_estimation.transform import resolve_working_crs
+from sqlalchemy import REAL, Float, Integer, bindparam, delete, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
 from src.models.boundaries import FarmBoundary
 from src.models.planting_estimates import PlantingEstimate
+from src.models.planting_grids import PlantingGrid
+
+try:
+    import pyarrow as pa
+except ImportError:  # Optional: Arrow planting grid responses are disabled without pyarrow
+    pa = None
+
+# Tiles imported by scripts/import_dem.py carry a precomputed slope band (band 2).
+# Elevation is only transferred for tiles without it, in which case slope is computed per request.
+_DEM_QUERY = text(
+    """
+    WITH merged AS (
+        SELECT ST_Union(rast) AS rast
+        FROM dem_table
+        WHERE ST_Intersects(
+            rast,
+            ST_Transform(
+                ST_GeomFromText(:farm_wkt, 4326),
+                ST_SRID(rast)
+            )
+        )
+    )
+    SELECT
+        CASE WHEN ST_NumBands(rast) >= 2 THEN ST_DumpValues(rast, 2) END AS slopearray,
+        CASE WHEN ST_NumBands(rast) < 2 THEN ST_DumpValues(rast, 1) END AS valarray,
+        ST_UpperLeftX(rast) AS ulx,
+        ST_UpperLeftY(rast) AS uly,
+        ST_ScaleX(rast) AS scalex,
+        ST_ScaleY(rast) AS scaley,
+        ST_SRID(rast) AS srid
+    FROM merged
+    WHERE rast IS NOT NULL;
+    """
+)
+
+
+# Points are sent as three parallel arrays and expanded server-side, so one statement inserts the whole
+# grid instead of one ORM object (and one WKB conversion) per planting point.
+_INSERT_ESTIMATES = text(
+    """
+    INSERT INTO planting_estimates (farm_id, slope, geometry)
+    SELECT pt.farm_id, pt.slope, ST_SetSRID(ST_MakePoint(pt.x, pt.y), 4326)
+    FROM unnest(:farm_ids, :xs, :ys, :slopes) AS pt(farm_id, x, y, slope)
+    """
+).bindparams(
+    bindparam("farm_ids", type_=ARRAY(Integer)),
+    bindparam("xs", type_=ARRAY(Float)),
+    bindparam("ys", type_=ARRAY(Float)),
+    bindparam("slopes", type_=ARRAY(Float)),
+)
+
+# Packed storage: the whole grid as one MultiPoint (in point order) plus a parallel slope array.
+# write_planting_grids deletes the farms' previous grids first, so this is a plain insert.
+_INSERT_PACKED_GRID = text(
+    """
+    INSERT INTO planting_grids (farm_id, point_count, geometry, slopes, content_hash)
+    SELECT
+        CAST(:farm_id AS integer),
+        count(*),
+        ST_Multi(ST_SetSRID(ST_Collect(ST_MakePoint(pt.x, pt.y) ORDER BY pt.i), 4326)),
+        :slopes,
+        :content_hash
+    FROM unnest(:xs, :ys) WITH ORDINALITY AS pt(x, y, i)
+    """
+).bindparams(
+    bindparam("xs", type_=ARRAY(Float)),
+    bindparam("ys", type_=ARRAY(Float)),
+    bindparam("slopes", type_=ARRAY(REAL)),
+)
+
+_GRID_HASH_QUERY = text("SELECT content_hash FROM planting_grids WHERE farm_id = :farm_id")
+
+# Both grid queries read the packed record as stored (its slopes array, and the MultiPoint's
+# points by index) and only aggregate planting_estimates rows for the rows storage. Writes clear
+# the other storage, so at most one branch returns a row.
+
+# The FeatureCollection is assembled by PostGIS and passed through as text, without Python objects per point
+_GRID_GEOJSON_QUERY = text(
+    """
+    SELECT
+        g.point_count,
+        json_build_object(
+            'type', 'FeatureCollection',
+            'features', (
+                SELECT json_agg(
+                    json_build_object(
+                        'type', 'Feature',
+                        'geometry', ST_AsGeoJSON(d.geom)::json,
+                        'properties', json_build_object('slope', g.slopes[d.path[1]])
+                    )
+                    ORDER BY d.path[1]
+                )
+                FROM ST_DumpPoints(g.geometry) AS d
+            )
+        )::text AS geojson
+    FROM planting_grids g
+    WHERE g.farm_id = :farm_id
+    UNION ALL
+    SELECT
+        count(*),
+        json_build_object(
+            'type', 'FeatureCollection',
+            'features', json_agg(
+                json_build_object(
+                    'type', 'Feature',
+                    'geometry', ST_AsGeoJSON(pe.geometry)::json,
+                    'properties', json_build_object('slope', pe.slope)
+                )
+                ORDER BY pe.id
+            )
+        )::text
+    FROM planting_estimates pe
+    WHERE pe.farm_id = :farm_id
+    HAVING count(*) > 0
+    """
+)
+
+_GRID_ARRAYS_QUERY = text(
+    """
+    SELECT c.xs, c.ys, CAST(g.slopes AS double precision[]) AS slopes
+    FROM planting_grids g
+    CROSS JOIN LATERAL (
+        SELECT
+            array_agg(ST_X(d.geom) ORDER BY d.path[1]) AS xs,
+            array_agg(ST_Y(d.geom) ORDER BY d.path[1]) AS ys
+        FROM ST_DumpPoints(g.geometry) AS d
+    ) c
+    WHERE g.farm_id = :farm_id
+    UNION ALL
+    SELECT
+        array_agg(ST_X(pe.geometry) ORDER BY pe.id),
+        array_agg(ST_Y(pe.geometry) ORDER BY pe.id),
+        array_agg(pe.slope ORDER BY pe.id)
+    FROM planting_estimates pe
+    WHERE pe.farm_id = :farm_id
+    HAVING count(*) > 0
+    """
+)
+
+
+# Per-farm terrain and planting layouts kept between requests, so a new max_slope or spacing for
+# the same farm skips the DEM fetch (and, for max_slope, the grid rotation search).
+estimation_cache = EstimationCache(
+    max_farms=settings.SAPLING_CACHE_MAX_FARMS,
+    max_layouts_per_farm=settings.SAPLING_CACHE_MAX_LAYOUTS,
+)
+
+
+# Terrain the cached entries were read from, compared at most every SAPLING_TERRAIN_CHECK_SECONDS
+_terrain_revision = None
+_terrain_checked_at = 0.0
+
+
+async def _current_terrain_revision(db: AsyncSession) -> tuple:
+    if settings.DEM_SOURCE == "local":
+        terrain_path, _ = local_terrain_source()
+        try:
+            stat = os.stat(terrain_path)
+        except FileNotFoundError:
+            return (terrain_path, None, None)
+        return (terrain_path, stat.st_mtime_ns, stat.st_size)
+
+    # import_dem.py truncates dem_table, which gives it a new file node
+    result = await db.execute(text("SELECT pg_relation_filenode('dem_table')"))
+    return ("dem_table", result.scalar_one())
+
+
+async def refresh_terrain_cache(db: AsyncSession) -> bool:
+    """Clears cached terrain (and local tile stores) when the DEM or slope raster has been re-imported.
+
+    Returns True if the cache was cleared.
+    """
+    global _terrain_revision, _terrain_checked_at
+
+    if time.monotonic() - _terrain_checked_at < settings.SAPLING_TERRAIN_CHECK_SECONDS:
+        return False
+
+    revision = await _current_terrain_revision(db)
+    _terrain_checked_at = time.monotonic()
+    if revision == _terrain_revision:
+        return False
+
+    stale = _terrain_revision is not None
+    _terrain_revision = revision
+    if stale:
+        estimation_cache.clear()
+        get_dem_tile_store.cache_clear()
+        get_slope_tile_store.cache_clear()
+    return stale
+
+
+def local_terrain_source() -> tuple[str, str]:
+    """Local terrain file and the sapling_estimation argument it provides.
+
+    Prefers the precomputed slope raster, falling back to the DEM when it has not been built.
+    """
+    slope_path = settings.SLOPE_PATH or DEFAULT_SLOPE_PATH
+    if os.path.exists(slope_path):
+        return str(slope_path), "slope_array"
+    return str(settings.DEM_PATH or DEFAULT_DEM_PATH), "dem_array"
+
+
+def _local_terrain_store():
+    terrain_path, array_key = local_terrain_source()
+    if array_key == "slope_array":
+        return get_slope_tile_store(terrain_path, max_tiles=settings.DEM_TILE_CACHE_SIZE)
+    return get_dem_tile_store(terrain_path, max_tiles=settings.DEM_TILE_CACHE_SIZE)
+
+
+async def get_dem_window(db: AsyncSession, farm_polygon) -> dict | None:
+    """Fetches the terrain window covering a farm as sapling_estimation keyword arguments.
+
+    Reads from the local tile store when DEM_SOURCE is "local", otherwise from dem_table.
+    The window carries slope_array when precomputed slope is available, dem_array otherwise.
+    Returns None if no DEM data covers the farm.
+    """
+    if settings.DEM_SOURCE == "local":
+        store = _local_terrain_store()
+        # Tile reads are blocking file I/O, keep them off the event loop
+        return await asyncio.to_thread(store.read_window, farm_polygon, "EPSG:4326")
+
+    dem_result = await db.execute(_DEM_QUERY, {"farm_wkt": farm_polygon.wkt})
+    dem_row = dem_result.fetchone()
+
+    if dem_row is None:
+        return None
+
+    window = {
+        "dem_upper_left_x": float(dem_row.ulx),
+        "dem_upper_left_y": float(dem_row.uly),
+        "pixel_width": abs(float(dem_row.scalex)),
+        "pixel_height": abs(float(dem_row.scaley)),
+        "dem_crs": f"EPSG:{dem_row.srid}",
+    }
+    if dem_row.slopearray is not None:
+        window["slope_array"] = dem_row.slopearray
+    else:
+        window["dem_array"] = dem_row.valarray
+
+    return window
+
+
+def grid_content_hash(xs, ys, slopes) -> str:
+    """SHA-256 over the float32 coordinates and slopes of a planting grid."""
+    digest = hashlib.sha256()
+    for values in (xs, ys, slopes):
+        digest.update(np.asarray(values, dtype=float).astype(np.float32).tobytes())
+    return digest.hexdigest()
+
+
+async def write_planting_estimates(db: AsyncSession, farm_id: int, final_grid, slope_values) -> int:
+    """Replaces the saved planting points of a farm with a new grid.
+
+    Writes planting_estimates rows or a packed planting_grids record depending on PLANTING_GRID_STORAGE.
+    The deletes and bulk insert run in the caller's transaction; the caller commits.
+    Returns the number of points written.
+    """
+    return await write_planting_points(db, farm_id, final_grid.geometry.x.tolist(), final_grid.geometry.y.tolist(), slope_values)
+
+
+async def write_planting_points(db: AsyncSession, farm_id: int, xs: list, ys: list, slope_values: list) -> int:
+    """write_planting_estimates for a grid given as coordinate lists (EPSG:4326)."""
+    return await write_planting_grids(db, {farm_id: (xs, ys, slope_values)})
+
+
+async def write_planting_grids(db: AsyncSession, grids: dict[int, tuple[list, list, list]]) -> int:
+    """Replaces the saved planting points of many farms: {farm_id: (xs, ys, slope_values)} in EPSG:4326.
+
+    Both representations are cleared first (one DELETE each for all farms) so a stale grid in the
+    other one is never served. Rows storage inserts every point of every farm in one statement;
+    packed storage inserts one record per farm in a single executemany.
+    Returns the number of points written.
+    """
+    if not grids:
+        return 0
+
+    farm_ids = list(grids)
+    await db.execute(delete(PlantingEstimate).where(PlantingEstimate.farm_id.in_(farm_ids)))
+    await db.execute(delete(PlantingGrid).where(PlantingGrid.farm_id.in_(farm_ids)))
+
+    grids = {farm_id: (xs, ys, [float(value) if value is not None else None for value in slope_values]) for farm_id, (xs, ys, slope_values) in grids.items() if xs}
+    if not grids:
+        return 0
+
+    if settings.PLANTING_GRID_STORAGE == "packed":
+        await db.execute(
+            _INSERT_PACKED_GRID,
+            [{"farm_id": farm_id, "xs": xs, "ys": ys, "slopes": slopes, "content_hash": grid_content_hash(xs, ys, slopes)} for farm_id, (xs, ys, slopes) in grids.items()],
+        )
+    else:
+        params = {"farm_ids": [], "xs": [], "ys": [], "slopes": []}
+        for farm_id, (xs, ys, slopes) in grids.items():
+            params["farm_ids"].extend([farm_id] * len(xs))
+            params["xs"].extend(xs)
+            params["ys"].extend(ys)
+            params["slopes"].extend(slopes)
+        await db.execute(_INSERT_ESTIMATES, params)
+
+    return sum(len(xs) for xs, _, _ in grids.values())
 
 
 class SaplingEstimationService:
@@ -16,6 +327,7 @@ class SaplingEstimationService:
         spacing_x: float,
         spacing_y: float,
         max_slope: float,
+        lattice: str = "rectangular",
     ):
         try:
             boundary_result = await db.execute(select(FarmBoundary).where(FarmBoundary.id == farm_id))
@@ -25,42 +337,16 @@ class SaplingEstimationService:
                 return {"status": "failed", "message": "Farm not found"}
 
             farm_polygon = to_shape(boundary.boundary)
-            farm_wkt = farm_polygon.wkt
-
-            # DEM Query
-            dem_query = text(
-                """
-                WITH merged AS (
-                    SELECT ST_Union(rast) AS rast
-                    FROM dem_table
-                    WHERE ST_Intersects(
-                        rast,
-                        ST_Transform(
-                            ST_GeomFromText(:farm_wkt, 4326),
-                            ST_SRID(rast)
-                        )
-                    )
-                )
-                SELECT
-                    (ST_DumpValues(rast)).valarray AS valarray,
-                    ST_UpperLeftX(rast) AS ulx,
-                    ST_UpperLeftY(rast) AS uly,
-                    ST_ScaleX(rast) AS scalex,
-                    ST_ScaleY(rast) AS scaley,
-                    ST_SRID(rast) AS srid
-                FROM merged
-                WHERE rast IS NOT NULL;
-                """
-            )
+            working_crs = resolve_working_crs(settings.SAPLING_WORKING_CRS, farm_polygon, "EPSG:4326")
 
-            dem_result = await db.execute(
-                dem_query,
-                {"farm_wkt": farm_wkt},
-            )
-            dem_row = dem_result.fetchone()
+            await refresh_terrain_cache(db)
+            if estimation_cache.has_terrain(farm_polygon, working_crs=working_crs):
+                dem_window = {}
+            else:
+                dem_window = await get_dem_window(db, farm_polygon)
 
-            if dem_row is None:
-                return {"status": "failed", "message": "DEM not found"}
+                if dem_window is None:
+                    return {"status": "failed", "message": "DEM not found"}
 
             estimation_result = sapling_estimation(
                 farm_polygon=farm_polygon,
@@ -68,33 +354,18 @@ class SaplingEstimationService:
                 spacing_y=spacing_y,
                 max_slope=max_slope,
                 farm_boundary_crs="EPSG:4326",
-                dem_array=dem_row.valarray,
-                dem_upper_left_x=float(dem_row.ulx),
-                dem_upper_left_y=float(dem_row.uly),
-                pixel_width=abs(float(dem_row.scalex)),
-                pixel_height=abs(float(dem_row.scaley)),
-                dem_crs=f"EPSG:{dem_row.srid}",
+                cache=estimation_cache,
+                working_crs=working_crs,
+                lattice=lattice,
+                **dem_window,
             )
 
             final_grid = estimation_result["final_grid"]
             slope_values = estimation_result["slope_values"]
             optimal_angle = estimation_result["optimal_angle"]
 
-            # Clear old results
-            await db.execute(delete(PlantingEstimate).where(PlantingEstimate.farm_id == farm_id))
-
-            # Insert new
-            planting_estimates = []
-            for pt, slope_value in zip(final_grid["geometry"], slope_values):
-                planting_estimates.append(
-                    PlantingEstimate(
-                        farm_id=farm_id,
-                        slope=float(slope_value) if slope_value is not None else None,
-                        geometry=from_shape(pt, srid=4326),
-                    )
-                )
-
-            db.add_all(planting_estimates)
+            # Replace old results with the new grid in a single transaction
+            await write_planting_estimates(db, farm_id, final_grid, slope_values)
             await db.commit()
 
             return {
@@ -111,15 +382,54 @@ class SaplingEstimationService:
             return {"status": "failed", "message": str(e)}
 
 
-async def get_planting_grid(db: AsyncSession, farm_id: int) -> dict:
-    result = await db.execute(select(PlantingEstimate).where(PlantingEstimate.farm_id == farm_id))
-    estimates = list(result.scalars().all())
-    features = [
-        {
-            "type": "Feature",
-            "geometry": mapping(to_shape(est.geometry)),
-            "properties": {"slope": est.slope},
-        }
-        for est in estimates
-    ]
-    return {"type": "FeatureCollection", "features": features}
+async def get_planting_grid_hash(db: AsyncSession, farm_id: int) -> str | None:
+    """Content hash of a farm's packed planting grid, or None if the farm has no packed grid."""
+    result = await db.execute(_GRID_HASH_QUERY, {"farm_id": farm_id})
+    return result.scalar_one_or_none()
+
+
+async def get_planting_grid_geojson(db: AsyncSession, farm_id: int) -> str | None:
+    """Returns a farm's planting points as GeoJSON FeatureCollection text, or None if it has none."""
+    result = await db.execute(_GRID_GEOJSON_QUERY, {"farm_id": farm_id})
+    row = result.fetchone()
+
+    if row is None or row.point_count == 0:
+        return None
+
+    return row.geojson
+
+
+async def get_planting_grid_arrays(db: AsyncSession, farm_id: int) -> dict | None:
+    """Returns a farm's planting points as parallel xs, ys and slopes lists, or None if it has none."""
+    result = await db.execute(_GRID_ARRAYS_QUERY, {"farm_id": farm_id})
+    row = result.fetchone()
+
+    if row is None or row.xs is None:
+        return None
+
+    return {"xs": row.xs, "ys": row.ys, "slopes": row.slopes}
+
+
+def encode_planting_grid(grid_arrays: dict, grid_format: str) -> bytes:
+    """Encodes planting grid arrays as FlatGeobuf ("flatgeobuf") or a GeoArrow IPC stream ("arrow")."""
+    grid = gpd.GeoDataFrame(
+        {"slope": np.asarray(grid_arrays["slopes"], dtype=float)},
+        geometry=gpd.points_from_xy(grid_arrays["xs"], grid_arrays["ys"]),
+        crs="EPSG:4326",
+    )
+
+    if grid_format == "flatgeobuf":
+        buffer = io.BytesIO()
+        grid.to_file(buffer, driver="FlatGeobuf")
+        return buffer.getvalue()
+
+    if grid_format == "arrow":
+        if pa is None:
+            raise ValueError("Arrow output requires pyarrow")
+        table = pa.table(grid.to_arrow(geometry_encoding="geoarrow"))
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    raise ValueError(f"Unsupported planting grid format: {grid_format}")
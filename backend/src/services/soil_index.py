@@ -0,0 +1,97 @@
+"""
+In-process spatial index of the soil pH and soil texture polygons.
+
+With SOIL_LOOKUP_SOURCE="memory" the point lookups in services.soil_ph and
+services.soil_texture_spatial are answered from Shapely STRtrees of prepared
+polygons instead of a PostGIS query per farm. Both layers are small and static,
+so they are loaded once per process.
+
+The import scripts replace every row (new serial IDs), so the index compares
+the max IDs of both tables at most every SOIL_INDEX_REFRESH_SECONDS and
+reloads after a re-import.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import shapely
+from geoalchemy2.shape import to_shape
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.models.soil_ph import SoilPH
+from src.models.soil_texture_spatial import SoilTextureSpatial
+
+
+class SoilPolygonIndex:
+    """STRtree of polygons with one value each; the lowest-ID polygon wins where polygons overlap."""
+
+    def __init__(self, geometries: list, values: list):
+        self.geometries = np.array(geometries, dtype=object)
+        self.values = list(values)
+        shapely.prepare(self.geometries)
+        self.tree = shapely.STRtree(self.geometries)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def lookup(self, latitude: float, longitude: float):
+        """Value of the polygon containing the point, or None."""
+        hits = self.tree.query(shapely.Point(longitude, latitude), predicate="intersects")
+        return self.values[hits.min()] if len(hits) else None
+
+    def lookup_many(self, latitudes, longitudes) -> list:
+        """Values for many points in one vectorised tree query, None where no polygon matches."""
+        points = shapely.points(np.asarray(longitudes, dtype=float), np.asarray(latitudes, dtype=float))
+        point_idx, polygon_idx = self.tree.query(points, predicate="intersects")
+
+        results = [None] * len(points)
+        # Visit matches from the highest polygon index down so the lowest one is written last
+        for i in np.lexsort((-polygon_idx, point_idx)):
+            results[point_idx[i]] = self.values[polygon_idx[i]]
+        return results
+
+
+_ph_index: SoilPolygonIndex | None = None
+_texture_index: SoilPolygonIndex | None = None
+_signature = None
+_checked_at = 0.0
+_lock = asyncio.Lock()
+
+
+async def _layer_signature(db: AsyncSession) -> tuple:
+    result = await db.execute(select(select(func.max(SoilPH.id)).scalar_subquery(), select(func.max(SoilTextureSpatial.id)).scalar_subquery()))
+    return tuple(result.one())
+
+
+async def _load_layer(db: AsyncSession, model, column) -> SoilPolygonIndex:
+    result = await db.execute(select(column, model.geometry).order_by(model.id))
+    rows = result.all()
+    return SoilPolygonIndex([to_shape(row.geometry) for row in rows], [row[0] for row in rows])
+
+
+async def get_soil_indexes(db: AsyncSession) -> tuple[SoilPolygonIndex, SoilPolygonIndex]:
+    """(soil pH index, soil texture index), loading them on first use and after a re-import."""
+    global _ph_index, _texture_index, _signature, _checked_at
+
+    if _ph_index is not None and time.monotonic() - _checked_at < settings.SOIL_INDEX_REFRESH_SECONDS:
+        return _ph_index, _texture_index
+
+    async with _lock:
+        if _ph_index is None or time.monotonic() - _checked_at >= settings.SOIL_INDEX_REFRESH_SECONDS:
+            signature = await _layer_signature(db)
+            if _ph_index is None or signature != _signature:
+                _ph_index = await _load_layer(db, SoilPH, SoilPH.ph)
+                _texture_index = await _load_layer(db, SoilTextureSpatial, SoilTextureSpatial.texture)
+                _signature = signature
+            _checked_at = time.monotonic()
+
+    return _ph_index, _texture_index
+
+
+def invalidate_soil_indexes():
+    """Drop the loaded indexes so the next lookup reloads them."""
+    global _ph_index, _texture_index, _signature
+    _ph_index = _texture_index = _signature = None
@@ -1,12 +1,20 @@
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
+from src.services.soil_index import get_soil_indexes
+
 
 async def get_soil_ph_for_point(
     db: AsyncSession,
     latitude: float,
     longitude: float,
 ) -> float | None:
+    if settings.SOIL_LOOKUP_SOURCE == "memory":
+        ph_index, _ = await get_soil_indexes(db)
+        value = ph_index.lookup(latitude, longitude)
+        return float(value) if value is not None else None
+
     query = text(
         """
         SELECT ph
@@ -33,3 +41,50 @@ async def get_soil_ph_for_point(
         return None
 
     return float(row.ph) if row.ph is not None else None
+
+
+async def get_soil_ph_for_points(
+    db: AsyncSession,
+    points: dict[int, tuple[float, float]],
+) -> dict[int, float | None]:
+    """Set-based get_soil_ph_for_point: {farm_id: (latitude, longitude)} to {farm_id: ph} in one LATERAL join."""
+    if not points:
+        return {}
+
+    if settings.SOIL_LOOKUP_SOURCE == "memory":
+        ph_index, _ = await get_soil_indexes(db)
+        values = ph_index.lookup_many([lat for lat, _ in points.values()], [lon for _, lon in points.values()])
+        return {farm_id: float(value) if value is not None else None for farm_id, value in zip(points, values)}
+
+    query = text(
+        """
+        SELECT p.farm_id, s.ph
+        FROM unnest(
+            CAST(:farm_ids AS integer[]),
+            CAST(:latitudes AS double precision[]),
+            CAST(:longitudes AS double precision[])
+        ) AS p(farm_id, latitude, longitude)
+        LEFT JOIN LATERAL (
+            SELECT ph
+            FROM soil_ph
+            WHERE ST_Intersects(
+                geometry,
+                ST_SetSRID(ST_Point(p.longitude, p.latitude), 4326)
+            )
+            LIMIT 1
+        ) s ON true;
+        """
+    )
+
+    farm_ids = list(points)
+
+    result = await db.execute(
+        query,
+        {
+            "farm_ids": farm_ids,
+            "latitudes": [points[farm_id][0] for farm_id in farm_ids],
+            "longitudes": [points[farm_id][1] for farm_id in farm_ids],
+        },
+    )
+
+    return {row.farm_id: float(row.ph) if row.ph is not None else None for row in result}
@@ -1,12 +1,20 @@
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
+from src.services.soil_index import get_soil_indexes
+
 
 async def get_soil_texture_for_point(
     db: AsyncSession,
     latitude: float,
     longitude: float,
 ) -> str | None:
+    if settings.SOIL_LOOKUP_SOURCE == "memory":
+        _, texture_index = await get_soil_indexes(db)
+        value = texture_index.lookup(latitude, longitude)
+        return str(value) if value is not None else None
+
     query = text(
         """
         SELECT texture
@@ -33,3 +41,50 @@ async def get_soil_texture_for_point(
         return None
 
     return str(row.texture) if row.texture is not None else None
+
+
+async def get_soil_texture_for_points(
+    db: AsyncSession,
+    points: dict[int, tuple[float, float]],
+) -> dict[int, str | None]:
+    """Set-based get_soil_texture_for_point: {farm_id: (latitude, longitude)} to {farm_id: texture} in one LATERAL join."""
+    if not points:
+        return {}
+
+    if settings.SOIL_LOOKUP_SOURCE == "memory":
+        _, texture_index = await get_soil_indexes(db)
+        values = texture_index.lookup_many([lat for lat, _ in points.values()], [lon for _, lon in points.values()])
+        return {farm_id: str(value) if value is not None else None for farm_id, value in zip(points, values)}
+
+    query = text(
+        """
+        SELECT p.farm_id, s.texture
+        FROM unnest(
+            CAST(:farm_ids AS integer[]),
+            CAST(:latitudes AS double precision[]),
+            CAST(:longitudes AS double precision[])
+        ) AS p(farm_id, latitude, longitude)
+        LEFT JOIN LATERAL (
+            SELECT texture
+            FROM soil_texture_spatial
+            WHERE ST_Intersects(
+                geometry,
+                ST_SetSRID(ST_Point(p.longitude, p.latitude), 4326)
+            )
+            LIMIT 1
+        ) s ON true;
+        """
+    )
+
+    farm_ids = list(points)
+
+    result = await db.execute(
+        query,
+        {
+            "farm_ids": farm_ids,
+            "latitudes": [points[farm_id][0] for farm_id in farm_ids],
+            "longitudes": [points[farm_id][1] for farm_id in farm_ids],
+        },
+    )
+
+    return {row.farm_id: str(row.texture) if row.texture is not None else None for row in result}
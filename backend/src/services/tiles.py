@@ -0,0 +1,116 @@
+import hashlib
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import cache
+
+# Vector tile layers served by /tiles/{layer}/{z}/{x}/{y}.mvt.
+# Table and column names are fixed here and never taken from the request.
+# - min_zoom: below it the layer is too dense to tile and an empty tile is returned
+# - ttl: seconds a rendered tile is cached (short for layers rewritten by sapling estimation)
+TILE_LAYERS = {
+    "boundary": {
+        "table": "boundary",
+        "geometry": "boundary",
+        "columns": ["id AS farm_id"],
+        "min_zoom": 0,
+        "ttl": 3600,
+    },
+    "planting_estimates": {
+        "table": "planting_estimates",
+        "geometry": "geometry",
+        "columns": ["farm_id", "slope"],
+        "min_zoom": 14,
+        "ttl": 300,
+    },
+    "planting_grids": {
+        "table": "planting_grids",
+        "geometry": "geometry",
+        "columns": ["farm_id", "point_count"],
+        "min_zoom": 14,
+        "ttl": 300,
+    },
+    "waterways": {
+        "table": "waterways",
+        "geometry": "geometry",
+        "columns": ["id", "name", "waterway"],
+        "min_zoom": 8,
+        "ttl": 86400,
+    },
+    "soil_ph": {
+        "table": "soil_ph",
+        "geometry": "geometry",
+        "columns": ["ph"],
+        "min_zoom": 0,
+        "ttl": 86400,
+    },
+    "soil_texture_spatial": {
+        "table": "soil_texture_spatial",
+        "geometry": "geometry",
+        "columns": ["texture"],
+        "min_zoom": 0,
+        "ttl": 86400,
+    },
+}
+
+MAX_ZOOM = 22
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+
+def _tile_query(layer: str):
+    config = TILE_LAYERS[layer]
+    columns = ", ".join(f"t.{column}" for column in config["columns"])
+
+    # The bbox filter runs in the table's SRID so it can use the layer's GiST index
+    return text(
+        f"""
+        WITH bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+        ),
+        mvtgeom AS (
+            SELECT
+                ST_AsMVTGeom(ST_Transform(t.{config["geometry"]}, 3857), bounds.geom, {TILE_EXTENT}, {TILE_BUFFER}, true) AS geom,
+                {columns}
+            FROM {config["table"]} t, bounds
+            WHERE t.{config["geometry"]} && ST_Transform(bounds.geom, 4326)
+        )
+        SELECT ST_AsMVT(mvtgeom.*, CAST(:layer AS text), {TILE_EXTENT}, 'geom')
+        FROM mvtgeom
+        WHERE geom IS NOT NULL
+        """
+    )
+
+
+_TILE_QUERIES = {layer: _tile_query(layer) for layer in TILE_LAYERS}
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z
+
+
+def tile_etag(tile: bytes) -> str:
+    return f'"{hashlib.sha1(tile).hexdigest()}"'
+
+
+async def get_tile(db: AsyncSession, layer: str, z: int, x: int, y: int) -> bytes:
+    """Renders (or reads from the tile cache) one Mapbox Vector Tile of a layer.
+
+    Returns empty bytes when the tile has no features or is below the layer's min_zoom.
+    """
+    config = TILE_LAYERS[layer]
+
+    if z < config["min_zoom"]:
+        return b""
+
+    cache_key = f"tile:{layer}:{z}:{x}:{y}"
+    cached = await cache.get_bytes(cache_key)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(_TILE_QUERIES[layer], {"z": z, "x": x, "y": y, "layer": layer})
+    tile = bytes(result.scalar() or b"")
+
+    await cache.set_bytes(cache_key, tile, ttl=config["ttl"])
+    return tile
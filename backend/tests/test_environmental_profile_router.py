@@ -73,3 +73,42 @@ async def test_cache_hit(
         assert r2.status_code == 200
         mock_run.assert_called_once()
         assert r2.json() == r1.json()
+
+
+async def test_batch_profiles_reuse_cache_and_report_missing(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    setup_soil_texture,
+    test_admin_user: User,
+    admin_auth_headers: dict,
+):
+    farms = [Farm(user_id=test_admin_user.id, **_FARM_DATA) for _ in range(2)]
+    async_session.add_all(farms)
+    await async_session.flush()
+    first, second = (farm.id for farm in farms)
+
+    async def fake_run(db, farm_ids):
+        return {farm_id: {**_FAKE_PROFILE, "id": farm_id} for farm_id in farm_ids}
+
+    with patch(
+        "src.services.environmental_profile.EnvironmentalProfileService.run_environmental_profiles",
+        new=AsyncMock(side_effect=fake_run),
+    ) as mock_run:
+        r1 = await async_client.post("/profile/batch", json={"farm_ids": [first]}, headers=admin_auth_headers)
+        assert r1.status_code == 200
+
+        r2 = await async_client.post("/profile/batch", json={"farm_ids": [second, first, 999999]}, headers=admin_auth_headers)
+        assert r2.status_code == 200
+
+    # The second request only profiles the farm that was not cached yet
+    assert mock_run.call_args_list[1].args[1] == [second]
+
+    body = r2.json()
+    assert body["farm_count"] == 2
+    assert [profile["id"] for profile in body["results"]] == [second, first]
+    assert body["missing_farm_ids"] == [999999]
+
+
+async def test_batch_profiles_rejects_empty_request(async_client: AsyncClient, admin_auth_headers: dict):
+    r = await async_client.post("/profile/batch", json={"farm_ids": []}, headers=admin_auth_headers)
+    assert r.status_code == 422
@@ -1,11 +1,12 @@
 """Tests for the imputation logic in EnvironmentalProfileService."""
 
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from shapely.geometry import Polygon
 
-from src.services.environmental_profile import EnvironmentalProfileService, ImputationError
+from src.services.environmental_profile import EnvironmentalProfileService, ImputationError, get_local_inputs_for_farms
 
 _FULL_PROFILE = {
     "id": 1,
@@ -121,3 +122,166 @@ async def test_no_gee_profile_returns_none(mock_impute, mock_build, mock_to_shap
 
     assert result is None
     mock_impute.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("src.services.environmental_profile.to_shape")
+@patch("src.services.environmental_profile.build_farm_profile")
+@patch("src.services.environmental_profile.impute_missing")
+async def test_partial_profile_uses_stored_farm_values(mock_impute, mock_build, mock_to_shape):
+    db, poly = _make_db()
+    mock_to_shape.return_value = poly
+    # The same mock record is returned for the boundary and the farm
+    farm_record = db.execute.return_value.scalar_one_or_none.return_value
+    farm_record.temperature_celsius = 25
+    farm_record.slope = 7.5
+    mock_build.side_effect = lambda **_: {
+        **_full_profile(),
+        "temperature_celsius": None,
+        "slope_degrees": None,
+        "status": "partial",
+        "failed_fields": ["temperature_celsius", "slope_degrees"],
+        "error": "temperature: timed out after 30.0s; slope: quota exceeded",
+    }
+
+    profile = await EnvironmentalProfileService.run_environmental_profile(db, farm_id=1)
+
+    mock_impute.assert_not_called()
+    assert profile["temperature_celsius"] == 25
+    assert profile["slope_degrees"] == 7.5
+    assert profile["data_source"] == "hybrid"
+    assert "failed_fields" not in profile
+
+
+@pytest.mark.asyncio
+@patch("src.services.environmental_profile.settings.PROFILE_EXTRACTION_TIMEOUT", 0.1)
+@patch("src.services.environmental_profile.to_shape")
+@patch("src.services.environmental_profile.build_farm_profile")
+@patch("src.services.environmental_profile.impute_missing")
+async def test_stalled_extraction_falls_back_to_farm_record(mock_impute, mock_build, mock_to_shape):
+    db, poly = _make_db()
+    mock_to_shape.return_value = poly
+    farm_record = db.execute.return_value.scalar_one_or_none.return_value
+    for field, value in _full_profile().items():
+        setattr(farm_record, field, value)
+    farm_record.ph = 6.5
+    farm_record.slope = 10.0
+
+    def stalled(**_):
+        time.sleep(1)
+        return _full_profile()
+
+    mock_build.side_effect = stalled
+
+    profile = await EnvironmentalProfileService.run_environmental_profile(db, farm_id=1)
+
+    assert profile["data_source"] == "fallback"
+    assert profile["rainfall_mm"] == 1500
+
+
+@pytest.mark.asyncio
+@patch("src.services.environmental_profile.get_soil_texture_for_points", new_callable=AsyncMock)
+@patch("src.services.environmental_profile.get_soil_ph_for_points", new_callable=AsyncMock)
+@patch("src.services.environmental_profile.get_riparian_flags_for_farms", new_callable=AsyncMock)
+async def test_local_inputs_for_farms_combines_set_based_lookups(mock_riparian, mock_ph, mock_texture):
+    points = {1: (-8.57, 126.68), 2: (-8.6, 126.7), 3: (-8.7, 126.8)}
+    mock_riparian.return_value = {
+        1: {"riparian": True, "distance_to_nearest_waterway_m": 3.1},
+        2: {"riparian": False, "distance_to_nearest_waterway_m": None},
+    }
+    mock_ph.return_value = {1: 6.3, 2: 9.7, 3: 6.0}
+    mock_texture.return_value = {1: "loam", 2: None, 3: None}
+    fallback = MagicMock()
+    fallback.all.return_value = [(4, "clay")]
+    db = AsyncMock()
+    db.execute.return_value = fallback
+
+    inputs = await get_local_inputs_for_farms(db, points, {1: 3, 2: 4, 3: None})
+
+    mock_ph.assert_awaited_once_with(db, points)
+    mock_texture.assert_awaited_once_with(db, points)
+    assert inputs[1] == {"riparian": True, "distance_to_nearest_waterway_m": 3.1, "soil_ph": 6.3, "soil_texture": "loam"}
+    # Out-of-range pH is dropped and a missing texture falls back to the farm's soil_texture_id, like in the single-farm path
+    assert inputs[2] == {"riparian": False, "distance_to_nearest_waterway_m": None, "soil_ph": None, "soil_texture": "clay"}
+    # Farm 3 has no boundary
+    assert 3 not in inputs
+    db.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_local_inputs_for_no_farms_skips_query():
+    db = AsyncMock()
+
+    assert await get_local_inputs_for_farms(db, {}) == {}
+    db.execute.assert_not_called()
+
+
+def _batch_db(count):
+    farms = []
+    for farm_id in range(1, count + 1):
+        farm = MagicMock(id=farm_id, rainfall_mm=1400, temperature_celsius=23, elevation_m=300, ph=6.0, slope=4.0, soil_texture_id=farm_id)
+        boundary = MagicMock(boundary=MagicMock())
+        farms.append((farm, boundary))
+    result = MagicMock()
+    result.all.return_value = farms
+    db = AsyncMock()
+    db.execute.return_value = result
+    return db
+
+
+@pytest.mark.asyncio
+@patch("src.services.environmental_profile.get_local_inputs_for_farms")
+@patch("src.services.environmental_profile.to_shape")
+@patch("src.services.environmental_profile.batch_create_profiles")
+@patch("src.services.environmental_profile.impute_missing_batch")
+async def test_batch_profiles_impute_and_flag_in_one_update(mock_impute, mock_batch, mock_to_shape, mock_inputs):
+    db = _batch_db(3)
+    mock_to_shape.return_value = Polygon([(126.68, -8.57), (126.69, -8.57), (126.69, -8.58), (126.68, -8.57)])
+    mock_inputs.return_value = {farm_id: {"riparian": False, "soil_ph": 6.5, "soil_texture": "loam"} for farm_id in (1, 2, 3)}
+    mock_batch.return_value = [
+        {**_full_profile(), "id": 1},
+        {**_missing_profile(), "id": 2},
+        {"id": 3, "status": "failed", "error": "boom"},
+    ]
+    mock_impute.return_value = [({**_missing_profile(), "elevation_m": 320.0, "ph": 6.2}, ["elevation_m", "ph"])]
+
+    profiles = await EnvironmentalProfileService.run_environmental_profiles(db, [1, 2, 3])
+
+    # Local inputs are looked up at each farm's centroid, with its soil_texture_id as fallback
+    points, texture_ids = mock_inputs.call_args.args[1:]
+    assert list(points) == [1, 2, 3]
+    assert texture_ids == {1: 1, 2: 2, 3: 3}
+
+    # One GEE batch for all farms, and only the incomplete profile is imputed
+    mock_batch.assert_called_once()
+    assert [farm["farm_id"] for farm in mock_batch.call_args.args[0]] == [1, 2, 3]
+    assert mock_batch.call_args.kwargs["records"] is True
+    assert mock_batch.call_args.kwargs["deadline"] > time.monotonic()
+    mock_impute.assert_called_once()
+    assert len(mock_impute.call_args.args[0]) == 1
+
+    assert profiles[1]["data_source"] == "hybrid"
+    assert type(profiles[1]["soil_texture_id"]) is int
+    assert profiles[2]["elevation_m"] == 320.0
+    assert profiles[2]["ph_imputed"] is True
+    assert profiles[3]["data_source"] == "fallback"
+    assert profiles[3]["rainfall_mm"] == 1400
+
+    # Farm + boundary query, then a single UPDATE of the imputation flags
+    statements = [str(call.args[0]) for call in db.execute.await_args_list]
+    assert len(statements) == 2
+    assert statements[1].startswith("UPDATE farms")
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("src.services.environmental_profile.get_local_inputs_for_farms")
+@patch("src.services.environmental_profile.to_shape")
+@patch("src.services.environmental_profile.batch_create_profiles")
+async def test_batch_profiles_skip_farms_without_local_inputs(mock_batch, mock_to_shape, mock_inputs):
+    db = _batch_db(1)
+    mock_to_shape.return_value = Polygon([(126.68, -8.57), (126.69, -8.57), (126.69, -8.58), (126.68, -8.57)])
+    mock_inputs.return_value = {}
+
+    assert await EnvironmentalProfileService.run_environmental_profiles(db, [1]) == {}
+    mock_batch.assert_not_called()
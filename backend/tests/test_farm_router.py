@@ -1,3 +1,4 @@
+import pytest
 from geoalchemy2.elements import WKTElement
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,6 +8,7 @@ from src.models.boundaries import FarmBoundary
 from src.models.farm import Farm
 from src.models.user import User
 from src.schemas.user import Role
+from src.services.farm import decode_cursor, encode_cursor
 from src.utils.security import get_password_hash
 
 VALID_FARM_PAYLOAD = {
@@ -647,3 +649,120 @@ async def test_update_farm_rejects_invalid_slope(
     )
 
     assert response.status_code == 422
+
+
+async def _add_farm_with_boundary(async_session: AsyncSession, user_id: int, lon: float, lat: float) -> Farm:
+    """Farm with a ~100 m square boundary whose lower-left corner is at (lon, lat)."""
+    farm = Farm(**{**VALID_FARM_PAYLOAD, "latitude": lat, "longitude": lon}, user_id=user_id)
+    async_session.add(farm)
+    await async_session.flush()
+    async_session.add(
+        FarmBoundary(
+            id=farm.id,
+            boundary=WKTElement(
+                f"MULTIPOLYGON ((({lon} {lat}, {lon + 0.001} {lat}, {lon + 0.001} {lat + 0.001}, {lon} {lat + 0.001}, {lon} {lat})))",
+                srid=4326,
+            ),
+        )
+    )
+    await async_session.flush()
+    return farm
+
+
+async def test_bbox_lists_intersecting_farms_with_cursor(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    test_admin_user: User,
+    admin_auth_headers: dict,
+    setup_soil_texture,
+):
+    inside = [await _add_farm_with_boundary(async_session, test_admin_user.id, 126.50 + i * 0.01, -8.50) for i in range(3)]
+    await _add_farm_with_boundary(async_session, test_admin_user.id, 127.50, -8.50)
+
+    params = {"min_lon": 126.49, "min_lat": -8.51, "max_lon": 126.53, "max_lat": -8.49, "limit": 2}
+    first = await async_client.get("/farms/bbox", params=params, headers=admin_auth_headers)
+    assert first.status_code == 200
+    page = first.json()
+    assert [farm["id"] for farm in page["items"]] == [inside[0].id, inside[1].id]
+    assert page["next_cursor"] is not None
+
+    second = await async_client.get("/farms/bbox", params={**params, "cursor": page["next_cursor"]}, headers=admin_auth_headers)
+    assert [farm["id"] for farm in second.json()["items"]] == [inside[2].id]
+    assert second.json()["next_cursor"] is None
+
+
+async def test_within_polygon_and_officer_sees_own_farms_only(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    test_officer_user: User,
+    test_admin_user: User,
+    officer_auth_headers: dict,
+    setup_soil_texture,
+):
+    own = await _add_farm_with_boundary(async_session, test_officer_user.id, 126.50, -8.50)
+    await _add_farm_with_boundary(async_session, test_admin_user.id, 126.51, -8.50)
+
+    polygon = {"type": "Polygon", "coordinates": [[[126.49, -8.51], [126.53, -8.51], [126.53, -8.49], [126.49, -8.49], [126.49, -8.51]]]}
+    response = await async_client.post("/farms/within", json={"geometry": polygon}, headers=officer_auth_headers)
+
+    assert response.status_code == 200
+    assert [farm["id"] for farm in response.json()["items"]] == [own.id]
+
+
+async def test_nearest_orders_by_distance_and_pages(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    test_admin_user: User,
+    admin_auth_headers: dict,
+    setup_soil_texture,
+):
+    far = await _add_farm_with_boundary(async_session, test_admin_user.id, 126.60, -8.50)
+    near = await _add_farm_with_boundary(async_session, test_admin_user.id, 126.51, -8.50)
+    containing = await _add_farm_with_boundary(async_session, test_admin_user.id, 126.4995, -8.5005)
+
+    params = {"latitude": -8.50, "longitude": 126.50, "limit": 2}
+    first = await async_client.get("/farms/nearest", params=params, headers=admin_auth_headers)
+    assert first.status_code == 200
+    page = first.json()
+    assert [farm["id"] for farm in page["items"]] == [containing.id, near.id]
+    assert page["items"][0]["distance_m"] == 0
+    assert 1000 < page["items"][1]["distance_m"] < 1200
+
+    second = await async_client.get("/farms/nearest", params={**params, "cursor": page["next_cursor"]}, headers=admin_auth_headers)
+    assert [farm["id"] for farm in second.json()["items"]][0] == far.id
+
+
+async def test_spatial_queries_reject_bad_input(async_client: AsyncClient, admin_auth_headers: dict):
+    bbox = await async_client.get("/farms/bbox", params={"min_lon": 127, "min_lat": -8, "max_lon": 126, "max_lat": -9}, headers=admin_auth_headers)
+    assert bbox.status_code == 400
+
+    point = await async_client.post("/farms/within", json={"geometry": {"type": "Point", "coordinates": [126.5, -8.5]}}, headers=admin_auth_headers)
+    assert point.status_code == 400
+
+    cursor = await async_client.get("/farms/nearest", params={"latitude": -8.5, "longitude": 126.5, "cursor": "not-a-cursor"}, headers=admin_auth_headers)
+    assert cursor.status_code == 400
+
+    # Well-formed cursor whose values have the wrong type
+    typed = await async_client.get("/farms/nearest", params={"latitude": -8.5, "longitude": 126.5, "cursor": encode_cursor({"knn": 0.1, "id": "x"})}, headers=admin_auth_headers)
+    assert typed.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "values, keys",
+    [
+        ({"id": "x"}, ("id",)),
+        ({"id": True}, ("id",)),
+        ({"id": 1.5}, ("id",)),
+        ({"knn": "0.1", "id": 1}, ("knn", "id")),
+        ({"knn": None, "id": 1}, ("knn", "id")),
+        ({}, ("id",)),
+    ],
+)
+def test_decode_cursor_rejects_wrong_types(values, keys):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(encode_cursor(values), *keys)
+
+
+def test_decode_cursor_round_trip():
+    assert decode_cursor(encode_cursor({"knn": 0.25, "id": 7}), "knn", "id") == {"knn": 0.25, "id": 7}
+    assert decode_cursor(encode_cursor({"knn": 0, "id": 7}), "knn", "id") == {"knn": 0, "id": 7}
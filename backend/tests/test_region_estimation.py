@@ -0,0 +1,132 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+import rasterio
+from geoalchemy2 import WKTElement
+from rasterio.transform import from_origin
+from sqlalchemy import text
+
+from src.config import settings
+from src.models.boundaries import FarmBoundary
+from src.models.farm import Farm
+from src.services.region_estimation import run_region_estimation_job
+
+
+@pytest.fixture
+def local_dem(tmp_path, monkeypatch):
+    dem_path = tmp_path / "DEM.tif"
+
+    with rasterio.open(
+        dem_path,
+        "w",
+        driver="GTiff",
+        height=64,
+        width=64,
+        count=1,
+        dtype="float32",
+        crs="EPSG:4326",
+        transform=from_origin(125.0, -9.0, 0.0001, 0.0001),
+    ) as dst:
+        dst.write(np.full((64, 64), 100, dtype=np.float32), 1)
+
+    monkeypatch.setattr(settings, "DEM_PATH", str(dem_path))
+    monkeypatch.setattr(settings, "SLOPE_PATH", str(tmp_path / "missing_slope.tif"))
+    return dem_path
+
+
+@pytest.fixture
+async def setup_region_farm(async_session, setup_soil_texture):
+    farm = Farm(
+        rainfall_mm=1000,
+        temperature_celsius=25,
+        elevation_m=100,
+        ph=6.5,
+        soil_texture_id=1,
+        area_ha=10,
+        latitude=-9.001,
+        longitude=125.001,
+        coastal=False,
+        riparian=False,
+        nitrogen_fixing=False,
+        shade_tolerant=False,
+        bank_stabilising=False,
+        slope=5,
+    )
+    async_session.add(farm)
+    await async_session.flush()
+
+    async_session.add(
+        FarmBoundary(
+            id=farm.id,
+            external_id=farm.id,
+            boundary=WKTElement("MULTIPOLYGON (((125 -9, 125 -9.002, 125.002 -9.002, 125.002 -9, 125 -9)))", srid=4326),
+        )
+    )
+    await async_session.commit()
+    return farm
+
+
+async def test_region_job_writes_estimates(async_session, local_dem, setup_region_farm):
+    farm = setup_region_farm
+
+    report = await run_region_estimation_job(async_session, spacing_x=10, spacing_y=10, max_slope=15, farm_ids=[farm.id], workers=1)
+
+    assert report["farm_count"] == 1
+    assert report["succeeded"] == 1
+    assert report["farms_per_second"] > 0
+    assert report["results"][0]["aligned_count"] > 0
+
+    rows = await async_session.execute(text("SELECT COUNT(*) FROM planting_estimates WHERE farm_id = :id"), {"id": farm.id})
+    assert rows.scalar_one() == report["results"][0]["aligned_count"]
+
+
+async def test_region_endpoint_requires_local_terrain(async_client, admin_auth_headers, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DEM_PATH", str(tmp_path / "missing_dem.tif"))
+    monkeypatch.setattr(settings, "SLOPE_PATH", str(tmp_path / "missing_slope.tif"))
+
+    response = await async_client.post(
+        "/sapling_estimation/region_calculate",
+        json={"spacing_x": 10, "spacing_y": 10, "max_slope": 15},
+        headers=admin_auth_headers,
+    )
+
+    assert response.status_code == 409
+
+
+async def test_region_endpoint_requires_admin(async_client, officer_auth_headers):
+    response = await async_client.post(
+        "/sapling_estimation/region_calculate",
+        json={"spacing_x": 10, "spacing_y": 10, "max_slope": 15},
+        headers=officer_auth_headers,
+    )
+
+    assert response.status_code == 403
+
+
+async def test_region_job_closes_pool_when_a_chunk_write_fails(tmp_path, monkeypatch):
+    terrain = tmp_path / "dem.tif"
+    terrain.touch()
+    monkeypatch.setattr("src.services.region_estimation.local_terrain_source", lambda: (str(terrain), "dem_array"))
+
+    closed = []
+
+    def chunks(*args, **kwargs):
+        try:
+            yield [{"farm_id": 1, "status": "success", "xs": [0.0], "ys": [0.0], "slopes": [1.0], "seconds": 0.1}]
+            yield [{"farm_id": 2, "status": "success", "xs": [0.0], "ys": [0.0], "slopes": [1.0], "seconds": 0.1}]
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr("src.services.region_estimation.run_region_estimation", chunks)
+    monkeypatch.setattr("src.services.region_estimation.write_planting_grids", AsyncMock(side_effect=RuntimeError("write failed")))
+    rows = MagicMock()
+    rows.all.return_value = [(1, b""), (2, b"")]
+    db = AsyncMock()
+    db.execute.return_value = rows
+
+    with pytest.raises(RuntimeError, match="write failed"):
+        await run_region_estimation_job(db, spacing_x=10, spacing_y=10, max_slope=15)
+
+    assert closed == [True]
+    db.commit.assert_not_awaited()
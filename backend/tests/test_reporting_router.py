@@ -1,11 +1,14 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.farm import Farm
 from src.models.recommendations import Recommendation
 from src.models.species import Species
 from src.models.user import User
+from src.services import reporting as reporting_service
+from src.services.farm import encode_cursor
 
 
 def make_farm(user_id: int, soil_texture_id: int = 1) -> Farm:
@@ -630,3 +633,131 @@ async def test_export_all_farms_report_admin(
     assert response_pdf.status_code == 200
     assert len(response_docx.content) > 0
     assert len(response_pdf.content) > 0
+
+
+@pytest.mark.asyncio
+async def test_get_all_farms_report_loads_recommendations_in_one_query(
+    async_session: AsyncSession,
+    setup_soil_texture,
+    test_supervisor_user: User,
+):
+    """Recommendations for every farm are loaded together and split into ranked and excluded per farm."""
+    farms = [make_farm(user_id=test_supervisor_user.id) for _ in range(3)]
+    species_a = make_species("Tectona grandis", "Teak")
+    species_b = make_species("Swietenia macrophylla", "Mahogany")
+    async_session.add_all([*farms, species_a, species_b])
+    await async_session.flush()
+
+    async_session.add_all(
+        [
+            Recommendation(farm_id=farms[0].id, species_id=species_b.id, rank_overall=2, score_mcda=0.5, key_reasons=["b"]),
+            Recommendation(farm_id=farms[0].id, species_id=species_a.id, rank_overall=1, score_mcda=0.9, key_reasons=["a"]),
+            Recommendation(farm_id=farms[1].id, species_id=species_a.id, rank_overall=-1, score_mcda=-1, key_reasons=["excluded"]),
+        ]
+    )
+    await async_session.flush()
+    async_session.expunge_all()
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = async_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", count)
+    try:
+        reports = await reporting_service.get_all_farms_report(async_session, user_id=test_supervisor_user.id)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count)
+
+    # One recommendations query no matter how many farms are reported
+    assert len([s for s in statements if "FROM recommendations" in s]) == 1
+
+    by_farm = {report.farm.id: report for report in reports}
+    assert [r.species_name for r in by_farm[farms[0].id].recommendations] == ["Tectona grandis", "Swietenia macrophylla"]
+    assert by_farm[farms[0].id].exclusions == []
+    assert by_farm[farms[1].id].recommendations == []
+    assert [r.key_reasons for r in by_farm[farms[1].id].exclusions] == [["excluded"]]
+    assert by_farm[farms[2].id].recommendations == by_farm[farms[2].id].exclusions == []
+
+
+@pytest.mark.asyncio
+async def test_get_farms_report_page_walks_all_farms(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    setup_soil_texture,
+    supervisor_auth_headers: dict,
+    test_supervisor_user: User,
+    test_officer_user: User,
+):
+    """Keyset pages cover every supervisor farm exactly once, in ID order, and skip other owners."""
+    farms = [make_farm(user_id=test_supervisor_user.id) for _ in range(5)]
+    other = make_farm(user_id=test_officer_user.id)
+    async_session.add_all([*farms, other])
+    await async_session.flush()
+
+    seen, cursor = [], None
+    for _ in range(3):
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        response = await async_client.get("/reports/farms/page", params=params, headers=supervisor_auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        seen += [r["farm"]["id"] for r in data["items"]]
+        cursor = data["next_cursor"]
+
+    assert seen == sorted(farm.id for farm in farms)
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_get_farms_report_page_invalid_cursor(
+    async_client: AsyncClient,
+    supervisor_auth_headers: dict,
+):
+    """A malformed cursor is a 400, not a server error."""
+    response = await async_client.get("/reports/farms/page", params={"cursor": "not-a-cursor"}, headers=supervisor_auth_headers)
+    assert response.status_code == 400
+
+    response = await async_client.get("/reports/farms/page", params={"cursor": encode_cursor({"id": "x"})}, headers=supervisor_auth_headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_stream_all_farms_report_matches_list(
+    async_client: AsyncClient,
+    async_session: AsyncSession,
+    setup_soil_texture,
+    supervisor_auth_headers: dict,
+    test_supervisor_user: User,
+    mocker,
+):
+    """The streamed JSON carries the same reports as GET /reports/farms, across several cursor batches."""
+    farms = [make_farm(user_id=test_supervisor_user.id) for _ in range(3)]
+    species = make_species("Tectona grandis", "Teak")
+    async_session.add_all([*farms, species])
+    await async_session.flush()
+    async_session.add(Recommendation(farm_id=farms[1].id, species_id=species.id, rank_overall=1, score_mcda=0.9, key_reasons=["a"]))
+    await async_session.flush()
+    mocker.patch("src.routers.reporting.settings.REPORT_STREAM_BATCH_SIZE", 2)
+
+    listed = await async_client.get("/reports/farms", headers=supervisor_auth_headers)
+    streamed = await async_client.get("/reports/farms/stream", headers=supervisor_auth_headers)
+
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"] == "application/json"
+
+    def without_timestamps(reports):
+        return sorted(({**r, "generated_at": None} for r in reports), key=lambda r: r["farm"]["id"])
+
+    assert without_timestamps(streamed.json()) == without_timestamps(listed.json())
+    assert [r["farm"]["id"] for r in streamed.json()] == sorted(farm.id for farm in farms)
+
+
+@pytest.mark.asyncio
+async def test_stream_all_farms_report_officer_forbidden(
+    async_client: AsyncClient,
+    officer_auth_headers: dict,
+):
+    """Officers cannot stream the all-farms report."""
+    response = await async_client.get("/reports/farms/stream", headers=officer_auth_headers)
+    assert response.status_code == 403
@@ -1,15 +1,19 @@
 import pytest
-from shapely.geometry import Polygon
+from geoalchemy2 import WKTElement
+from shapely.geometry import MultiPolygon, Polygon
+from sqlalchemy import delete, text
 
+from src.models.boundaries import FarmBoundary
+from src.models.farm import Farm
 from src.models.waterways import Waterway
-from src.schemas.constants import RIPARIAN_BUFFER_M
-from src.services.riparian import get_riparian_flags
+from src.schemas.constants import CRS_ANALYSIS, RIPARIAN_BUFFER_M
+from src.services.riparian import get_riparian_flags, get_riparian_flags_for_farms, rebuild_riparian_zones
 
 
 @pytest.fixture(scope="function")
 async def seeded_db(async_session):
     """
-    Insert a single straight waterway line into PostGIS.
+    Insert a single straight waterway line into PostGIS and build its riparian zones.
     CRS: EPSG:4326
     """
 
@@ -21,6 +25,7 @@ async def seeded_db(async_session):
 
     async_session.add(waterway)
     await async_session.flush()
+    await rebuild_riparian_zones(async_session)
 
     yield async_session
 
@@ -57,3 +62,149 @@ async def test_riparian_false_outside_buffer(seeded_db):
 
     assert result["riparian"] is False
     assert result["distance_to_nearest_waterway_m"] >= RIPARIAN_BUFFER_M
+
+
+async def test_rebuild_riparian_zones_replaces_previous_zones(seeded_db):
+    """Test that rebuilding after waterways change drops zones of removed waterways."""
+    farm = Polygon(
+        [
+            (126.6701, -8.6431),
+            (126.6701, -8.6429),
+            (126.6703, -8.6429),
+            (126.6703, -8.6431),
+        ]
+    )
+
+    first = await rebuild_riparian_zones(seeded_db)
+    assert first >= 1
+    assert await rebuild_riparian_zones(seeded_db) == first
+
+    await seeded_db.execute(delete(Waterway))
+    assert await rebuild_riparian_zones(seeded_db) == 0
+
+    result = await get_riparian_flags(seeded_db, farm)
+
+    assert result["riparian"] is False
+    assert result["distance_to_nearest_waterway_m"] is None
+
+
+async def test_distance_uses_nearest_of_several_waterways(seeded_db):
+    """Test that the KNN lookup reports the distance to the closest waterway, not the first inserted."""
+    seeded_db.add(
+        Waterway(
+            name="Far Stream",
+            waterway="stream",
+            geometry=("SRID=4326;LINESTRING (126.6800 -8.6500, 126.6810 -8.6500)"),
+        )
+    )
+    await seeded_db.flush()
+    await rebuild_riparian_zones(seeded_db)
+
+    farm = Polygon(
+        [
+            (126.6720, -8.6450),
+            (126.6720, -8.6445),
+            (126.6725, -8.6445),
+            (126.6725, -8.6450),
+        ]
+    )
+
+    result = await get_riparian_flags(seeded_db, farm)
+
+    # The test river at -8.6430 is ~165 m north; the far stream is over 500 m away
+    assert result["riparian"] is False
+    assert 100 < result["distance_to_nearest_waterway_m"] < 300
+
+
+async def test_riparian_flags_for_farms_matches_single_lookup(seeded_db, test_officer_user):
+    """Test that the set-based lookup returns the per-farm result of get_riparian_flags, keyed by farm ID."""
+    near = Polygon([(126.6701, -8.6431), (126.6701, -8.6429), (126.6703, -8.6429), (126.6703, -8.6431)])
+    far = Polygon([(126.6720, -8.6450), (126.6720, -8.6445), (126.6725, -8.6445), (126.6725, -8.6450)])
+
+    farm_ids = []
+    for polygon in (near, far):
+        farm = Farm(
+            rainfall_mm=1000,
+            temperature_celsius=25,
+            elevation_m=100,
+            ph=6.5,
+            soil_texture_id=1,
+            area_ha=1,
+            latitude=-8.643,
+            longitude=126.67,
+            coastal=False,
+            riparian=False,
+            nitrogen_fixing=False,
+            shade_tolerant=False,
+            bank_stabilising=False,
+            slope=5,
+            user_id=test_officer_user.id,
+        )
+        seeded_db.add(farm)
+        await seeded_db.flush()
+        seeded_db.add(FarmBoundary(id=farm.id, boundary=WKTElement(MultiPolygon([polygon]).wkt, srid=4326)))
+        farm_ids.append(farm.id)
+    await seeded_db.flush()
+
+    # An ID without a boundary is left out
+    result = await get_riparian_flags_for_farms(seeded_db, farm_ids + [999999])
+
+    assert set(result) == set(farm_ids)
+    assert result[farm_ids[0]] == await get_riparian_flags(seeded_db, near)
+    assert result[farm_ids[1]] == await get_riparian_flags(seeded_db, far)
+    assert result[farm_ids[0]]["riparian"] is True
+    assert result[farm_ids[1]]["riparian"] is False
+
+
+async def test_riparian_flags_for_farms_empty(seeded_db):
+    """Test that an empty ID list returns an empty dict."""
+    assert await get_riparian_flags_for_farms(seeded_db, []) == {}
+
+
+async def test_nearest_waterway_distance_is_exact_beyond_knn_candidates(seeded_db, test_officer_user):
+    """Test that a waterway ranked after the KNN candidates in degrees, but nearer in metres, sets the distance."""
+    farm_polygon = Polygon([(126.8000, -8.7010), (126.8000, -8.7000), (126.8010, -8.7000), (126.8010, -8.7010)])
+
+    # Six waterways 0.0090° north (~995 m) fill the KNN candidates; one 0.00903° east is
+    # further in degrees but nearer in metres, since a degree of longitude is the shorter one
+    for offset in range(6):
+        start = 126.7990 + offset * 0.0001
+        seeded_db.add(Waterway(name=f"North {offset}", waterway="stream", geometry=f"SRID=4326;LINESTRING ({start} -8.6910, {start + 0.0020} -8.6910)"))
+    seeded_db.add(Waterway(name="East", waterway="stream", geometry="SRID=4326;LINESTRING (126.81003 -8.7020, 126.81003 -8.6990)"))
+    await seeded_db.flush()
+
+    farm = Farm(
+        rainfall_mm=1000,
+        temperature_celsius=25,
+        elevation_m=100,
+        ph=6.5,
+        soil_texture_id=1,
+        area_ha=1,
+        latitude=-8.7005,
+        longitude=126.8005,
+        coastal=False,
+        riparian=False,
+        nitrogen_fixing=False,
+        shade_tolerant=False,
+        bank_stabilising=False,
+        slope=5,
+        user_id=test_officer_user.id,
+    )
+    seeded_db.add(farm)
+    await seeded_db.flush()
+    seeded_db.add(FarmBoundary(id=farm.id, boundary=WKTElement(MultiPolygon([farm_polygon]).wkt, srid=4326)))
+    await seeded_db.flush()
+
+    exact = await seeded_db.execute(
+        text(
+            """
+            SELECT min(ST_Distance(ST_Boundary(ST_Transform(ST_GeomFromText(:farm, 4326), :crs)), ST_Transform(geometry, :crs)))
+            FROM waterways
+            """
+        ),
+        {"farm": farm_polygon.wkt, "crs": CRS_ANALYSIS},
+    )
+    expected = round(exact.scalar_one(), 1)
+
+    assert (await get_riparian_flags(seeded_db, farm_polygon))["distance_to_nearest_waterway_m"] == expected
+    assert (await get_riparian_flags_for_farms(seeded_db, [farm.id]))[farm.id]["distance_to_nearest_waterway_m"] == expected
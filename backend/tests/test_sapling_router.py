@@ -1,12 +1,17 @@
+import io
 from unittest.mock import patch
 
+import geopandas as gpd
 import pytest
 from geoalchemy2 import WKTElement
 from sqlalchemy import text
 
+from src.config import settings
 from src.models.boundaries import FarmBoundary
 from src.models.farm import Farm
 from src.models.planting_estimates import PlantingEstimate
+from src.routers.sapling_estimation import negotiate_grid_media_type
+from src.services.sapling_estimation import encode_planting_grid, write_planting_estimates
 
 
 @pytest.fixture
@@ -142,6 +147,34 @@ async def test_cache_hit(
     assert request2.json() == cache  # Second request should return the same result as cache
 
 
+async def test_calculate_with_triangular_lattice(
+    async_client,
+    setup_farm,
+    officer_auth_headers,
+):
+    payload = {"farm_id": setup_farm.id, "spacing_x": 10, "spacing_y": 10, "max_slope": 15}
+
+    square = await async_client.post("/sapling_estimation/calculate", json=payload, headers=officer_auth_headers)
+    triangular = await async_client.post("/sapling_estimation/calculate", json={**payload, "lattice": "triangular"}, headers=officer_auth_headers)
+
+    assert square.status_code == 200
+    assert triangular.status_code == 200
+    # Cached separately, and the triangular lattice fits more saplings at the same spacing
+    assert triangular.json()["pre_slope_count"] > square.json()["pre_slope_count"]
+
+
+async def test_calculate_rejects_unknown_lattice(
+    async_client,
+    setup_farm,
+    officer_auth_headers,
+):
+    payload = {"farm_id": setup_farm.id, "spacing_x": 10, "spacing_y": 10, "max_slope": 15, "lattice": "circular"}
+
+    response = await async_client.post("/sapling_estimation/calculate", json=payload, headers=officer_auth_headers)
+
+    assert response.status_code == 422
+
+
 async def test_get_planting_grid_returns_geojson(
     async_client,
     async_session,
@@ -167,6 +200,37 @@ async def test_get_planting_grid_returns_geojson(
     assert data["features"][0]["geometry"]["type"] == "Point"
 
 
+async def test_get_packed_planting_grid_with_etag(
+    async_client,
+    async_session,
+    setup_farm,
+    officer_auth_headers,
+    monkeypatch,
+):
+    farm = setup_farm
+    monkeypatch.setattr(settings, "PLANTING_GRID_STORAGE", "packed")
+
+    grid = gpd.GeoDataFrame(geometry=gpd.points_from_xy([125.001, 125.0015], [-9.001, -9.0015]), crs="EPSG:4326")
+    await write_planting_estimates(async_session, farm.id, grid, [5.0, 7.5])
+    await async_session.commit()
+
+    response = await async_client.get(f"/sapling_estimation/{farm.id}/grid", headers=officer_auth_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [feature["properties"]["slope"] for feature in data["features"]] == [5.0, 7.5]
+    assert data["features"][0]["geometry"] == {"type": "Point", "coordinates": [125.001, -9.001]}
+
+    etag = response.headers["etag"]
+    unchanged = await async_client.get(
+        f"/sapling_estimation/{farm.id}/grid",
+        headers={**officer_auth_headers, "If-None-Match": etag},
+    )
+
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+
+
 async def test_get_planting_grid_404_when_no_estimates(
     async_client,
     setup_farm,
@@ -188,3 +252,65 @@ async def test_get_planting_grid_requires_auth(
     response = await async_client.get(f"/sapling_estimation/{farm.id}/grid")
 
     assert response.status_code == 401
+
+
+async def test_get_planting_grid_as_flatgeobuf(
+    async_client,
+    async_session,
+    setup_farm,
+    officer_auth_headers,
+):
+    farm = setup_farm
+
+    grid = gpd.GeoDataFrame(geometry=gpd.points_from_xy([125.001, 125.0015], [-9.001, -9.0015]), crs="EPSG:4326")
+    await write_planting_estimates(async_session, farm.id, grid, [5.0, 7.5])
+    await async_session.commit()
+
+    response = await async_client.get(
+        f"/sapling_estimation/{farm.id}/grid",
+        headers={**officer_auth_headers, "Accept": "application/flatgeobuf"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/flatgeobuf"
+    decoded = gpd.read_file(io.BytesIO(response.content))
+    assert sorted(decoded["slope"]) == [5.0, 7.5]
+
+
+async def test_get_planting_grid_406_for_unsupported_format(
+    async_client,
+    setup_farm,
+    officer_auth_headers,
+):
+    farm = setup_farm
+
+    response = await async_client.get(
+        f"/sapling_estimation/{farm.id}/grid",
+        headers={**officer_auth_headers, "Accept": "text/csv"},
+    )
+
+    assert response.status_code == 406
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, "application/json"),
+        ("*/*", "application/json"),
+        ("application/flatgeobuf", "application/flatgeobuf"),
+        ("application/flatgeobuf;q=0.2, application/geo+json", "application/geo+json"),
+        ("text/csv", None),
+    ],
+)
+def test_negotiate_grid_media_type(accept, expected):
+    assert negotiate_grid_media_type(accept) == expected
+
+
+def test_encode_planting_grid_flatgeobuf_round_trip():
+    content = encode_planting_grid({"xs": [125.0, 125.001], "ys": [-9.0, -9.001], "slopes": [1.5, 3.0]}, "flatgeobuf")
+
+    decoded = gpd.read_file(io.BytesIO(content))
+
+    assert len(decoded) == 2
+    assert decoded.crs.to_epsg() == 4326
+    assert sorted(decoded["slope"]) == [1.5, 3.0]
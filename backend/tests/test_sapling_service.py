@@ -1,10 +1,20 @@
+from unittest.mock import AsyncMock
+
+import geopandas as gpd
+import numpy as np
 import pytest
+import rasterio
 from geoalchemy2 import WKTElement
+from rasterio.transform import from_origin
+from sapling_estimation.slope_raster import build_slope_raster
+from shapely.geometry import box
 from sqlalchemy import text
 
+from src.config import settings
 from src.models.boundaries import FarmBoundary
 from src.models.farm import Farm
-from src.services.sapling_estimation import SaplingEstimationService
+from src.services import sapling_estimation as sapling_service
+from src.services.sapling_estimation import SaplingEstimationService, estimation_cache, get_dem_window, write_planting_estimates, write_planting_grids
 
 
 @pytest.mark.asyncio
@@ -93,3 +103,193 @@ async def test_run_estimation_basic(async_session, setup_soil_texture):
     )
 
     assert rows.scalar_one() == result["aligned_count"]
+
+
+@pytest.mark.asyncio
+async def test_run_estimation_reuses_cached_terrain(async_session, setup_soil_texture):
+    estimation_cache.clear()
+    await async_session.execute(text("TRUNCATE dem_table RESTART IDENTITY;"))
+
+    await async_session.execute(
+        text(
+            """
+            INSERT INTO dem_table (rast)
+            VALUES (
+                ST_AddBand(
+                    ST_MakeEmptyRaster(5, 5, 125, -8.9995, 0.001, -0.001, 0, 0, 4326),
+                    1,
+                    '32BF',
+                    100
+                )
+            );
+            """
+        )
+    )
+
+    farm = Farm(
+        rainfall_mm=1000,
+        temperature_celsius=25,
+        elevation_m=100,
+        ph=6.5,
+        soil_texture_id=1,
+        area_ha=10,
+        latitude=0,
+        longitude=0,
+        coastal=False,
+        riparian=False,
+        nitrogen_fixing=False,
+        shade_tolerant=False,
+        bank_stabilising=False,
+        slope=5,
+    )
+    async_session.add(farm)
+    await async_session.flush()
+    await async_session.refresh(farm)
+
+    async_session.add(
+        FarmBoundary(
+            id=farm.id,
+            external_id=farm.id,
+            boundary=WKTElement("MULTIPOLYGON (((125 -9, 125 -9.002, 125.002 -9.002, 125.002 -9, 125 -9)))", srid=4326),
+        )
+    )
+    await async_session.flush()
+
+    first = await SaplingEstimationService.run_estimation(async_session, farm_id=farm.id, spacing_x=10, spacing_y=10, max_slope=15)
+
+    # With the DEM gone, a new max_slope can only succeed from the cached terrain and layout
+    await async_session.execute(text("TRUNCATE dem_table RESTART IDENTITY;"))
+    second = await SaplingEstimationService.run_estimation(async_session, farm_id=farm.id, spacing_x=10, spacing_y=10, max_slope=20)
+
+    assert second.get("status") != "failed", f"Service failed: {second}"
+    assert second["pre_slope_count"] == first["pre_slope_count"]
+    assert second["optimal_angle"] == first["optimal_angle"]
+    assert estimation_cache.cache_info()["layout_hits"] == 1
+
+    estimation_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_write_planting_estimates_replaces_points(async_session, setup_soil_texture):
+    farm = Farm(
+        rainfall_mm=1000,
+        temperature_celsius=25,
+        elevation_m=100,
+        ph=6.5,
+        soil_texture_id=1,
+        area_ha=10,
+        latitude=0,
+        longitude=0,
+        coastal=False,
+        riparian=False,
+        nitrogen_fixing=False,
+        shade_tolerant=False,
+        bank_stabilising=False,
+        slope=5,
+    )
+    async_session.add(farm)
+    await async_session.flush()
+
+    first_grid = gpd.GeoDataFrame(geometry=gpd.points_from_xy([125.0, 125.001, 125.002], [-9.0, -9.0, -9.0]), crs="EPSG:4326")
+    await write_planting_estimates(async_session, farm.id, first_grid, [1.0, 2.0, 3.0])
+
+    second_grid = gpd.GeoDataFrame(geometry=gpd.points_from_xy([125.0005, 125.0015], [-9.001, -9.001]), crs="EPSG:4326")
+    written = await write_planting_estimates(async_session, farm.id, second_grid, [4.5, 6.0])
+
+    rows = await async_session.execute(
+        text("SELECT slope, ST_X(geometry) AS x, ST_SRID(geometry) AS srid FROM planting_estimates WHERE farm_id = :id ORDER BY slope"),
+        {"id": farm.id},
+    )
+    rows = rows.fetchall()
+
+    assert written == 2
+    assert [row.slope for row in rows] == [4.5, 6.0]
+    assert rows[0].x == pytest.approx(125.0005)
+    assert {row.srid for row in rows} == {4326}
+
+
+@pytest.mark.asyncio
+async def test_get_dem_window_from_local_tile_store(tmp_path, monkeypatch):
+    dem_path = tmp_path / "DEM.tif"
+    with rasterio.open(
+        dem_path,
+        "w",
+        driver="GTiff",
+        height=20,
+        width=20,
+        count=1,
+        dtype="float32",
+        crs="EPSG:4326",
+        transform=from_origin(125, -8.99, 0.001, 0.001),
+    ) as dst:
+        dst.write(np.full((20, 20), 100, dtype=np.float32), 1)
+
+    monkeypatch.setattr(settings, "DEM_SOURCE", "local")
+    monkeypatch.setattr(settings, "DEM_PATH", str(dem_path))
+    monkeypatch.setattr(settings, "SLOPE_PATH", str(tmp_path / "missing_slope.tif"))
+
+    # The local source never touches the session
+    window = await get_dem_window(None, box(125.001, -9.002, 125.003, -9.0))
+
+    assert window is not None
+    assert window["dem_crs"] == "EPSG:4326"
+    assert window["pixel_width"] == pytest.approx(0.001)
+    assert np.all(window["dem_array"] == 100)
+
+    # Once the slope raster is built, windows carry precomputed slope instead of elevation
+    slope_path = build_slope_raster(dem_path, tmp_path / "slope.tif")
+    monkeypatch.setattr(settings, "SLOPE_PATH", str(slope_path))
+
+    window = await get_dem_window(None, box(125.001, -9.002, 125.003, -9.0))
+
+    assert "dem_array" not in window
+    assert np.all(window["slope_array"] == 0)
+
+
+async def test_terrain_cache_cleared_after_dem_reimport(tmp_path, monkeypatch):
+    dem_path = tmp_path / "dem.tif"
+    dem_path.write_bytes(b"first import")
+    monkeypatch.setattr(settings, "DEM_SOURCE", "local")
+    monkeypatch.setattr(settings, "DEM_PATH", str(dem_path))
+    monkeypatch.setattr(settings, "SLOPE_PATH", str(tmp_path / "missing_slope.tif"))
+    monkeypatch.setattr(settings, "SAPLING_TERRAIN_CHECK_SECONDS", 0)
+    monkeypatch.setattr(sapling_service, "_terrain_revision", None)
+    monkeypatch.setattr(sapling_service, "_terrain_checked_at", 0.0)
+
+    farm = box(125.0, -9.0, 125.001, -8.999)
+    key = estimation_cache.farm_key(farm, "EPSG:4326")
+    estimation_cache.put_farm(key, farm, {"slope_array": np.zeros((2, 2))})
+
+    # The first check only records the revision
+    assert await sapling_service.refresh_terrain_cache(None) is False
+    assert estimation_cache.has_terrain(farm)
+
+    dem_path.write_bytes(b"second import, new terrain")
+
+    assert await sapling_service.refresh_terrain_cache(None) is True
+    assert not estimation_cache.has_terrain(farm)
+    assert await sapling_service.refresh_terrain_cache(None) is False
+
+
+async def test_write_planting_grids_uses_one_statement_per_step(monkeypatch):
+    monkeypatch.setattr(settings, "PLANTING_GRID_STORAGE", "rows")
+    db = AsyncMock()
+    grids = {1: ([0.0, 1.0], [0.0, 1.0], [2.0, None]), 2: ([5.0], [5.0], [3.0]), 3: ([], [], [])}
+
+    assert await write_planting_grids(db, grids) == 3
+
+    # DELETE planting_estimates, DELETE planting_grids, one INSERT for every point of every farm
+    assert db.execute.await_count == 3
+    insert_params = db.execute.await_args_list[2].args[1]
+    assert insert_params["farm_ids"] == [1, 1, 2]
+    assert insert_params["slopes"] == [2.0, None, 3.0]
+
+
+async def test_write_planting_grids_packed_inserts_one_record_per_farm(monkeypatch):
+    monkeypatch.setattr(settings, "PLANTING_GRID_STORAGE", "packed")
+    db = AsyncMock()
+
+    await write_planting_grids(db, {1: ([0.0], [0.0], [2.0]), 2: ([5.0], [5.0], [3.0])})
+
+    assert db.execute.await_count == 3
+    assert [params["farm_id"] for params in db.execute.await_args_list[2].args[1]] == [1, 2]
@@ -0,0 +1,85 @@
+"""Tests for the in-process soil polygon index (SOIL_LOOKUP_SOURCE=memory)."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from shapely.geometry import box
+
+from src.services import soil_index
+from src.services.soil_index import SoilPolygonIndex
+from src.services.soil_ph import get_soil_ph_for_point, get_soil_ph_for_points
+from src.services.soil_texture_spatial import get_soil_texture_for_points
+
+
+@pytest.fixture
+def index():
+    # Two overlapping squares (lon 126-127 and 126.5-127.5) plus a disjoint one
+    return SoilPolygonIndex(
+        [box(126, -9, 127, -8), box(126.5, -9, 127.5, -8), box(130, -9, 131, -8)],
+        [6.1, 7.2, 5.5],
+    )
+
+
+def test_lookup_point(index):
+    assert index.lookup(-8.5, 126.2) == 6.1
+    assert index.lookup(-8.5, 130.5) == 5.5
+    assert index.lookup(-8.5, 128.0) is None
+
+
+def test_lookup_overlap_prefers_lowest_id(index):
+    assert index.lookup(-8.5, 126.7) == 6.1
+
+
+def test_lookup_many_matches_lookup(index):
+    lats = [-8.5, -8.5, -8.5, -8.5, -10.0]
+    lons = [126.2, 126.7, 127.2, 130.5, 126.2]
+
+    assert index.lookup_many(lats, lons) == [index.lookup(lat, lon) for lat, lon in zip(lats, lons)]
+    assert index.lookup_many(lats, lons) == [6.1, 6.1, 7.2, 5.5, None]
+
+
+@pytest.mark.asyncio
+@patch("src.services.soil_ph.settings")
+async def test_memory_source_skips_postgis(mock_settings, index):
+    mock_settings.SOIL_LOOKUP_SOURCE = "memory"
+    db = AsyncMock()
+    texture_index = SoilPolygonIndex([box(126, -9, 127, -8)], ["loam"])
+
+    with patch("src.services.soil_ph.get_soil_indexes", new=AsyncMock(return_value=(index, texture_index))):
+        assert await get_soil_ph_for_point(db, -8.5, 126.2) == 6.1
+        assert await get_soil_ph_for_points(db, {1: (-8.5, 127.2), 2: (-8.5, 128.0)}) == {1: 7.2, 2: None}
+
+    with (
+        patch("src.services.soil_texture_spatial.settings", mock_settings),
+        patch("src.services.soil_texture_spatial.get_soil_indexes", new=AsyncMock(return_value=(index, texture_index))),
+    ):
+        assert await get_soil_texture_for_points(db, {3: (-8.5, 126.2)}) == {3: "loam"}
+
+    db.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_indexes_reload_after_reimport():
+    soil_index.invalidate_soil_indexes()
+    signature = MagicMock()
+    signature.one.return_value = (10, 20)
+    db = AsyncMock()
+    db.execute.return_value = signature
+    loaded = SoilPolygonIndex([box(0, 0, 1, 1)], [6.0])
+
+    with (
+        patch("src.services.soil_index._load_layer", new=AsyncMock(return_value=loaded)) as mock_load,
+        patch("src.services.soil_index.settings") as mock_settings,
+    ):
+        mock_settings.SOIL_INDEX_REFRESH_SECONDS = 0
+
+        await soil_index.get_soil_indexes(db)
+        await soil_index.get_soil_indexes(db)
+        assert mock_load.await_count == 2  # pH and texture, loaded once
+
+        # A re-import replaces every row, so the max IDs change
+        signature.one.return_value = (11, 20)
+        await soil_index.get_soil_indexes(db)
+        assert mock_load.await_count == 4
+
+    soil_index.invalidate_soil_indexes()
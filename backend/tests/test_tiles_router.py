@@ -0,0 +1,112 @@
+import math
+
+import pytest
+from geoalchemy2 import WKTElement
+
+from src.models.boundaries import FarmBoundary
+from src.models.farm import Farm
+from src.services.tiles import is_valid_tile
+
+
+def lonlat_to_tile(lon, lat, z):
+    n = 2**z
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return x, y
+
+
+@pytest.fixture
+async def setup_boundary(async_session, setup_soil_texture, test_officer_user):
+    farm = Farm(
+        rainfall_mm=1000,
+        temperature_celsius=25,
+        elevation_m=100,
+        ph=6.5,
+        soil_texture_id=1,
+        area_ha=10,
+        latitude=-9.001,
+        longitude=125.001,
+        coastal=False,
+        riparian=False,
+        nitrogen_fixing=False,
+        shade_tolerant=False,
+        bank_stabilising=False,
+        slope=5,
+        user_id=test_officer_user.id,
+    )
+    async_session.add(farm)
+    await async_session.flush()
+
+    async_session.add(
+        FarmBoundary(
+            id=farm.id,
+            external_id=farm.id,
+            boundary=WKTElement("MULTIPOLYGON (((125 -9, 125 -9.002, 125.002 -9.002, 125.002 -9, 125 -9)))", srid=4326),
+        )
+    )
+    await async_session.commit()
+    return farm
+
+
+async def test_boundary_tile_returns_mvt_with_etag(async_client, setup_boundary, officer_auth_headers):
+    x, y = lonlat_to_tile(125.001, -9.001, 14)
+
+    response = await async_client.get(f"/tiles/boundary/14/{x}/{y}.mvt", headers=officer_auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    assert len(response.content) > 0
+    assert "max-age" in response.headers["cache-control"]
+
+    unchanged = await async_client.get(
+        f"/tiles/boundary/14/{x}/{y}.mvt",
+        headers={**officer_auth_headers, "If-None-Match": response.headers["etag"]},
+    )
+
+    assert unchanged.status_code == 304
+
+
+async def test_tile_without_features_returns_204(async_client, setup_boundary, officer_auth_headers):
+    x, y = lonlat_to_tile(0.0, 0.0, 14)
+
+    response = await async_client.get(f"/tiles/boundary/14/{x}/{y}.mvt", headers=officer_auth_headers)
+
+    assert response.status_code == 204
+
+
+async def test_point_layer_below_min_zoom_returns_204(async_client, officer_auth_headers):
+    response = await async_client.get("/tiles/planting_estimates/5/27/15.mvt", headers=officer_auth_headers)
+
+    assert response.status_code == 204
+
+
+async def test_unknown_layer_returns_404(async_client, officer_auth_headers):
+    response = await async_client.get("/tiles/users/0/0/0.mvt", headers=officer_auth_headers)
+
+    assert response.status_code == 404
+
+
+async def test_tile_out_of_range_returns_400(async_client, officer_auth_headers):
+    response = await async_client.get("/tiles/boundary/2/4/0.mvt", headers=officer_auth_headers)
+
+    assert response.status_code == 400
+
+
+async def test_tiles_require_auth(async_client):
+    response = await async_client.get("/tiles/boundary/0/0/0.mvt")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize(
+    "z, x, y, expected",
+    [
+        (0, 0, 0, True),
+        (14, 16383, 16383, True),
+        (14, 16384, 0, False),
+        (-1, 0, 0, False),
+        (23, 0, 0, False),
+    ],
+)
+def test_is_valid_tile(z, x, y, expected):
+    assert is_valid_tile(z, x, y) == expected
@@ -1,3 +1,3 @@
-from imputation.imputation_service import TARGET_FEATURES, impute_missing
+from imputation.imputation_service import TARGET_FEATURES, cache_info, clear_cache, impute_missing, impute_missing_batch, warm_up
 
-__all__ = ["impute_missing", "TARGET_FEATURES"]
+__all__ = ["impute_missing", "impute_missing_batch", "warm_up", "cache_info", "clear_cache", "TARGET_FEATURES"]
@@ -10,6 +10,9 @@ Expected input keys (matching training feature names):
     Targets (may be None):             elevation_m, slope, temperature_celsius, rainfall_mm, ph
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 import joblib
@@ -25,16 +28,34 @@ _MODELS_DIR = Path(__file__).parent.parent / "models" / "imputation"
 BASE_FEATURES = ["latitude", "longitude", "area_ha", "coastal", "riparian"]
 TARGET_FEATURES = ["elevation_m", "slope", "temperature_celsius", "rainfall_mm", "ph"]
 
+# Rows per transform call in impute_missing_batch
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Imputation results memoised per rounded input vector (LRU), and the rounding applied to
+# the key (6 decimals is ~0.1 m of latitude/longitude)
+CACHE_MAX_ENTRIES = 10_000
+CACHE_KEY_DECIMALS = 6
+
 # ---------------------------------------------------------------------------
 # Lazy-loaded model state
 # ---------------------------------------------------------------------------
 
 _imputer = None
 _feature_columns: list[str] | None = None
+_model_hash: str | None = None
+
+# ---------------------------------------------------------------------------
+# Result cache
+# ---------------------------------------------------------------------------
+
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_hits = 0
+_cache_misses = 0
 
 
 def _load() -> None:
-    global _imputer, _feature_columns
+    global _imputer, _feature_columns, _model_hash
     if _imputer is not None:
         return
     pipeline_path = _MODELS_DIR / "imputation_pipeline.joblib"
@@ -43,6 +64,33 @@ def _load() -> None:
         raise RuntimeError(f"Imputation model files not found in {_MODELS_DIR}. Run the imputation_model_training notebook and save the artefacts first.")
     _imputer = joblib.load(pipeline_path)
     _feature_columns = joblib.load(columns_path)
+    _model_hash = _file_hash(pipeline_path)
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def warm_up() -> None:
+    """
+    Load the model now and run one dummy transform, so the first real request
+    does not pay for loading and the pipeline's first-call setup.
+
+    Called before worker processes fork (e.g. at import under gunicorn --preload),
+    the loaded forest is inherited copy-on-write instead of loaded per worker.
+
+    Raises:
+        RuntimeError: If model artefacts have not been saved yet.
+    """
+    _load()
+
+    # A central Timor-Leste farm with every target missing exercises all estimators
+    dummy = {"latitude": -8.8, "longitude": 125.9, "area_ha": 1.0, "coastal": False, "riparian": False}
+    _imputer.transform(pd.DataFrame(_feature_matrix([dummy]), columns=_feature_columns))
 
 
 # ---------------------------------------------------------------------------
@@ -83,30 +131,134 @@ def impute_missing(profile: dict) -> tuple[dict, list[str]]:
         # filled["elevation_m"] is now a float
         # imputed == ["elevation_m", "slope", "rainfall_mm"]
     """
+    return impute_missing_batch([profile])[0]
+
+
+def _feature_matrix(profiles: list[dict]) -> np.ndarray:
+    """Float matrix of the profiles in _feature_columns order; None becomes NaN."""
+    matrix = np.full((len(profiles), len(_feature_columns)), np.nan)
+    for i, profile in enumerate(profiles):
+        for j, col in enumerate(_feature_columns):
+            value = profile.get(col)
+            if col in ("coastal", "riparian"):
+                matrix[i, j] = int(bool(value))
+            elif value is not None:
+                matrix[i, j] = float(value)
+    return matrix
+
+
+def impute_missing_batch(profiles: list[dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> list[tuple[dict, list[str]]]:
+    """
+    Fill missing target values in many farm profiles with one transform per chunk.
+
+    Profiles with missing targets are stacked into a single feature matrix and
+    imputed with one _imputer.transform call per chunk_size rows, instead of
+    one call per farm. Complete profiles are returned as copies without
+    touching the model, and input vectors seen before (rounded to
+    CACHE_KEY_DECIMALS, for the same model file) are served from the result
+    cache; see cache_info().
+
+    Args:
+        profiles:   Dicts with keys matching the training feature names.
+        chunk_size: Maximum rows per transform call, bounding peak memory.
+
+    Returns:
+        One (filled profile copy, imputed field names) tuple per input profile, in input order.
+
+    Raises:
+        ValueError:  If any profile has a base feature that is None or missing.
+        RuntimeError: If model artefacts have not been saved yet.
+    """
     _load()
 
-    missing_base = [f for f in BASE_FEATURES if profile.get(f) is None]
-    if missing_base:
-        raise ValueError(f"Base features required for imputation are missing or None: {missing_base}")
+    for i, profile in enumerate(profiles):
+        missing_base = [f for f in BASE_FEATURES if profile.get(f) is None]
+        if missing_base:
+            raise ValueError(f"Base features required for imputation are missing or None (profile {i}): {missing_base}")
+
+    results = [(profile.copy(), []) for profile in profiles]
+    pending = [i for i, profile in enumerate(profiles) if any(profile.get(f) is None for f in TARGET_FEATURES)]
+    if not pending:
+        return results
+
+    matrix = _feature_matrix([profiles[i] for i in pending])
+
+    # Rows with the same rounded input vector share one cache entry and one matrix row
+    imputed = {}
+    misses: dict[tuple, list[int]] = {}
+    for row, i in enumerate(pending):
+        key = _cache_key(matrix[row])
+        hit = _cache_get(key)
+        if hit is not None:
+            imputed[i] = hit
+        else:
+            misses.setdefault(key, []).append(row)
+
+    keys = list(misses)
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys[start : start + chunk_size]
+        # Column names keep the feature-name check of the fitted pipeline
+        df = pd.DataFrame(matrix[[misses[key][0] for key in chunk]], columns=_feature_columns)
+        imputed_array = _imputer.transform(df)
+
+        for key, imputed_values in zip(chunk, imputed_array):
+            imputed_row = dict(zip(_feature_columns, imputed_values))
+            first = pending[misses[key][0]]
+            values = {}
+            for field in TARGET_FEATURES:
+                value = imputed_row.get(field)
+                if profiles[first].get(field) is None and value is not None and not np.isnan(value):
+                    values[field] = round(float(value), 3)
+
+            _cache_put(key, values)
+            for row in misses[key]:
+                imputed[pending[row]] = values
+
+    for i, values in imputed.items():
+        filled_profile, imputed_fields = results[i]
+        for field in TARGET_FEATURES:
+            if field in values:
+                filled_profile[field] = values[field]
+                imputed_fields.append(field)
+
+    return results
+
+
+def _cache_key(row: np.ndarray) -> tuple:
+    """Model hash plus the rounded feature vector, missing values as None."""
+    return (_model_hash, *(None if np.isnan(v) else round(float(v), CACHE_KEY_DECIMALS) for v in row))
+
+
+def _cache_get(key: tuple) -> dict | None:
+    global _cache_hits, _cache_misses
+    with _cache_lock:
+        values = _cache.get(key)
+        if values is None:
+            _cache_misses += 1
+            return None
+        _cache.move_to_end(key)
+        _cache_hits += 1
+        return values
+
 
-    missing_fields = [f for f in TARGET_FEATURES if profile.get(f) is None]
-    if not missing_fields:
-        return profile.copy(), []
+def _cache_put(key: tuple, values: dict) -> None:
+    with _cache_lock:
+        _cache[key] = values
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
 
-    row = {col: profile.get(col) for col in _feature_columns}
-    row["coastal"] = int(bool(row.get("coastal", False)))
-    row["riparian"] = int(bool(row.get("riparian", False)))
 
-    df = pd.DataFrame([row])[_feature_columns]
-    imputed_array = _imputer.transform(df)
-    imputed_row = dict(zip(_feature_columns, imputed_array[0]))
+def cache_info() -> dict:
+    """Hit/miss counters (per imputed row) and size of the result cache."""
+    with _cache_lock:
+        return {"hits": _cache_hits, "misses": _cache_misses, "size": len(_cache), "max_size": CACHE_MAX_ENTRIES}
 
-    filled_profile = profile.copy()
-    imputed_fields = []
-    for field in missing_fields:
-        value = imputed_row.get(field)
-        if value is not None and not np.isnan(value):
-            filled_profile[field] = round(float(value), 3)
-            imputed_fields.append(field)
 
-    return filled_profile, imputed_fields
+def clear_cache() -> None:
+    """Empty the result cache and reset its counters."""
+    global _cache_hits, _cache_misses
+    with _cache_lock:
+        _cache.clear()
+        _cache_hits = 0
+        _cache_misses = 0
@@ -53,6 +53,8 @@ def _patch_models(mocker, return_values: dict | None = None):
     """Inject mock imputer and feature columns into the service module."""
     svc._imputer = _make_mock_imputer(return_values or {})
     svc._feature_columns = FEATURE_COLUMNS
+    svc._model_hash = "test"
+    svc.clear_cache()
     mocker.patch("imputation.imputation_service._load")
 
 
@@ -157,3 +159,155 @@ def test_missing_model_files_raise_runtime_error(mocker, tmp_path):
     profile = {**BASE, "elevation_m": None, "slope": 10.0, "temperature_celsius": 24.0, "rainfall_mm": 1500, "ph": 6.5}
     with pytest.raises(RuntimeError, match="not found"):
         svc.impute_missing(profile)
+
+
+# ---------------------------------------------------------------------------
+# Tests — batch imputation
+# ---------------------------------------------------------------------------
+
+
+class _RecordingImputer:
+    """Fills every NaN with 100 + row index and records the size of each transform call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transform(self, df):
+        self.calls.append(len(df))
+        matrix = df.to_numpy(dtype=float, copy=True)
+        rows, cols = np.where(np.isnan(matrix))
+        matrix[rows, cols] = 100 + rows
+        return matrix
+
+
+def _patch_recording(mocker):
+    imputer = _RecordingImputer()
+    svc._imputer = imputer
+    svc._feature_columns = FEATURE_COLUMNS
+    svc._model_hash = "test"
+    svc.clear_cache()
+    mocker.patch("imputation.imputation_service._load")
+    return imputer
+
+
+def test_batch_imputes_all_rows_in_one_transform(mocker):
+    imputer = _patch_recording(mocker)
+    complete = {**BASE, "elevation_m": 500, "slope": 10.0, "temperature_celsius": 24.0, "rainfall_mm": 1500, "ph": 6.5}
+    profiles = [
+        {**complete, "elevation_m": None},
+        complete,
+        {**complete, "slope": None, "ph": None},
+    ]
+
+    results = svc.impute_missing_batch(profiles)
+
+    # Only the two incomplete profiles reach the model, in a single call
+    assert imputer.calls == [2]
+    assert results[0] == ({**complete, "elevation_m": 100.0}, ["elevation_m"])
+    assert results[1] == (complete, [])
+    assert results[1][0] is not complete
+    assert results[2] == ({**complete, "slope": 101.0, "ph": 101.0}, ["slope", "ph"])
+
+
+def test_batch_matches_single_profile_imputation(mocker):
+    _patch_recording(mocker)
+    profile = {**BASE, "elevation_m": None, "slope": 10.0, "temperature_celsius": 24.0, "rainfall_mm": None, "ph": 6.5}
+
+    assert svc.impute_missing_batch([profile]) == [svc.impute_missing(profile)]
+
+
+def test_batch_chunks_large_inputs(mocker):
+    imputer = _patch_recording(mocker)
+    profiles = [{**BASE, "latitude": -8.5 - i / 100, "elevation_m": None, "slope": 10.0, "temperature_celsius": 24.0, "rainfall_mm": 1500, "ph": 6.5} for i in range(5)]
+
+    results = svc.impute_missing_batch(profiles, chunk_size=2)
+
+    assert imputer.calls == [2, 2, 1]
+    assert [filled["elevation_m"] for filled, _ in results] == [100.0, 101.0, 100.0, 101.0, 100.0]
+
+
+def test_batch_missing_base_feature_names_profile(mocker):
+    _patch_recording(mocker)
+    profiles = [
+        {**BASE, "elevation_m": None, "slope": 10.0, "temperature_celsius": 24.0, "rainfall_mm": 1500, "ph": 6.5},
+        {**BASE, "area_ha": None, "elevation_m": None, "slope": 10.0, "temperature_celsius": 24.0, "rainfall_mm": 1500, "ph": 6.5},
+    ]
+    with pytest.raises(ValueError, match=r"profile 1.*area_ha"):
+        svc.impute_missing_batch(profiles)
+
+
+# ---------------------------------------------------------------------------
+# Tests — warm-up
+# ---------------------------------------------------------------------------
+
+
+def test_warm_up_loads_model_and_runs_dummy_transform(mocker):
+    imputer = _patch_recording(mocker)
+
+    svc.warm_up()
+
+    svc._load.assert_called_once_with()
+    assert imputer.calls == [1]
+
+
+def test_warm_up_without_artefacts_raises(mocker, tmp_path):
+    svc._imputer = None
+    svc._feature_columns = None
+    mocker.patch("imputation.imputation_service._MODELS_DIR", tmp_path)
+    with pytest.raises(RuntimeError, match="not found"):
+        svc.warm_up()
+
+
+# ---------------------------------------------------------------------------
+# Tests — result cache
+# ---------------------------------------------------------------------------
+
+
+def test_repeated_profile_is_served_from_cache(mocker):
+    imputer = _patch_recording(mocker)
+    profile = {**BASE, "elevation_m": None, "slope": 10.0, "temperature_celsius": 24.0, "rainfall_mm": 1500, "ph": 6.5}
+
+    first = svc.impute_missing(profile)
+    # Float noise below the key rounding still hits
+    second = svc.impute_missing({**profile, "latitude": profile["latitude"] + 1e-9})
+
+    assert imputer.calls == [1]
+    assert second[0]["elevation_m"] == first[0]["elevation_m"]
+    assert second[1] == ["elevation_m"]
+    assert svc.cache_info() == {"hits": 1, "misses": 1, "size": 1, "max_size": svc.CACHE_MAX_ENTRIES}
+
+
+def test_duplicate_rows_in_batch_share_one_model_row(mocker):
+    imputer = _patch_recording(mocker)
+    profile = {**BASE, "elevation_m": None, "slope": 10.0, "temperature_celsius": 24.0, "rainfall_mm": 1500, "ph": 6.5}
+    other = {**profile, "slope": None}
+
+    results = svc.impute_missing_batch([profile, other, profile])
+
+    assert imputer.calls == [2]
+    assert results[0] == results[2]
+    assert results[1][1] == ["elevation_m", "slope"]
+
+
+def test_cache_key_includes_model_hash(mocker):
+    imputer = _patch_recording(mocker)
+    profile = {**BASE, "elevation_m": None, "slope": 10.0, "temperature_celsius": 24.0, "rainfall_mm": 1500, "ph": 6.5}
+
+    svc.impute_missing(profile)
+    svc._model_hash = "retrained"
+    svc.impute_missing(profile)
+
+    assert imputer.calls == [1, 1]
+
+
+def test_cache_evicts_least_recently_used(mocker):
+    _patch_recording(mocker)
+    mocker.patch("imputation.imputation_service.CACHE_MAX_ENTRIES", 2)
+    profiles = [{**BASE, "latitude": -8.5 - i / 100, "elevation_m": None, "slope": 10.0, "temperature_celsius": 24.0, "rainfall_mm": 1500, "ph": 6.5} for i in range(3)]
+
+    for profile in profiles:
+        svc.impute_missing(profile)
+    svc.impute_missing(profiles[0])
+
+    assert svc.cache_info()["size"] == 2
+    assert svc.cache_info()["hits"] == 0
@@ -41,6 +41,43 @@ WATERWAYS_ASSET_ID: str = os.getenv(
 )
 
 
+# ============================================================================
+# LOCAL RASTER SOURCE
+# ============================================================================
+
+# Directory of pre-downloaded GeoTIFF/COG clips for datasets whose "source" is "local" (see core/local_raster.py).
+# Clips keep the raw band values of the GEE asset, so scale_factor/offset/bias_correction still apply.
+# Temporal datasets have one clip per year, already reduced over the year the way the GEE path does
+# (CHIRPS: sum of the daily images, MODIS LST: mean of the 8-day composites).
+LOCAL_RASTER_DIR: str = os.getenv(
+    "LOCAL_RASTER_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "rasters"),
+)
+
+# "gee" or "local": where farm area and centroid are computed (local uses pyproj geodesic area)
+GEOMETRY_SOURCE: str = os.getenv("GEOMETRY_SOURCE", "gee")
+
+
+# ============================================================================
+# EXTRACTION CACHE
+# ============================================================================
+
+# SQLite file caching raw GEE extraction results by dataset, asset, year, geometry and scale (see core/extraction_cache.py).
+# Set to an empty string to disable.
+EXTRACTION_CACHE_PATH: str = os.getenv(
+    "EXTRACTION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "extraction_cache.sqlite"),
+)
+
+# Per-dataset "cache_ttl" values in seconds; None keeps static datasets until their asset or scale changes
+YEARLY_TTL = 365 * 24 * 3600
+
+
+def _source(name: str) -> str:
+    # Per-dataset backend, e.g. RAINFALL_SOURCE=local
+    return os.getenv(f"{name.upper()}_SOURCE", "gee")
+
+
 # ============================================================================
 # DATASET CONFIGURATIONS
 # ============================================================================
@@ -57,6 +94,9 @@ DATASETS = {
         "post_process": "round_int",
         "temporal": True,
         "validation_status": "excellent",
+        "source": _source("rainfall"),
+        "cache_ttl": YEARLY_TTL,
+        "local_path": "chirps_precipitation_{year}.tif",
     },
     "elevation": {
         "type": "raster",
@@ -68,6 +108,9 @@ DATASETS = {
         "unit": "m",
         "post_process": "round_int",
         "validation_status": "excellent",
+        "source": _source("elevation"),
+        "cache_ttl": None,
+        "local_path": "srtm_elevation.tif",
     },
     "temperature": {
         "type": "raster",
@@ -84,6 +127,9 @@ DATASETS = {
         "temporal": True,
         "validation_status": "good",
         "note": "Requires -4.43°C bias correction (LST vs air temp difference)",
+        "source": _source("temperature"),
+        "cache_ttl": YEARLY_TTL,
+        "local_path": "modis_lst_day_{year}.tif",
     },
     "soil_ph": {
         "type": "raster",
@@ -97,6 +143,9 @@ DATASETS = {
         "post_process": "round_1dp",
         "validation_status": "poor",
         "warning": "Low correlation (r=0.18) - Not suitable for Timor-Leste. Use local calibration model or exclude from analysis.",
+        "source": _source("soil_ph"),
+        "cache_ttl": None,
+        "local_path": "openlandmap_soil_ph.tif",
     },
     "soil_texture": {
         "type": "raster",
@@ -106,6 +155,9 @@ DATASETS = {
         "reducer": "mode",
         "description": "USDA Soil Texture Classes",
         "unit": "class",
+        "source": _source("soil_texture"),
+        "cache_ttl": None,
+        "local_path": "openlandmap_soil_texture.tif",
     },
     "dem": {
         "type": "raster",
@@ -113,6 +165,9 @@ DATASETS = {
         "band": "elevation",
         "scale": 90,
         "description": "DEM for slope calculation (same as elevation)",
+        "source": _source("dem"),
+        "cache_ttl": None,
+        "local_path": "srtm_elevation.tif",
     },
 }
 
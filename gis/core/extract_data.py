@@ -1,13 +1,16 @@
 """
 Extract environmental data from various sources.
 
-Uses config/settings.py for all dataset configurations.
+Uses config/settings.py for all dataset configurations. Raster datasets are read from
+Earth Engine or, when their "source" is "local", from local clips (core/local_raster.py).
 """
 
 import ee
 
-from config.settings import TEXTURE_MAP, get_dataset_config
+from config.settings import GEOMETRY_SOURCE, TEXTURE_MAP, get_dataset_config
+from core.extraction_cache import cached_value, get_extraction_cache
 from core.geometry_parser import parse_geometry
+from core.local_raster import local_area_m2, local_centroid, local_raster_value, local_slope
 
 # ============================================================================
 # UTILITY FUNCTIONS
@@ -57,14 +60,10 @@ def _get_reducer(reducer_name: str):
 # ============================================================================
 
 
-def _extract_from_raster(geometry, dataset_name: str, year: int | None = None):
-    """
-    Generic function to extract value from raster dataset.
-    """
+def _dataset_image(dataset_name: str, year: int | None = None):
+    """Load a raster dataset as a single-band image, reduced over the year for temporal datasets."""
     config = get_dataset_config(dataset_name)
-    geometry = parse_geometry(geometry)
 
-    # Load dataset
     if year and config.get("temporal", False):
         collection = ee.ImageCollection(config["asset_id"])
         collection = collection.filterDate(f"{year}-01-01", f"{year}-12-31")
@@ -72,14 +71,41 @@ def _extract_from_raster(geometry, dataset_name: str, year: int | None = None):
 
         reducer_name = config.get("reducer", "mean")
         if reducer_name == "sum":
-            img = collection.sum()
-        else:
-            img = collection.mean()
+            return collection.sum()
+        return collection.mean()
+
+    return ee.Image(config["asset_id"]).select(config["band"])
+
+
+def _finalize_value(value, config: dict):
+    """Apply the dataset's unit conversion, bias correction and rounding to a raw extracted value."""
+    if value is None:
+        return None
+
+    if "scale_factor" in config:
+        value *= config["scale_factor"]
+
+    if "offset" in config:
+        value += config["offset"]
+
+    if "bias_correction" in config:
+        value += config["bias_correction"]
+
+    if "post_process" in config:
+        value = _apply_post_process(value, config["post_process"])
+
+    return value
 
-        band_name = config["band"]
-    else:
-        img = ee.Image(config["asset_id"]).select(config["band"])
-        band_name = config["band"]
+
+def _gee_raster_value(geometry, dataset_name: str, year: int | None = None):
+    """
+    Raw (unscaled) reduction of a raster dataset on Earth Engine.
+    """
+    config = get_dataset_config(dataset_name)
+    geometry = parse_geometry(geometry)
+
+    img = _dataset_image(dataset_name, year=year)
+    band_name = config["band"]
 
     reducer = _get_reducer(config.get("reducer", "mean"))
     stats = img.reduceRegion(
@@ -101,22 +127,31 @@ def _extract_from_raster(geometry, dataset_name: str, year: int | None = None):
         )
         value = _ee_to_float(stats.get(band_name))
 
-    if value is None:
-        return None
+    return value
 
-    if "scale_factor" in config:
-        value *= config["scale_factor"]
 
-    if "offset" in config:
-        value += config["offset"]
+# Raster backends by DATASETS "source"; each returns the raw value before scale/offset rules
+RASTER_SOURCES = {
+    "gee": _gee_raster_value,
+    "local": local_raster_value,
+}
 
-    if "bias_correction" in config:
-        value += config["bias_correction"]
 
-    if "post_process" in config:
-        value = _apply_post_process(value, config["post_process"])
+def _extract_from_raster(geometry, dataset_name: str, year: int | None = None):
+    """
+    Generic function to extract value from raster dataset.
+    """
+    config = get_dataset_config(dataset_name)
+    source = config.get("source", "gee")
 
-    return value
+    if source not in RASTER_SOURCES:
+        raise ValueError(f"Unknown source '{source}' for dataset {dataset_name}. Available: {list(RASTER_SOURCES)}")
+
+    if source == "gee":
+        value = cached_value(geometry, dataset_name, lambda: _gee_raster_value(geometry, dataset_name, year=year), year=year)
+    else:
+        value = RASTER_SOURCES[source](geometry, dataset_name, year=year)
+    return _finalize_value(value, config)
 
 
 # ============================================================================
@@ -177,8 +212,8 @@ def get_ph(geometry, year: int | None = None):
     return _extract_from_raster(geometry, "soil_ph")
 
 
-def get_slope(geometry, year: int | None = None):
-    """Return mean slope (degrees). Derived from SRTM DEM."""
+def _gee_slope_value(geometry):
+    """Raw mean slope (degrees) of ee.Terrain.slope on the DEM."""
     geometry = parse_geometry(geometry)
     config = get_dataset_config("dem")
 
@@ -192,7 +227,16 @@ def get_slope(geometry, year: int | None = None):
         maxPixels=1e9,
     )
 
-    value = _ee_to_float(stats.get("slope"))
+    return _ee_to_float(stats.get("slope"))
+
+
+def get_slope(geometry, year: int | None = None):
+    """Return mean slope (degrees). Derived from SRTM DEM."""
+    if get_dataset_config("dem").get("source", "gee") == "local":
+        value = local_slope(geometry)
+    else:
+        value = cached_value(geometry, "slope", lambda: _gee_slope_value(geometry))
+
     return round(value, 3) if value is not None else None
 
 
@@ -241,8 +285,11 @@ def _normalize_texture_name(value) -> str | None:
 
 def get_texture_id(geometry, year: int | None = None) -> int | None:
     """Return soil texture ID (1-12) for a given geometry."""
-    texture_value = get_texture(geometry, year=year)
+    return _texture_value_to_id(get_texture(geometry, year=year))
 
+
+def _texture_value_to_id(texture_value) -> int | None:
+    """Map a raster class value or a texture name to the soil texture ID (1-12)."""
     if texture_value is None:
         return None
 
@@ -258,15 +305,262 @@ def get_texture_id(geometry, year: int | None = None) -> int | None:
 
 def get_area_ha(geometry):
     """Return area of the input geometry in hectares."""
-    geometry = parse_geometry(geometry)
-    area_m2 = geometry.area(maxError=1).getInfo()
+    if GEOMETRY_SOURCE == "local":
+        area_m2 = local_area_m2(geometry)
+    else:
+        area_m2 = cached_value(geometry, "area_m2", lambda: parse_geometry(geometry).area(maxError=1).getInfo())
     return round(float(area_m2) / 10_000.0, 3)
 
 
 def get_centroid_lat_lon(geometry):
     """Return centroid as (lat, lon) rounded to 3 decimal places."""
-    geom = parse_geometry(geometry)
-    centroid = geom.centroid(maxError=1)
-    coords = centroid.coordinates().getInfo()
+    if GEOMETRY_SOURCE == "local":
+        coords = local_centroid(geometry)
+    else:
+        coords = cached_value(geometry, "centroid", lambda: parse_geometry(geometry).centroid(maxError=1).coordinates().getInfo())
     lon, lat = float(coords[0]), float(coords[1])
     return round(lat, 3), round(lon, 3)
+
+
+# ============================================================================
+# COMBINED AND BATCH EXTRACTION
+# ============================================================================
+
+# Raster datasets read by the combined extractors (soil_texture only while it is configured as a raster)
+BATCH_RASTER_DATASETS = ("rainfall", "temperature", "elevation", "soil_ph", "soil_texture")
+
+# Farms per FeatureCollection; keeps each request well inside the GEE payload and element limits
+DEFAULT_BATCH_SIZE = 500
+
+
+def _profile_datasets(exclude=()) -> list:
+    """Datasets of a profile extraction, as output names; "slope" is derived from the DEM."""
+    names = [name for name in BATCH_RASTER_DATASETS if get_dataset_config(name)["type"] == "raster"]
+    return [name for name in names + ["slope"] if name not in exclude]
+
+
+def _is_local(name: str) -> bool:
+    return get_dataset_config("dem" if name == "slope" else name).get("source", "gee") == "local"
+
+
+def _profile_reductions(names: list, year: int | None = None) -> list:
+    """
+    Stack the named profile rasters into one multi-band image per (scale, reducer) pair.
+
+    Each dataset keeps its own scale and reducer, so values match the per-dataset getters.
+    Returns (image, reducer, scale, band names) tuples; band names are the output property names.
+    """
+    groups = {}
+
+    for name in names:
+        if name == "slope":
+            config = get_dataset_config("dem")
+            image = ee.Terrain.slope(ee.Image(config["asset_id"]).select(config["band"]))
+            key = (config["scale"], "mean")
+        else:
+            config = get_dataset_config(name)
+            image = _dataset_image(name, year=year)
+            key = (config["scale"], config.get("reducer", "mean"))
+        groups.setdefault(key, []).append((name, image.rename(name)))
+
+    reductions = []
+    for (scale, reducer_name), members in groups.items():
+        band_names = [name for name, _ in members]
+        reducer = _get_reducer(reducer_name)
+        if len(band_names) == 1:
+            # A single-band reduction is named after the reducer output ("mean"), so name it after the dataset
+            reducer = reducer.setOutputs(band_names)
+        reductions.append((ee.Image.cat([img for _, img in members]), reducer, scale, band_names))
+
+    return reductions
+
+
+def _reduce_features(fc, reductions):
+    """Chain one reduceRegions per image group onto the collection; nothing is evaluated until getInfo."""
+    for image, reducer, scale, _ in reductions:
+        fc = image.reduceRegions(collection=fc, reducer=reducer, scale=scale)
+    return fc
+
+
+def _with_area_and_centroid(feature):
+    geometry = feature.geometry()
+    return feature.set(
+        {
+            "area_m2": geometry.area(maxError=1),
+            "centroid": geometry.centroid(maxError=1).coordinates(),
+        }
+    )
+
+
+def _local_raw_values(geometry, names: list, year: int | None = None) -> dict:
+    """Raw values of the locally sourced datasets, plus area and centroid when GEOMETRY_SOURCE is local."""
+    raw = {name: local_slope(geometry) if name == "slope" else local_raster_value(geometry, name, year=year) for name in names}
+
+    if GEOMETRY_SOURCE == "local":
+        raw["area_m2"] = local_area_m2(geometry)
+        raw["centroid"] = list(local_centroid(geometry))
+
+    return raw
+
+
+def _finalize_profile_values(raw: dict) -> dict:
+    """Convert the reduced properties of one farm into profile values."""
+    if "error" in raw:
+        return raw
+
+    values = {}
+    for name in BATCH_RASTER_DATASETS:
+        if name in raw:
+            values[name] = _finalize_value(_ee_to_float(raw[name]), get_dataset_config(name))
+
+    if "soil_texture" in values:
+        values["soil_texture_id"] = _texture_value_to_id(values.pop("soil_texture"))
+
+    slope = _ee_to_float(raw.get("slope"))
+    values["slope"] = round(slope, 3) if slope is not None else None
+
+    values["area_ha"] = round(float(raw["area_m2"]) / 10_000.0, 3)
+    lon, lat = raw["centroid"]
+    values["latitude"] = round(float(lat), 3)
+    values["longitude"] = round(float(lon), 3)
+
+    return values
+
+
+def extract_profile_values(geometry, year: int | None = None, exclude=()) -> dict:
+    """
+    Extract all profile values of one farm in a single GEE round trip.
+
+    One reduceRegion per image group, plus area and centroid, are combined into one
+    ee.Dictionary and fetched with one getInfo; a second request is only made when a
+    dataset needs the centroid fallback. exclude skips datasets resolved locally (e.g. "soil_ph").
+    Datasets with a local source are read from their clips and values held by the extraction
+    cache are reused, so GEE is not called at all when nothing is left to request.
+    Returns the same keys as extract_batch.
+    """
+    year = year or 2024
+    names = _profile_datasets(exclude)
+    local_names = [name for name in names if _is_local(name)]
+    gee_names = [name for name in names if name not in local_names]
+
+    raw = _local_raw_values(geometry, local_names, year=year)
+
+    # Only what the extraction cache does not hold goes to GEE
+    geometry_names = [] if GEOMETRY_SOURCE == "local" else ["area_m2", "centroid"]
+    cache = get_extraction_cache() if gee_names or geometry_names else None
+    if cache is not None:
+        raw.update(cache.get(geometry, gee_names + geometry_names, year=year))
+        gee_names = [name for name in gee_names if name not in raw]
+        geometry_names = [name for name in geometry_names if name not in raw]
+
+    if not gee_names and not geometry_names:
+        return _finalize_profile_values(raw)
+
+    geometry_raw = geometry
+    geometry = parse_geometry(geometry)
+    reductions = _profile_reductions(gee_names, year=year)
+    raster_names = [name for name in gee_names if name in BATCH_RASTER_DATASETS]
+
+    def reduce_at(region):
+        stats = ee.Dictionary({})
+        for image, reducer, scale, _ in reductions:
+            stats = stats.combine(image.reduceRegion(reducer=reducer, geometry=region, scale=scale, maxPixels=1e9))
+        return stats
+
+    centroid = geometry.centroid(maxError=1)
+    stats = reduce_at(geometry)
+    if geometry_names:
+        stats = stats.combine(ee.Dictionary({"area_m2": geometry.area(maxError=1), "centroid": centroid.coordinates()}))
+    raw.update(stats.getInfo())
+
+    # Same centroid fallback as _extract_from_raster, for every empty dataset at once
+    if any(raw.get(name) is None for name in raster_names):
+        fallback = reduce_at(centroid).getInfo()
+        for name in raster_names:
+            if raw.get(name) is None:
+                raw[name] = fallback.get(name)
+
+    if cache is not None:
+        cache.put(geometry_raw, {name: raw.get(name) for name in gee_names + geometry_names}, year=year)
+
+    return _finalize_profile_values(raw)
+
+
+def _extract_batch_chunk(geometries: list, gee_names: list, local_names: list, year: int) -> list:
+    raws = [{} for _ in geometries]
+    features = []
+    keys = gee_names if GEOMETRY_SOURCE == "local" else gee_names + ["area_m2", "centroid"]
+    cache = get_extraction_cache() if keys else None
+
+    for index, geometry in enumerate(geometries):
+        try:
+            raws[index] = _local_raw_values(geometry, local_names, year=year)
+            # Farms fully held by the extraction cache are not sent to GEE
+            hits = cache.get(geometry, keys, year=year) if cache is not None else {}
+            raws[index].update(hits)
+            if keys and len(hits) < len(keys):
+                features.append(ee.Feature(parse_geometry(geometry), {"batch_index": index}))
+        except ValueError as e:
+            raws[index] = {"error": str(e)}
+
+    if not features:
+        return [_finalize_profile_values(raw) for raw in raws]
+
+    reductions = _profile_reductions(gee_names, year=year)
+    raster_names = [name for name in gee_names if name in BATCH_RASTER_DATASETS]
+    requested = []
+
+    fc = ee.FeatureCollection(features)
+    if GEOMETRY_SOURCE != "local":
+        fc = fc.map(_with_area_and_centroid)
+    for row in _reduce_features(fc, reductions).getInfo()["features"]:
+        properties = row["properties"]
+        raws[properties["batch_index"]].update({key: properties.get(key) for key in keys})
+        requested.append(properties["batch_index"])
+
+    # Farms smaller than a coarse pixel come back empty; retry them at their centroid in one more
+    # round trip, as _extract_from_raster does per dataset
+    missing = [index for index, raw in enumerate(raws) if "error" not in raw and any(raw.get(name) is None for name in raster_names)]
+    if missing:
+        centroids = ee.FeatureCollection([ee.Feature(ee.Geometry.Point(raws[index]["centroid"]), {"batch_index": index}) for index in missing])
+        for row in _reduce_features(centroids, reductions).getInfo()["features"]:
+            properties = row["properties"]
+            raw = raws[properties["batch_index"]]
+            for name in raster_names:
+                if raw.get(name) is None:
+                    raw[name] = properties.get(name)
+
+    if cache is not None:
+        for index in requested:
+            cache.put(geometries[index], {key: raws[index].get(key) for key in keys}, year=year)
+
+    return [_finalize_profile_values(raw) for raw in raws]
+
+
+def extract_batch(geometries, year: int | None = None, batch_size: int = DEFAULT_BATCH_SIZE) -> list:
+    """
+    Extract the profile values of many farms with one chained reduceRegions and getInfo per batch.
+
+    Returns one dict per geometry, in input order, with rainfall, temperature, elevation, soil_ph,
+    slope, soil_texture_id (raster texture only), area_ha, latitude and longitude.
+    Locally sourced datasets are read from their clips per farm.
+    A geometry that cannot be parsed, or whose batch fails, gets {"error": message} instead.
+    """
+    geometries = list(geometries)
+    if not geometries:
+        return []
+
+    year = year or 2024
+    names = _profile_datasets()
+    local_names = [name for name in names if _is_local(name)]
+    gee_names = [name for name in names if name not in local_names]
+
+    results = []
+    for start in range(0, len(geometries), batch_size):
+        batch = geometries[start : start + batch_size]
+        try:
+            results.extend(_extract_batch_chunk(batch, gee_names, local_names, year))
+        except Exception as e:
+            results.extend({"error": str(e)} for _ in batch)
+
+    return results
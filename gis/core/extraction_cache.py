@@ -0,0 +1,146 @@
+"""
+Extraction Cache - durable SQLite cache of raw Earth Engine extraction results.
+
+Entries are keyed by (dataset, asset_id, year, geometry hash, scale), so re-profiling an
+unchanged farm costs no GEE calls, and changing a dataset's asset or scale in
+config/settings.py never serves a stale value. Values are stored raw (before
+scale_factor/offset/bias_correction/post_process), so changes to those rules apply to cached values too.
+
+Each dataset's "cache_ttl" (seconds) bounds the age of its entries; None keeps them forever.
+Farm area and centroid are cached as the pseudo datasets "area_m2" and "centroid".
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import shapely
+
+from config.settings import EXTRACTION_CACHE_PATH, get_dataset_config
+from core.geometry_parser import parse_geometry_shapely
+
+# Coordinates are snapped to ~1 cm before hashing, so float noise does not split cache entries
+GEOMETRY_PRECISION = 1e-7
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extraction_cache (
+    dataset TEXT NOT NULL,
+    asset_id TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    geometry_hash TEXT NOT NULL,
+    scale REAL NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (dataset, asset_id, year, geometry_hash, scale)
+)
+"""
+
+
+def geometry_hash(geometry) -> str:
+    """SHA-256 of the normalised geometry, independent of ring start vertex and orientation."""
+    geom = shapely.normalize(shapely.set_precision(parse_geometry_shapely(geometry), GEOMETRY_PRECISION))
+    return hashlib.sha256(shapely.to_wkb(geom)).hexdigest()
+
+
+def _entry_key(name: str, year: int | None) -> tuple:
+    """(dataset, asset_id, year, scale, ttl) of a profile output name."""
+    if name in ("area_m2", "centroid"):
+        # Computed with maxError=1 on the geometry itself
+        return name, "", 0, 1.0, None
+
+    config = get_dataset_config("dem" if name == "slope" else name)
+    cache_year = (year or 2024) if config.get("temporal", False) else 0
+    return name, config["asset_id"], cache_year, float(config["scale"]), config.get("cache_ttl")
+
+
+class ExtractionCache:
+    """Thread-safe SQLite cache shared by the per-dataset, combined and batched extractors."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets several backend workers read while one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, geometry, names, year: int | None = None) -> dict:
+        """Cached raw values of the names for a geometry; misses and expired entries are left out."""
+        digest = geometry_hash(geometry)
+        now = time.time()
+        hits = {}
+
+        with self._lock:
+            for name in names:
+                dataset, asset_id, cache_year, scale, ttl = _entry_key(name, year)
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM extraction_cache WHERE dataset = ? AND asset_id = ? AND year = ? AND geometry_hash = ? AND scale = ?",
+                    (dataset, asset_id, cache_year, digest, scale),
+                ).fetchone()
+                if row is not None and (ttl is None or now - row[1] < ttl):
+                    hits[name] = json.loads(row[0])
+
+        return hits
+
+    def put(self, geometry, values: dict, year: int | None = None):
+        """Store raw values (including None for "no data") by output name."""
+        digest = geometry_hash(geometry)
+        now = time.time()
+        rows = []
+
+        for name, value in values.items():
+            dataset, asset_id, cache_year, scale, _ = _entry_key(name, year)
+            rows.append((dataset, asset_id, cache_year, digest, scale, json.dumps(value), now))
+
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO extraction_cache VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def clear(self, dataset: str | None = None):
+        """Remove every entry, or only those of one dataset."""
+        with self._lock:
+            if dataset is None:
+                self._conn.execute("DELETE FROM extraction_cache")
+            else:
+                self._conn.execute("DELETE FROM extraction_cache WHERE dataset = ?", (dataset,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache | None:
+    """Process-wide cache at EXTRACTION_CACHE_PATH, or None when caching is disabled."""
+    global _cache
+
+    if _cache is None and EXTRACTION_CACHE_PATH:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ExtractionCache(EXTRACTION_CACHE_PATH)
+
+    return _cache
+
+
+def cached_value(geometry, name: str, compute, year: int | None = None):
+    """Return the cached raw value of one output name, computing and storing it on a miss."""
+    cache = get_extraction_cache()
+    if cache is None:
+        return compute()
+
+    hits = cache.get(geometry, [name], year=year)
+    if name in hits:
+        return hits[name]
+
+    value = compute()
+    cache.put(geometry, {name: value}, year=year)
+    return value
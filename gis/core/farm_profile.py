@@ -5,17 +5,21 @@ Functions:
     - build_farm_profile: Create a single farm profile
     - update_farm_profile: Update specific fields in a farm profile
     - bulk_create_profiles: Create profiles for multiple farms in parallel
+    - batch_create_profiles: Create profiles for many farms with batched GEE extraction
     - bulk_update_profiles: Update profiles for multiple farms in parallel
 """
 
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import pandas as pd
 
 from core.extract_data import (
+    DEFAULT_BATCH_SIZE,
+    extract_batch,
+    extract_profile_values,
     get_area_ha,
     get_centroid_lat_lon,
     get_elevation,
@@ -30,12 +34,29 @@ from core.extract_data import (
 # INDIVIDUAL FARM OPERATIONS
 # ============================================================================
 
+# Shared pool for concurrent extraction; GEE calls block on network I/O, so threads are enough
+_EXTRACTION_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="farm-profile")
+
+# Profile fields filled by each concurrent extraction
+_EXTRACTION_FIELDS = {
+    "rainfall": ["rainfall_mm"],
+    "temperature": ["temperature_celsius"],
+    "soil_ph": ["soil_ph"],
+    "elevation": ["elevation_m"],
+    "slope": ["slope_degrees"],
+    "area_ha": ["area_ha"],
+    "soil_texture_id": ["soil_texture_id"],
+    "centroid": ["latitude", "longitude"],
+}
+
 
 def build_farm_profile(
     geometry,
     year: Optional[int] = None,
     farm_id: Optional[int] = None,
     riparian: Optional[bool] = None,
+    concurrent: bool = False,
+    timeout: Optional[float] = None,
     **additional_fields,
 ) -> Dict[str, Any]:
     """
@@ -51,6 +72,10 @@ def build_farm_profile(
         farm_id:           Unique farm identifier (None for new/candidate farms).
         riparian:          Riparian flag computed externally (e.g. PostGIS in backend).
                            Pass None if unknown — profile will still include the field.
+        concurrent:        Run each dataset extraction on a thread pool instead of the
+                           combined single request. Fields whose extraction fails or exceeds
+                           timeout are None and listed in "failed_fields", with status "partial".
+        timeout:           Seconds each concurrent extraction may take (None waits indefinitely).
         **additional_fields: Any additional custom fields (e.g., farmer_name).
 
     Example:
@@ -63,57 +88,35 @@ def build_farm_profile(
     year = year or 2024
 
     try:
-        # --- GEE extractions ---
-        rainfall = get_rainfall(geometry, year=year)
-        temperature = get_temperature(geometry, year=year)
-        # US-017: Prefer local soil pH over GEE
+        # --- GEE extraction: one combined round trip, or one request per dataset in parallel ---
+        # US-017: Prefer local soil pH and texture over GEE, skipping their extraction
         local_ph = additional_fields.get("soil_ph") or additional_fields.get("ph")
-
-        if local_ph is not None:
-            ph = local_ph
-        else:
-            ph = get_ph(geometry, year=year)
-        elevation = get_elevation(geometry, year=year)
-        slope = get_slope(geometry, year=year)
-        area_ha = get_area_ha(geometry)
-        # Prefer local soil texture over GEE
         local_texture = additional_fields.get("soil_texture")
 
+        exclude = []
+        if local_ph is not None:
+            exclude.append("soil_ph")
         if local_texture is not None:
-            texture_id = None
-            texture_name = local_texture
-        else:
-            texture_id = get_texture_id(geometry)
-            texture_name = None
-        lat, lon = get_centroid_lat_lon(geometry)
+            exclude.append("soil_texture")
 
-        # --- Derived flags ---
-        if elevation is not None and rainfall is not None:
-            coastal_flag = elevation < 100 and 500 <= rainfall <= 3000
+        if concurrent:
+            values, errors = _extract_concurrently(geometry, year, exclude, timeout)
+            if not values:
+                raise RuntimeError("; ".join(errors.values()))
         else:
-            coastal_flag = False
+            values, errors = extract_profile_values(geometry, year=year, exclude=exclude), {}
 
-        # --- Build profile ---
-        profile: Dict[str, Any] = {
-            "id": farm_id,
-            "year": year,
-            "rainfall_mm": rainfall,
-            "temperature_celsius": temperature,
-            "elevation_m": elevation,
-            "slope_degrees": slope,
-            "soil_ph": ph,
-            "soil_texture_id": texture_id,
-            "soil_texture": texture_name,
-            "area_ha": area_ha,
-            "latitude": lat,
-            "longitude": lon,
-            "coastal": coastal_flag,
-            "riparian": riparian,
-            "updated_at": datetime.now().isoformat(),
-            "status": "success",
-        }
+            # Texture configured as a vector layer is not part of the combined rasters
+            if "soil_texture_id" not in values and local_texture is None:
+                values["soil_texture_id"] = get_texture_id(geometry)
+
+        profile = _assemble_profile(values, year, farm_id, riparian, additional_fields)
+
+        if errors:
+            profile["status"] = "partial"
+            profile["failed_fields"] = [field for name in errors for field in _EXTRACTION_FIELDS[name]]
+            profile["error"] = "; ".join(f"{name}: {message}" for name, message in errors.items())
 
-        profile.update(additional_fields)
         return profile
 
     except Exception as e:
@@ -125,6 +128,94 @@ def build_farm_profile(
         }
 
 
+def _extract_concurrently(geometry, year: int, exclude: List[str], timeout: Optional[float]) -> tuple:
+    """
+    Run the per-dataset extractions in parallel, so latency is the slowest dataset rather than the sum.
+
+    Returns (values, errors): values of the extractions that finished, and an error message
+    per extraction that raised or did not finish within timeout. Extractions still running
+    after the timeout are left to finish in the background (their results still reach the
+    extraction cache).
+    """
+    extractors = {
+        "rainfall": lambda: get_rainfall(geometry, year=year),
+        "temperature": lambda: get_temperature(geometry, year=year),
+        "soil_ph": lambda: get_ph(geometry, year=year),
+        "elevation": lambda: get_elevation(geometry, year=year),
+        "slope": lambda: get_slope(geometry, year=year),
+        "area_ha": lambda: get_area_ha(geometry),
+        "soil_texture_id": lambda: get_texture_id(geometry),
+        "centroid": lambda: get_centroid_lat_lon(geometry),
+    }
+    if "soil_ph" in exclude:
+        extractors.pop("soil_ph")
+    if "soil_texture" in exclude:
+        extractors.pop("soil_texture_id")
+
+    futures = {name: _EXTRACTION_POOL.submit(extractor) for name, extractor in extractors.items()}
+    wait(futures.values(), timeout=timeout)
+
+    values, errors = {}, {}
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            errors[name] = f"timed out after {timeout}s"
+        elif future.exception() is not None:
+            errors[name] = str(future.exception())
+        elif name == "centroid":
+            values["latitude"], values["longitude"] = future.result()
+        else:
+            values[name] = future.result()
+
+    return values, errors
+
+
+def _assemble_profile(values: Dict[str, Any], year: int, farm_id: Optional[int], riparian: Optional[bool], additional_fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the profile dict from extracted values, preferring local soil pH and texture."""
+    local_ph = additional_fields.get("soil_ph") or additional_fields.get("ph")
+    ph = local_ph if local_ph is not None else values.get("soil_ph")
+
+    local_texture = additional_fields.get("soil_texture")
+    if local_texture is not None:
+        texture_id = None
+        texture_name = local_texture
+    else:
+        texture_id = values.get("soil_texture_id")
+        texture_name = None
+
+    elevation = values.get("elevation")
+    rainfall = values.get("rainfall")
+
+    # --- Derived flags ---
+    if elevation is not None and rainfall is not None:
+        coastal_flag = elevation < 100 and 500 <= rainfall <= 3000
+    else:
+        coastal_flag = False
+
+    # --- Build profile ---
+    profile: Dict[str, Any] = {
+        "id": farm_id,
+        "year": year,
+        "rainfall_mm": rainfall,
+        "temperature_celsius": values.get("temperature"),
+        "elevation_m": elevation,
+        "slope_degrees": values.get("slope"),
+        "soil_ph": ph,
+        "soil_texture_id": texture_id,
+        "soil_texture": texture_name,
+        "area_ha": values.get("area_ha"),
+        "latitude": values.get("latitude"),
+        "longitude": values.get("longitude"),
+        "coastal": coastal_flag,
+        "riparian": riparian,
+        "updated_at": datetime.now().isoformat(),
+        "status": "success",
+    }
+
+    profile.update(additional_fields)
+    return profile
+
+
 def update_farm_profile(existing_profile: Dict[str, Any], geometry, fields: Optional[List[str]] = None, year: Optional[int] = None, **additional_fields) -> Dict[str, Any]:
     """
     Update specific fields in an existing farm profile.
@@ -270,6 +361,87 @@ def bulk_create_profiles(
     return pd.DataFrame(profiles)
 
 
+def batch_create_profiles(
+    farms: List[Dict[str, Any]],
+    geometry_field: str = "geometry",
+    id_field: str = "farm_id",
+    year: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    records: bool = False,
+    deadline: Optional[float] = None,
+) -> Union[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    Create profiles for many farms with batched GEE extraction.
+
+    Each batch of farms is reduced against all datasets server-side and fetched with a
+    single getInfo, instead of ~9 round trips per farm in bulk_create_profiles.
+    Profiles have the same fields as build_farm_profile; a farm whose extraction fails
+    gets status "failed" with the error.
+
+    Args:
+        farms:             List of farm dicts containing geometry and ID.
+        geometry_field:    Field name containing geometry (default: "geometry").
+        id_field:          Field name containing farm ID (default: "farm_id").
+        year:              Year for data extraction (default: 2024).
+        batch_size:        Farms per GEE request (default: 500).
+        progress_callback: Optional callback(current, total), called after each batch.
+        records:           Return the list of profile dicts instead of a DataFrame, so
+                           integer fields stay ints and each profile keeps only its keys.
+        deadline:          Optional time.monotonic() value; batches not started by then
+                           are not sent to GEE and their farms get status "failed".
+
+    Returns:
+        DataFrame (or list of dicts with records=True) with all farm profiles, in input order.
+    """
+    year = year or 2024
+    profiles = []
+    total = len(farms)
+
+    print(f"\nStarting batched profile creation for {total} farms...")
+    start_time = time.time()
+
+    for start in range(0, total, batch_size):
+        if deadline is not None and time.monotonic() >= deadline:
+            for farm in farms[start:]:
+                profiles.append({"id": farm.get(id_field), "year": year, "status": "failed", "error": "GEE extraction deadline exceeded"})
+            break
+
+        batch = farms[start : start + batch_size]
+        batch_values = extract_batch([farm[geometry_field] for farm in batch], year=year, batch_size=batch_size)
+
+        for farm, values in zip(batch, batch_values):
+            farm_id = farm.get(id_field)
+            if "error" in values:
+                profiles.append({"id": farm_id, "year": year, "status": "failed", "error": values["error"]})
+                continue
+
+            additional_fields = {k: v for k, v in farm.items() if k not in [geometry_field, id_field]}
+            riparian = additional_fields.pop("riparian", None)
+
+            # Texture configured as a vector layer is not part of the batched rasters
+            if "soil_texture_id" not in values and additional_fields.get("soil_texture") is None:
+                values["soil_texture_id"] = get_texture_id(farm[geometry_field])
+
+            profiles.append(_assemble_profile(values, year, farm_id, riparian, additional_fields))
+
+        completed = len(profiles)
+        if progress_callback:
+            progress_callback(completed, total)
+
+        elapsed = time.time() - start_time
+        print(f"  Progress: {completed}/{total} ({completed / total * 100:.1f}%) - {completed / elapsed:.1f} farms/sec")
+
+    elapsed = time.time() - start_time
+    success_count = sum(1 for profile in profiles if profile["status"] == "success")
+
+    print("\nBatched creation complete!")
+    print(f"  Total time: {elapsed:.1f}s")
+    print(f"  Success: {success_count}/{total}")
+
+    return profiles if records else pd.DataFrame(profiles)
+
+
 def bulk_update_profiles(
     profiles_df: pd.DataFrame,
     geometries: Dict[int, Any],
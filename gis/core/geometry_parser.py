@@ -60,3 +60,29 @@ def parse_geometry(geom_raw):
         return parse_polygon(geom_raw)
 
     raise ValueError(f"Invalid geometry format: {geom_raw}")
+
+
+def parse_geometry_shapely(geom_raw):
+    """
+    Same input formats as parse_geometry, returned as a shapely geometry in lon/lat (EPSG:4326).
+    Used by the local raster source, which works without Earth Engine.
+    """
+    from shapely.geometry import MultiPoint, Point, Polygon
+
+    # Point
+    if isinstance(geom_raw, tuple) and len(geom_raw) == 2:
+        lat, lon = geom_raw
+        if lat is None or lon is None:
+            raise ValueError("lat and lon must not be None")
+        return Point(lon, lat)
+
+    # MultiPoint
+    if isinstance(geom_raw, list) and geom_raw and all(isinstance(p, tuple) and len(p) == 2 for p in geom_raw):
+        return MultiPoint([(lon, lat) for lat, lon in geom_raw])
+
+    # Polygon
+    if isinstance(geom_raw, list) and geom_raw and all(isinstance(r, list) for r in geom_raw):
+        rings = [[(lon, lat) for (lat, lon) in ring] for ring in geom_raw]
+        return Polygon(rings[0], rings[1:])
+
+    raise ValueError(f"Invalid geometry format: {geom_raw}")
@@ -0,0 +1,147 @@
+"""
+Local raster source - zonal statistics on pre-downloaded GeoTIFF/COG clips.
+
+Stand-in for Earth Engine for datasets configured with "source": "local" in config/settings.py.
+Only the window covering the farm is read, so a farm costs milliseconds instead of a GEE round trip.
+
+Values mirror the GEE path: pixels whose centre falls inside the farm are reduced with the
+dataset's reducer, points read the pixel under them, and a farm without any pixel centre
+falls back to the pixel under its centroid.
+"""
+
+import os
+
+import numpy as np
+import rasterio
+from pyproj import Geod
+from rasterio.errors import WindowError
+from rasterio.features import geometry_mask, geometry_window
+from rasterio.warp import transform_geom
+from shapely.geometry import mapping, shape
+
+from config.settings import LOCAL_RASTER_DIR, get_dataset_config
+from core.geometry_parser import parse_geometry_shapely
+
+# Same names as extract_data._get_reducer; unknown reducers fall back to mean there too
+_REDUCERS = {
+    "mean": np.mean,
+    "sum": np.sum,
+    "median": np.median,
+    "min": np.min,
+    "max": np.max,
+}
+
+_GEOD = Geod(ellps="WGS84")
+
+
+# ============================================================================
+# ZONAL STATISTICS
+# ============================================================================
+
+
+def local_raster_path(dataset_name: str, year: int | None = None) -> str:
+    """Path of a dataset's local clip; temporal datasets have one clip per year."""
+    config = get_dataset_config(dataset_name)
+    if "local_path" not in config:
+        raise ValueError(f"Dataset {dataset_name} has no local_path configured")
+    return os.path.join(LOCAL_RASTER_DIR, config["local_path"].format(year=year or 2024))
+
+
+def _window_values(src, geometry, slope: bool = False) -> np.ndarray:
+    """Valid pixel values selected by a geometry in the raster CRS, as a flat float array."""
+    try:
+        # One pixel of padding gives the slope kernel its neighbours at the farm edge
+        window = geometry_window(src, [mapping(geometry)], pad_x=1, pad_y=1)
+    except WindowError:
+        return np.empty(0)
+
+    data = src.read(1, window=window, masked=True).astype(float).filled(np.nan)
+    if data.size == 0:
+        return np.empty(0)
+
+    window_transform = src.window_transform(window)
+    if slope:
+        data = _slope_degrees(data, window_transform, src.crs)
+
+    if geometry.geom_type in ("Point", "MultiPoint"):
+        points = geometry.geoms if geometry.geom_type == "MultiPoint" else [geometry]
+        rows, cols = rasterio.transform.rowcol(window_transform, [p.x for p in points], [p.y for p in points])
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        on_raster = (rows >= 0) & (rows < data.shape[0]) & (cols >= 0) & (cols < data.shape[1])
+        values = data[rows[on_raster], cols[on_raster]]
+    else:
+        inside = geometry_mask([mapping(geometry)], out_shape=data.shape, transform=window_transform, invert=True)
+        values = data[inside]
+
+    return values[~np.isnan(values)]
+
+
+def _slope_degrees(dem: np.ndarray, transform, crs) -> np.ndarray:
+    """Slope in degrees (as ee.Terrain.slope); geographic pixel sizes are converted to metres at the window latitude."""
+    pixel_x, pixel_y = abs(transform.a), abs(transform.e)
+
+    if crs is not None and crs.is_geographic:
+        lat = transform.f - transform.e * dem.shape[0] / 2
+        pixel_x *= 111_320 * np.cos(np.radians(lat))
+        pixel_y *= 110_540
+
+    if min(dem.shape) < 2:
+        return np.full(dem.shape, np.nan)
+
+    dz_dy, dz_dx = np.gradient(dem, pixel_y, pixel_x)
+    return np.degrees(np.arctan(np.hypot(dz_dx, dz_dy)))
+
+
+def zonal_stat(geometry, path: str, reducer: str = "mean", slope: bool = False) -> float | None:
+    """
+    Reduce a local raster over a shapely geometry in EPSG:4326.
+
+    slope=True reduces the slope (degrees) of the raster instead of its values.
+    Returns None when the geometry does not cover any valid pixel, even at its centroid.
+    """
+    with rasterio.open(path) as src:
+        if src.crs is not None and src.crs.to_epsg() != 4326:
+            geometry = shape(transform_geom("EPSG:4326", src.crs, mapping(geometry)))
+
+        values = _window_values(src, geometry, slope=slope)
+        if values.size == 0:
+            values = _window_values(src, geometry.centroid, slope=slope)
+
+    if values.size == 0:
+        return None
+
+    return float(_REDUCERS.get(reducer, np.mean)(values))
+
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+
+
+def local_raster_value(geometry, dataset_name: str, year: int | None = None) -> float | None:
+    """Raw (unscaled) zonal value of a dataset from its local clip, matching the GEE raster source."""
+    config = get_dataset_config(dataset_name)
+
+    if config.get("temporal", False):
+        # The reducer of a temporal dataset aggregates over the year, which the clip already holds, so the
+        # farm's pixels are averaged (on GEE, a farm sums about one pixel at the CHIRPS/MODIS scale)
+        return zonal_stat(parse_geometry_shapely(geometry), local_raster_path(dataset_name, year), "mean")
+
+    return zonal_stat(parse_geometry_shapely(geometry), local_raster_path(dataset_name), config.get("reducer", "mean"))
+
+
+def local_slope(geometry) -> float | None:
+    """Mean slope (degrees) from the local DEM clip."""
+    return zonal_stat(parse_geometry_shapely(geometry), local_raster_path("dem"), slope=True)
+
+
+def local_area_m2(geometry) -> float:
+    """Geodesic area (m²) on the WGS84 ellipsoid."""
+    area, _ = _GEOD.geometry_area_perimeter(parse_geometry_shapely(geometry))
+    return abs(area)
+
+
+def local_centroid(geometry) -> tuple[float, float]:
+    """Centroid as (lon, lat), the order of GEE centroid coordinates."""
+    centroid = parse_geometry_shapely(geometry).centroid
+    return centroid.x, centroid.y
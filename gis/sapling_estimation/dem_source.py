@@ -0,0 +1,181 @@
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from affine import Affine
+from rasterio.crs import CRS
+from rasterio.transform import xy
+from rasterio.warp import transform_bounds
+from rasterio.windows import from_bounds
+
+# The DEM source provides elevation windows for sapling estimation without querying the dem_table in PostGIS.
+# The DEM is read from a local tiled GeoTIFF (or a NumPy memmap of the same grid) in fixed-size tiles.
+# Decoded tiles are kept in an LRU cache, so repeated estimations on neighbouring farms reuse the same tiles.
+# The returned window matches the DEM keyword arguments of sapling_estimation(), making it a drop-in replacement for the DB query.
+# The same reader serves the precomputed slope raster (see slope_raster.build_slope_raster), returning slope_array instead.
+
+DEFAULT_DEM_PATH = Path(__file__).parent / "data" / "DEM.tif"
+DEFAULT_SLOPE_PATH = Path(__file__).parent / "data" / "slope.tif"
+DEFAULT_TILE_SIZE = 512
+DEFAULT_MAX_TILES = 64
+
+
+class LocalDemTileStore:
+    """
+    Windowed, tile-cached reader over a static DEM grid.
+
+    Supports:
+    - Tiled GeoTIFF (read through rasterio using the file's internal block size)
+    - NumPy .npy memmap (requires the grid transform and CRS to be supplied)
+    """
+
+    def __init__(self, path, tile_size: int | None = None, max_tiles: int = DEFAULT_MAX_TILES, transform=None, crs=None, nodata=None, array_key: str = "dem_array"):
+        self.path = Path(path)
+        self.array_key = array_key
+
+        if not self.path.exists():
+            raise FileNotFoundError(f"DEM file not found: {self.path}")
+
+        self._lock = threading.Lock()
+        self._tiles = OrderedDict()
+        self.max_tiles = max_tiles
+        self.hits = 0
+        self.misses = 0
+
+        if self.path.suffix == ".npy":
+            if transform is None or crs is None:
+                raise ValueError("transform and crs must be provided for a memmap DEM")
+            self._dataset = None
+            self._memmap = np.load(self.path, mmap_mode="r")
+            self.height, self.width = self._memmap.shape
+            self.transform = transform if isinstance(transform, Affine) else Affine(*transform)
+            self.crs = CRS.from_user_input(crs)
+            self.nodata = nodata
+            self.tile_size = tile_size or DEFAULT_TILE_SIZE
+        else:
+            self._memmap = None
+            self._dataset = rasterio.open(self.path)
+            self.height, self.width = self._dataset.height, self._dataset.width
+            self.transform = self._dataset.transform
+            self.crs = self._dataset.crs
+            self.nodata = self._dataset.nodata if nodata is None else nodata
+            # Align tiles to the internal GeoTIFF blocks so each tile is a whole number of block reads
+            block_height, block_width = self._dataset.block_shapes[0]
+            self.tile_size = tile_size or (block_height if block_height == block_width and block_height > 1 else DEFAULT_TILE_SIZE)
+
+        if self.crs is None:
+            raise ValueError("ERROR: DEM data has no CRS, please check DEM file.")
+
+    def close(self):
+        if self._dataset is not None:
+            self._dataset.close()
+            self._dataset = None
+
+    def cache_info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "tiles": len(self._tiles), "max_tiles": self.max_tiles}
+
+    def _read_tile(self, tile_row: int, tile_col: int) -> np.ndarray:
+        row_start = tile_row * self.tile_size
+        col_start = tile_col * self.tile_size
+        row_stop = min(row_start + self.tile_size, self.height)
+        col_stop = min(col_start + self.tile_size, self.width)
+
+        if self._memmap is not None:
+            tile = np.array(self._memmap[row_start:row_stop, col_start:col_stop], dtype=float)
+        else:
+            tile = self._dataset.read(1, window=((row_start, row_stop), (col_start, col_stop))).astype(float)
+
+        # Nodata cells become NaN, matching the values ST_DumpValues returns from the dem_table
+        if self.nodata is not None and not np.isnan(self.nodata):
+            tile[tile == self.nodata] = np.nan
+
+        return tile
+
+    def _get_tile(self, tile_row: int, tile_col: int) -> np.ndarray:
+        key = (tile_row, tile_col)
+
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+
+            # rasterio datasets are not thread safe, so the read happens under the lock as well
+            tile = self._read_tile(tile_row, tile_col)
+            self.misses += 1
+            self._tiles[key] = tile
+            if len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+
+        return tile
+
+    def read_pixels(self, row_start: int, row_stop: int, col_start: int, col_stop: int) -> np.ndarray:
+        """Assemble a pixel window from cached tiles."""
+        window = np.empty((row_stop - row_start, col_stop - col_start), dtype=float)
+
+        for tile_row in range(row_start // self.tile_size, (row_stop - 1) // self.tile_size + 1):
+            for tile_col in range(col_start // self.tile_size, (col_stop - 1) // self.tile_size + 1):
+                tile = self._get_tile(tile_row, tile_col)
+
+                tile_row_origin = tile_row * self.tile_size
+                tile_col_origin = tile_col * self.tile_size
+
+                r0 = max(row_start, tile_row_origin)
+                r1 = min(row_stop, tile_row_origin + tile.shape[0])
+                c0 = max(col_start, tile_col_origin)
+                c1 = min(col_stop, tile_col_origin + tile.shape[1])
+
+                window[r0 - row_start : r1 - row_start, c0 - col_start : c1 - col_start] = tile[
+                    r0 - tile_row_origin : r1 - tile_row_origin,
+                    c0 - tile_col_origin : c1 - tile_col_origin,
+                ]
+
+        return window
+
+    def read_window(self, farm_polygon, farm_crs="EPSG:4326", padding: int = 1) -> dict | None:
+        """
+        Read the raster window covering a farm polygon.
+
+        Returns the DEM keyword arguments accepted by sapling_estimation() (with the
+        values under array_key), or None when the farm lies outside the raster extent.
+        """
+        left, bottom, right, top = transform_bounds(CRS.from_user_input(farm_crs), self.crs, *farm_polygon.bounds)
+
+        farm_window = from_bounds(left, bottom, right, top, self.transform)
+
+        row_start = max(int(math.floor(farm_window.row_off)) - padding, 0)
+        row_stop = min(int(math.ceil(farm_window.row_off + farm_window.height)) + padding, self.height)
+        col_start = max(int(math.floor(farm_window.col_off)) - padding, 0)
+        col_stop = min(int(math.ceil(farm_window.col_off + farm_window.width)) + padding, self.width)
+
+        if row_start >= row_stop or col_start >= col_stop:
+            return None
+
+        values = self.read_pixels(row_start, row_stop, col_start, col_stop)
+        upper_left_x, upper_left_y = xy(self.transform, row_start, col_start, offset="ul")
+
+        return {
+            self.array_key: values,
+            "dem_upper_left_x": float(upper_left_x),
+            "dem_upper_left_y": float(upper_left_y),
+            "pixel_width": abs(float(self.transform.a)),
+            "pixel_height": abs(float(self.transform.e)),
+            "dem_crs": self.crs.to_string(),
+        }
+
+
+@lru_cache(maxsize=None)
+def get_dem_tile_store(path=DEFAULT_DEM_PATH, tile_size: int | None = None, max_tiles: int = DEFAULT_MAX_TILES) -> LocalDemTileStore:
+    """Return a process-wide tile store for a DEM file, so every estimation shares the same tile cache."""
+    return LocalDemTileStore(path, tile_size=tile_size, max_tiles=max_tiles)
+
+
+@lru_cache(maxsize=None)
+def get_slope_tile_store(path=DEFAULT_SLOPE_PATH, tile_size: int | None = None, max_tiles: int = DEFAULT_MAX_TILES) -> LocalDemTileStore:
+    """Return a process-wide tile store for a precomputed slope raster; windows carry slope_array instead of dem_array."""
+    return LocalDemTileStore(path, tile_size=tile_size, max_tiles=max_tiles, array_key="slope_array")
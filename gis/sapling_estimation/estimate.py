@@ -1,11 +1,13 @@
 import geopandas as gpd
 import numpy as np
+import shapely
 from rasterio.transform import from_origin
 
-from sapling_estimation.planting_points import generate_planting_points
-from sapling_estimation.rotation import rotate_grid, rotation_tester
+from sapling_estimation.lattice import lattice_points, rotate_lattice
+from sapling_estimation.rotation import rotation_tester
 from sapling_estimation.slope_raster import compute_slope_from_array, slope_tester
-from sapling_estimation.slope_rules import apply_slope_rules
+from sapling_estimation.slope_rules import sample_slopes
+from sapling_estimation.transform import WEB_MERCATOR, WGS84, resolve_working_crs, transform_geometry, transform_xy
 
 
 def sapling_estimation(
@@ -21,91 +23,130 @@ def sapling_estimation(
     pixel_width=1.0,
     pixel_height=1.0,
     dem_crs="EPSG:4326",
+    slope_array=None,
+    cache=None,
+    working_crs=WEB_MERCATOR,
+    lattice="rectangular",
 ):
     """
     Main orchestrator for sapling estimation.
     Supports:
     - Rectangular planting grid (spacing_x, spacing_y)
     - Dynamic slope filtering (max_slope)
+    - Precomputed slope windows (slope_array) in place of the DEM, skipping the gradient computation
+    - An EstimationCache (cache) holding per-farm terrain and per-spacing layouts; on a terrain hit the DEM arguments may be omitted
+    - Metric working CRS for the grid (working_crs): EPSG:3857 by default, a UTM zone such as EPSG:32751, or "utm" for the farm's zone
+    - Planting lattice (lattice): rectangular, staggered, triangular or hexagonal (see lattice.py)
     """
 
-    if dem_array is None:
-        raise ValueError("DEM array must be provided")
+    working_crs = resolve_working_crs(working_crs, farm_polygon, farm_boundary_crs)
 
-    if dem_upper_left_x is None or dem_upper_left_y is None:
-        raise ValueError("DEM origin must be provided")
+    farm_key = cache.farm_key(farm_polygon, farm_boundary_crs, working_crs) if cache is not None else None
+    farm_entry = cache.get_farm(farm_key) if cache is not None else None
 
-    dem_array = np.array(dem_array, dtype=float)
+    if farm_entry is None:
+        terrain = build_terrain(dem_array, dem_upper_left_x, dem_upper_left_y, pixel_width, pixel_height, dem_crs, slope_array)
+        farm_poly_projected = transform_geometry(farm_polygon, farm_boundary_crs, working_crs)
 
-    dem_transform = from_origin(
-        dem_upper_left_x,
-        dem_upper_left_y,
-        pixel_width,
-        pixel_height,
-    )
+        if cache is not None:
+            farm_entry = cache.put_farm(farm_key, farm_poly_projected, terrain)
+    else:
+        terrain = farm_entry["terrain"]
+        farm_poly_projected = farm_entry["projected_polygon"]
 
-    farm_poly_projected = gpd.GeoSeries([farm_polygon], crs=farm_boundary_crs).to_crs("EPSG:3857").iloc[0]
+    layout = cache.get_layout(farm_entry, spacing_x, spacing_y, lattice) if farm_entry is not None else None
 
-    bounds = farm_poly_projected.bounds
+    if layout is None:
+        layout = build_layout(farm_poly_projected, terrain, spacing_x, spacing_y, working_crs, lattice)
 
-    initial_grid = generate_planting_points(farm_poly_projected, "EPSG:3857", bounds, spacing_x, spacing_y)
+        if farm_entry is not None:
+            cache.put_layout(farm_entry, spacing_x, spacing_y, layout, lattice)
 
-    rotated_grid, optimal_angle, rotation_results = rotate_grid(farm_poly_projected, initial_grid, spacing_x, spacing_y)
+    # Slope rule: points outside the DEM carry NaN slope and fail the comparison
+    kept = layout["slopes"] <= max_slope
 
-    # Compute rotation statistics from actual evaluated rotation outcomes
-    rotation_counts = [count for _, count in rotation_results]
+    final_grid = gpd.GeoDataFrame(
+        geometry=gpd.points_from_xy(layout["x"][kept], layout["y"][kept]),
+        crs="EPSG:4326",
+    )
+    slope_values = [float(value) for value in layout["slopes"][kept]]
 
-    rotation_average = float(np.mean(rotation_counts))
-    rotation_std_dev = float(np.std(rotation_counts))
+    aligned_count = len(final_grid)  # Count of planting points after slope filtering (final aligned grid)
 
-    if not rotation_tester(rotated_grid, initial_grid):
-        raise ValueError("Rotated grid failed validation")
+    if debug:
+        print(f"Optimal Rotation Angle: {layout['optimal_angle']}°")
+        print(f"Pre-slope Count: {layout['pre_slope_count']}")
+        print(f"Final Sapling Count: {aligned_count}")
 
-    pre_slope_count = len(rotated_grid)
+    return {
+        "final_grid": final_grid,
+        "slope_array": terrain["slope_array"],
+        "slope_values": slope_values,
+        "optimal_angle": layout["optimal_angle"],
+        "pre_slope_count": layout["pre_slope_count"],  # slope impact metrics
+        "aligned_count": aligned_count,
+        "rotation_average": layout["rotation_average"],  # rotation statistics
+        "rotation_std_dev": layout["rotation_std_dev"],
+    }
 
-    slope_array = compute_slope_from_array(
-        dem_array,
-        pixel_width=pixel_width,
-        pixel_height=pixel_height,
-    )
+
+def build_terrain(dem_array, dem_upper_left_x, dem_upper_left_y, pixel_width, pixel_height, dem_crs, slope_array=None) -> dict:
+    """
+    Terrain layer: validated slope window and its georeferencing, independent of spacing and max_slope.
+    """
+    if dem_array is None and slope_array is None:
+        raise ValueError("DEM array must be provided")
+
+    if dem_upper_left_x is None or dem_upper_left_y is None:
+        raise ValueError("DEM origin must be provided")
+
+    if slope_array is None:
+        slope_array = compute_slope_from_array(
+            np.array(dem_array, dtype=float),
+            pixel_width=pixel_width,
+            pixel_height=pixel_height,
+        )
+    else:
+        slope_array = np.asarray(slope_array, dtype=float)
 
     if not slope_tester(slope_array):
         raise ValueError("Slope validation failed")
 
-    rotated_grid_in_dem_crs = rotated_grid.to_crs(dem_crs)
+    return {
+        "slope_array": slope_array,
+        "transform": from_origin(dem_upper_left_x, dem_upper_left_y, pixel_width, pixel_height),
+        "crs": dem_crs,
+    }
 
-    filtered_grid, slope_values = apply_slope_rules(
-        slope_array,
-        rotated_grid_in_dem_crs,
-        dem_transform,
-        max_slope,
-    )
 
-    if filtered_grid.empty:
-        final_grid = gpd.GeoDataFrame(geometry=[], crs=dem_crs)
-    else:
-        final_grid = gpd.GeoDataFrame(
-            filtered_grid,
-            geometry=filtered_grid.geometry.name,
-            crs=dem_crs,
-        )
+def build_layout(farm_poly_projected, terrain: dict, spacing_x: float, spacing_y: float, working_crs=WEB_MERCATOR, lattice="rectangular") -> dict:
+    """
+    Layout layer: optimally rotated lattice for one spacing, with the slope sampled at every point.
+    Coordinates are returned in EPSG:4326 so any max_slope can be applied without further geometry work.
+    """
+    base_x, base_y = lattice_points(farm_poly_projected.bounds, spacing_x, spacing_y, lattice)
 
-    final_grid = final_grid.to_crs("EPSG:4326")
+    grid_x, grid_y, optimal_angle, rotation_results = rotate_lattice(farm_poly_projected, base_x, base_y)
 
-    aligned_count = len(final_grid)  # Count of planting points after slope filtering (final aligned grid)
+    # Compute rotation statistics from actual evaluated rotation outcomes
+    rotation_counts = [count for _, count in rotation_results]
 
-    if debug:
-        print(f"Optimal Rotation Angle: {optimal_angle}°")
-        print(f"Pre-slope Count: {pre_slope_count}")
-        print(f"Final Sapling Count: {len(final_grid)}")
+    initial_inside = shapely.contains_xy(farm_poly_projected, base_x, base_y)
+    if not rotation_tester(grid_x, base_x[initial_inside]):
+        raise ValueError("Rotated grid failed validation")
+
+    # Grid points are reprojected as arrays: once into the DEM CRS (a no-op when it is the working CRS) and once to EPSG:4326
+    dem_x, dem_y = transform_xy(grid_x, grid_y, working_crs, terrain["crs"])
+    slopes = sample_slopes(terrain["slope_array"], dem_x, dem_y, terrain["transform"])
+
+    lon, lat = transform_xy(grid_x, grid_y, working_crs, WGS84)
 
     return {
-        "final_grid": final_grid,
-        "slope_array": slope_array,
-        "slope_values": slope_values,
+        "x": lon,
+        "y": lat,
+        "slopes": slopes,
         "optimal_angle": optimal_angle,
-        "pre_slope_count": pre_slope_count,  # slope impact metrics
-        "aligned_count": aligned_count,
-        "rotation_average": rotation_average,  # rotation statistics
-        "rotation_std_dev": rotation_std_dev,
+        "pre_slope_count": len(grid_x),
+        "rotation_average": float(np.mean(rotation_counts)),
+        "rotation_std_dev": float(np.std(rotation_counts)),
     }
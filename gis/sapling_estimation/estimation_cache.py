@@ -0,0 +1,90 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# The estimation cache keeps the intermediates of sapling estimation per farm, so "what-if" requests on the same farm only redo the work their inputs change.
+# Farms are keyed by the content of their boundary (WKB + CRS) and the working CRS, so an edited boundary never reuses stale terrain.
+# Layers, from most to least shared:
+# - Farm entry: projected farm polygon and the slope window covering it (independent of spacing and max_slope)
+# - Layout: rotated planting grid per (spacing_x, spacing_y, lattice), with the slope sampled at every point
+# A new max_slope is then only a threshold over the cached per-point slopes, and a new spacing reuses the terrain.
+
+DEFAULT_MAX_FARMS = 128
+DEFAULT_MAX_LAYOUTS_PER_FARM = 8
+
+
+class EstimationCache:
+    """
+    Bounded, thread-safe LRU cache of per-farm terrain and planting layouts.
+    """
+
+    def __init__(self, max_farms: int = DEFAULT_MAX_FARMS, max_layouts_per_farm: int = DEFAULT_MAX_LAYOUTS_PER_FARM):
+        self.max_farms = max_farms
+        self.max_layouts_per_farm = max_layouts_per_farm
+        self._farms = OrderedDict()
+        self._lock = threading.Lock()
+        self.farm_hits = 0
+        self.farm_misses = 0
+        self.layout_hits = 0
+        self.layout_misses = 0
+
+    @staticmethod
+    def farm_key(farm_polygon, farm_crs, working_crs="EPSG:3857") -> str:
+        return hashlib.sha1(farm_polygon.wkb + f"{farm_crs}|{working_crs}".encode()).hexdigest()
+
+    def has_terrain(self, farm_polygon, farm_crs="EPSG:4326", working_crs="EPSG:3857") -> bool:
+        """Whether the terrain for a farm is cached, i.e. the caller can skip fetching the DEM."""
+        with self._lock:
+            return self.farm_key(farm_polygon, farm_crs, working_crs) in self._farms
+
+    def get_farm(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._farms.get(key)
+            if entry is None:
+                self.farm_misses += 1
+                return None
+            self._farms.move_to_end(key)
+            self.farm_hits += 1
+            return entry
+
+    def put_farm(self, key: str, projected_polygon, terrain: dict) -> dict:
+        entry = {"projected_polygon": projected_polygon, "terrain": terrain, "layouts": OrderedDict()}
+        with self._lock:
+            self._farms[key] = entry
+            self._farms.move_to_end(key)
+            if len(self._farms) > self.max_farms:
+                self._farms.popitem(last=False)
+        return entry
+
+    def get_layout(self, entry: dict, spacing_x: float, spacing_y: float, lattice: str = "rectangular") -> dict | None:
+        layout_key = (float(spacing_x), float(spacing_y), lattice)
+        with self._lock:
+            layout = entry["layouts"].get(layout_key)
+            if layout is None:
+                self.layout_misses += 1
+                return None
+            entry["layouts"].move_to_end(layout_key)
+            self.layout_hits += 1
+            return layout
+
+    def put_layout(self, entry: dict, spacing_x: float, spacing_y: float, layout: dict, lattice: str = "rectangular") -> None:
+        layout_key = (float(spacing_x), float(spacing_y), lattice)
+        with self._lock:
+            entry["layouts"][layout_key] = layout
+            entry["layouts"].move_to_end(layout_key)
+            if len(entry["layouts"]) > self.max_layouts_per_farm:
+                entry["layouts"].popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._farms.clear()
+
+    def cache_info(self) -> dict:
+        return {
+            "farms": len(self._farms),
+            "max_farms": self.max_farms,
+            "farm_hits": self.farm_hits,
+            "farm_misses": self.farm_misses,
+            "layout_hits": self.layout_hits,
+            "layout_misses": self.layout_misses,
+        }
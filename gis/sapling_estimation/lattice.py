@@ -0,0 +1,81 @@
+import numpy as np
+import shapely
+
+# The lattice module generates planting layouts as coordinate arrays and counts them against the farm polygon in one vectorised call.
+# Supported lattices (spacing in metres of the working CRS):
+# - rectangular: spacing_x along rows, spacing_y between rows (the original grid)
+# - staggered: rectangular rows with every other row shifted by spacing_x / 2 (same density, trees offset between rows)
+# - triangular: equilateral triangles of side spacing_x, rows spacing_x * sqrt(3) / 2 apart (~15% more trees than a square grid)
+# - hexagonal: the forestry name for the same equilateral layout (each tree has six neighbours at spacing_x), an alias of triangular
+# The rotation search rotates the lattice, not the polygon, and counts with shapely.contains_xy, so no Point objects are created.
+
+LATTICE_TYPES = ("rectangular", "staggered", "triangular", "hexagonal")
+
+
+def lattice_points(bounds: tuple, spacing_x: float, spacing_y: float, lattice: str = "rectangular") -> tuple[np.ndarray, np.ndarray]:
+    """Lattice coordinates covering bounds (xmin, ymin, xmax, ymax), starting at the lower-left corner."""
+    if lattice not in LATTICE_TYPES:
+        raise ValueError(f"Unknown lattice '{lattice}', expected one of {', '.join(LATTICE_TYPES)}")
+
+    xmin, ymin, xmax, ymax = bounds
+
+    if lattice == "rectangular":
+        xx, yy = np.meshgrid(np.arange(xmin, xmax, spacing_x), np.arange(ymin, ymax, spacing_y))
+        return xx.ravel(), yy.ravel()
+
+    row_spacing = spacing_y if lattice == "staggered" else spacing_x * np.sqrt(3) / 2
+
+    # One extra column so shifted rows still reach xmax
+    cols = np.arange(xmin, xmax + spacing_x, spacing_x)
+    rows = np.arange(ymin, ymax, row_spacing)
+    xx, yy = np.meshgrid(cols, rows)
+
+    row_index = np.arange(len(rows))[:, None]
+    xx = xx + (row_index % 2) * (spacing_x / 2)
+
+    keep = xx < xmax
+    return xx[keep], yy[keep]
+
+
+def count_in_polygon(polygon, xs: np.ndarray, ys: np.ndarray) -> int:
+    """Number of lattice points strictly inside the polygon (the polygon should be prepared)."""
+    return int(np.count_nonzero(shapely.contains_xy(polygon, xs, ys)))
+
+
+def rotate_xy(xs: np.ndarray, ys: np.ndarray, angle: float, origin) -> tuple[np.ndarray, np.ndarray]:
+    """Rotate coordinates counter-clockwise by angle (degrees) around origin (x, y)."""
+    theta = np.radians(angle)
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    dx = xs - origin[0]
+    dy = ys - origin[1]
+    return origin[0] + dx * cos_t - dy * sin_t, origin[1] + dx * sin_t + dy * cos_t
+
+
+def rotate_lattice(farm_polygon, xs: np.ndarray, ys: np.ndarray, max_angle: int = 90):
+    """
+    Rotation search over whole degrees 0..max_angle around the farm centroid.
+
+    Returns the rotated points inside the farm (x, y arrays), the optimal angle and the (angle, count) results.
+    Ties keep the smallest angle, matching rotation.rotate_grid.
+    """
+    shapely.prepare(farm_polygon)
+    centroid = farm_polygon.centroid
+    origin = (centroid.x, centroid.y)
+
+    optimal_angle = 0
+    highest_count = -1
+    rotation_results = []
+
+    for angle in range(0, max_angle + 1):
+        rot_x, rot_y = rotate_xy(xs, ys, angle, origin)
+        count = count_in_polygon(farm_polygon, rot_x, rot_y)
+        rotation_results.append((angle, count))
+
+        if count > highest_count:
+            optimal_angle = angle
+            highest_count = count
+
+    rot_x, rot_y = rotate_xy(xs, ys, optimal_angle, origin)
+    inside = shapely.contains_xy(farm_polygon, rot_x, rot_y)
+
+    return rot_x[inside], rot_y[inside], optimal_angle, rotation_results
@@ -0,0 +1,184 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from rasterio.transform import rowcol
+
+from sapling_estimation.dem_source import DEFAULT_MAX_TILES, LocalDemTileStore, get_dem_tile_store, get_slope_tile_store
+from sapling_estimation.estimate import sapling_estimation
+from sapling_estimation.transform import WEB_MERCATOR
+
+# Region batch runs sapling estimation for many farms (e.g. a whole district) in a process pool.
+# Farms are grouped by the terrain tile under their centroid, and each worker process keeps its own
+# tile-cached reader of the same read-only DEM/slope file, so neighbouring farms handled by one worker reuse decoded tiles.
+# Results carry the final grid as plain coordinate arrays, ready for a bulk insert by the caller.
+
+DEFAULT_CHUNK_SIZE = 16
+
+_worker_store = None
+
+
+def partition_farms(farms, terrain_store: LocalDemTileStore, chunk_size: int = DEFAULT_CHUNK_SIZE, farm_crs="EPSG:4326") -> list:
+    """
+    Group farms into work chunks by terrain tile locality.
+
+    farms: iterable of (farm_id, polygon WKB) pairs
+    Returns a list of chunks (lists of (farm_id, WKB)); farms on the same tile are adjacent and share chunks.
+    """
+    farms = list(farms)
+    if not farms:
+        return []
+
+    polygons = shapely.from_wkb([wkb for _, wkb in farms])
+    centroids = gpd.GeoSeries(shapely.centroid(polygons), crs=farm_crs).to_crs(terrain_store.crs)
+
+    # Pixel row/col of each centroid, then the tile holding it
+    rows, cols = rowcol(terrain_store.transform, centroids.x, centroids.y)
+    tile_rows = np.floor_divide(rows, terrain_store.tile_size)
+    tile_cols = np.floor_divide(cols, terrain_store.tile_size)
+
+    order = np.lexsort((tile_cols, tile_rows))
+
+    chunks = []
+    current, current_tile = [], None
+    for index in order:
+        tile = (tile_rows[index], tile_cols[index])
+        if current and (tile != current_tile or len(current) >= chunk_size):
+            chunks.append(current)
+            current = []
+        current.append(farms[index])
+        current_tile = tile
+
+    chunks.append(current)
+    return chunks
+
+
+def _init_worker(terrain_path, array_key: str, max_tiles: int):
+    global _worker_store
+    if array_key == "slope_array":
+        _worker_store = get_slope_tile_store(terrain_path, max_tiles=max_tiles)
+    else:
+        _worker_store = get_dem_tile_store(terrain_path, max_tiles=max_tiles)
+
+
+def estimate_chunk(chunk, spacing_x: float, spacing_y: float, max_slope: float, working_crs=WEB_MERCATOR) -> list:
+    """Estimate every farm of a chunk against the worker's terrain store; failures are reported per farm."""
+    results = []
+
+    for farm_id, wkb in chunk:
+        start = time.perf_counter()
+        try:
+            farm_polygon = shapely.from_wkb(wkb)
+            terrain_window = _worker_store.read_window(farm_polygon, "EPSG:4326")
+
+            if terrain_window is None:
+                results.append({"farm_id": farm_id, "status": "failed", "message": "DEM not found", "seconds": time.perf_counter() - start})
+                continue
+
+            estimation_result = sapling_estimation(
+                farm_polygon=farm_polygon,
+                spacing_x=spacing_x,
+                spacing_y=spacing_y,
+                max_slope=max_slope,
+                farm_boundary_crs="EPSG:4326",
+                working_crs=working_crs,
+                **terrain_window,
+            )
+            final_grid = estimation_result["final_grid"]
+
+            results.append(
+                {
+                    "farm_id": farm_id,
+                    "status": "success",
+                    "pre_slope_count": estimation_result["pre_slope_count"],
+                    "aligned_count": estimation_result["aligned_count"],
+                    "optimal_angle": estimation_result["optimal_angle"],
+                    "rotation_average": estimation_result["rotation_average"],
+                    "rotation_std_dev": estimation_result["rotation_std_dev"],
+                    "xs": final_grid.geometry.x.tolist(),
+                    "ys": final_grid.geometry.y.tolist(),
+                    "slopes": estimation_result["slope_values"],
+                    "seconds": time.perf_counter() - start,
+                }
+            )
+        except Exception as e:
+            results.append({"farm_id": farm_id, "status": "failed", "message": str(e), "seconds": time.perf_counter() - start})
+
+    return results
+
+
+def run_region_estimation(
+    farms,
+    terrain_path,
+    spacing_x: float,
+    spacing_y: float,
+    max_slope: float,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    array_key: str = "dem_array",
+    max_tiles: int = DEFAULT_MAX_TILES,
+    working_crs=WEB_MERCATOR,
+):
+    """
+    Run sapling estimation for many farms in a process pool.
+
+    farms: iterable of (farm_id, polygon WKB in EPSG:4326) pairs
+    terrain_path: local DEM (array_key="dem_array") or precomputed slope raster (array_key="slope_array")
+    Yields the result list of each chunk as it completes, so callers can write results incrementally.
+    Closing the generator early cancels the chunks that have not started; close() waits for the
+    running ones, so async callers should call it off the event loop.
+    """
+    terrain_store = LocalDemTileStore(terrain_path, array_key=array_key)
+    try:
+        chunks = partition_farms(farms, terrain_store, chunk_size=chunk_size)
+    finally:
+        terrain_store.close()
+
+    if not chunks:
+        return
+
+    # spawn keeps workers independent of the caller's threads and open file handles
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(str(terrain_path), array_key, max_tiles),
+    )
+    try:
+        futures = [executor.submit(estimate_chunk, chunk, spacing_x, spacing_y, max_slope, working_crs) for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
+    except BaseException:
+        # Closed early (GeneratorExit) or a chunk failed: drop the queued chunks, only wait for the running ones
+        executor.shutdown(cancel_futures=True)
+        raise
+    executor.shutdown()
+
+
+def summarize_region_run(results: list, elapsed_seconds: float) -> dict:
+    """Throughput and per-farm timing statistics of a region run."""
+    seconds = np.array([result["seconds"] for result in results], dtype=float)
+    succeeded = sum(1 for result in results if result["status"] == "success")
+
+    summary = {
+        "farm_count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed_seconds": float(elapsed_seconds),
+        "farms_per_second": float(len(results) / elapsed_seconds) if elapsed_seconds > 0 else 0.0,
+    }
+
+    if len(seconds):
+        summary.update(
+            {
+                "farm_seconds_mean": float(np.mean(seconds)),
+                "farm_seconds_p50": float(np.percentile(seconds, 50)),
+                "farm_seconds_p95": float(np.percentile(seconds, 95)),
+                "farm_seconds_max": float(np.max(seconds)),
+            }
+        )
+
+    return summary
@@ -3,29 +3,40 @@ import numpy as np
 import rasterio
 
 
+def sample_slopes(slope_array: np.ndarray, xs, ys, slope_transform) -> np.ndarray:
+    """
+    Sample the slope raster at each point, returning NaN for points outside the raster.
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    slopes = np.full(xs.shape, np.nan)
+
+    if xs.size == 0:
+        return slopes
+
+    rows, cols = rasterio.transform.rowcol(slope_transform, xs, ys)
+    rows = np.asarray(rows)
+    cols = np.asarray(cols)
+
+    height, width = slope_array.shape
+    inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    slopes[inside] = slope_array[rows[inside], cols[inside]]
+
+    return slopes
+
+
 def apply_slope_rules(
     slope_array: np.ndarray,
     rotated_grid: gpd.GeoDataFrame,
     slope_transform,
     max_slope: float,
 ):
-    xs = [point.x for point in rotated_grid.geometry]
-    ys = [point.y for point in rotated_grid.geometry]
-
-    rows, cols = rasterio.transform.rowcol(slope_transform, xs, ys)
-
-    height, width = slope_array.shape
-    kept_indices = []
-    kept_slopes = []
+    slopes = sample_slopes(slope_array, rotated_grid.geometry.x, rotated_grid.geometry.y, slope_transform)
 
-    for idx, (r, c) in enumerate(zip(rows, cols)):
-        if 0 <= r < height and 0 <= c < width:
-            slope_value = float(slope_array[r, c])
-            if slope_value <= max_slope:
-                kept_indices.append(idx)
-                kept_slopes.append(slope_value)
+    # Points outside the raster are NaN and fail the comparison, so they are dropped as well
+    kept = slopes <= max_slope
 
-    adjusted_points = rotated_grid.iloc[kept_indices].copy()
+    adjusted_points = rotated_grid.iloc[np.flatnonzero(kept)].copy()
 
     adjusted_points = gpd.GeoDataFrame(
         adjusted_points,
@@ -33,4 +44,4 @@ def apply_slope_rules(
         crs=rotated_grid.crs,
     )
 
-    return adjusted_points, kept_slopes
+    return adjusted_points, [float(value) for value in slopes[kept]]
@@ -0,0 +1,69 @@
+from functools import lru_cache
+
+import numpy as np
+import shapely
+from pyproj import CRS, Transformer
+
+# The transform layer reprojects coordinate arrays and single geometries with cached pyproj Transformers.
+# Building a transformation pipeline is far more expensive than applying it, so every CRS pair is built once per process.
+# Coordinates stay as NumPy arrays, so planting points never round-trip through GeoDataFrames to change CRS.
+# Metric working CRSs: "EPSG:3857" (Web Mercator, the original default), an explicit UTM zone such as
+# "EPSG:32751" (CRS_ANALYSIS in the backend) or "utm" to pick the UTM zone of the farm.
+
+WEB_MERCATOR = "EPSG:3857"
+WGS84 = "EPSG:4326"
+
+
+def _crs_key(crs) -> str:
+    # rasterio and pyproj CRS objects are normalised to a string so they share cache entries with "EPSG:xxxx"
+    return crs if isinstance(crs, str) else crs.to_string()
+
+
+@lru_cache(maxsize=64)
+def _cached_transformer(src_crs: str, dst_crs: str) -> Transformer:
+    return Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+
+
+@lru_cache(maxsize=64)
+def _same_crs(src_crs: str, dst_crs: str) -> bool:
+    return src_crs == dst_crs or CRS.from_user_input(src_crs) == CRS.from_user_input(dst_crs)
+
+
+def get_transformer(src_crs, dst_crs) -> Transformer:
+    """Return the process-wide Transformer for a CRS pair (x/y axis order)."""
+    return _cached_transformer(_crs_key(src_crs), _crs_key(dst_crs))
+
+
+def transform_xy(xs, ys, src_crs, dst_crs) -> tuple[np.ndarray, np.ndarray]:
+    """Reproject coordinate arrays; returns them unchanged (as arrays) when the CRSs are equal."""
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+
+    if _same_crs(_crs_key(src_crs), _crs_key(dst_crs)):
+        return xs, ys
+
+    return get_transformer(src_crs, dst_crs).transform(xs, ys)
+
+
+def transform_geometry(geometry, src_crs, dst_crs):
+    """Reproject a shapely geometry through the cached Transformer."""
+    if _same_crs(_crs_key(src_crs), _crs_key(dst_crs)):
+        return geometry
+
+    transformer = get_transformer(src_crs, dst_crs)
+    return shapely.transform(geometry, lambda coords: np.column_stack(transformer.transform(coords[:, 0], coords[:, 1])))
+
+
+def utm_crs_for(lon: float, lat: float) -> str:
+    """EPSG code of the WGS84 UTM zone containing a lon/lat position."""
+    zone = min(int((lon + 180) // 6) + 1, 60)
+    return f"EPSG:{32600 + zone if lat >= 0 else 32700 + zone}"
+
+
+def resolve_working_crs(working_crs, farm_polygon, farm_crs) -> str:
+    """Resolve the metric CRS used for grid generation; "utm" selects the UTM zone of the farm centroid."""
+    if working_crs != "utm":
+        return _crs_key(working_crs)
+
+    centroid = transform_geometry(farm_polygon.centroid, farm_crs, WGS84)
+    return utm_crs_for(centroid.x, centroid.y)
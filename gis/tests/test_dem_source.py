@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from shapely.geometry import box
+
+from sapling_estimation.dem_source import LocalDemTileStore
+from sapling_estimation.estimate import sapling_estimation
+
+
+@pytest.fixture
+def dem_values():
+    # Creates a 64x64 DEM with a gentle slope along both axes
+    rows, cols = np.mgrid[0:64, 0:64]
+    return (100 + rows * 0.5 + cols * 0.25).astype(np.float32)
+
+
+@pytest.fixture
+def create_tiled_dem(tmp_path, dem_values):
+    dem_path = tmp_path / "DEM.tif"
+
+    # 10m pixels in a metric CRS, internally tiled in 16x16 blocks
+    with rasterio.open(
+        dem_path,
+        "w",
+        driver="GTiff",
+        height=dem_values.shape[0],
+        width=dem_values.shape[1],
+        count=1,
+        dtype="float32",
+        crs="EPSG:3857",
+        transform=from_origin(0, 640, 10, 10),
+        tiled=True,
+        blockxsize=16,
+        blockysize=16,
+    ) as dst:
+        dst.write(dem_values, 1)
+
+    return dem_path
+
+
+def test_read_window_matches_raster(create_tiled_dem, dem_values):
+    store = LocalDemTileStore(create_tiled_dem)
+    window = store.read_window(box(100, 100, 300, 300), farm_crs="EPSG:3857", padding=0)
+
+    # Pixel rows 34..54 and cols 10..30 cover the farm bounds
+    assert window["dem_array"].shape == (20, 20)
+    np.testing.assert_array_equal(window["dem_array"], dem_values[34:54, 10:30])
+    assert window["dem_upper_left_x"] == 100
+    assert window["dem_upper_left_y"] == 300
+    assert window["pixel_width"] == 10
+    assert window["pixel_height"] == 10
+    assert window["dem_crs"] == "EPSG:3857"
+
+
+def test_tiles_are_cached_between_reads(create_tiled_dem):
+    store = LocalDemTileStore(create_tiled_dem)
+    farm = box(100, 100, 300, 300)
+
+    store.read_window(farm, farm_crs="EPSG:3857")
+    first_misses = store.cache_info()["misses"]
+
+    store.read_window(farm, farm_crs="EPSG:3857")
+    info = store.cache_info()
+
+    assert info["misses"] == first_misses  # Second read is served entirely from cache
+    assert info["hits"] >= first_misses
+
+
+def test_lru_evicts_oldest_tiles(create_tiled_dem):
+    store = LocalDemTileStore(create_tiled_dem, max_tiles=2)
+    store.read_window(box(0, 0, 640, 640), farm_crs="EPSG:3857")
+
+    assert store.cache_info()["tiles"] == 2
+
+
+def test_farm_outside_dem_returns_none(create_tiled_dem):
+    store = LocalDemTileStore(create_tiled_dem)
+
+    assert store.read_window(box(5000, 5000, 5100, 5100), farm_crs="EPSG:3857") is None
+
+
+def test_memmap_dem_matches_geotiff(tmp_path, create_tiled_dem, dem_values):
+    npy_path = tmp_path / "DEM.npy"
+    np.save(npy_path, dem_values)
+
+    farm = box(100, 100, 300, 300)
+    memmap_store = LocalDemTileStore(npy_path, tile_size=16, transform=from_origin(0, 640, 10, 10), crs="EPSG:3857")
+    geotiff_store = LocalDemTileStore(create_tiled_dem)
+
+    np.testing.assert_array_equal(
+        memmap_store.read_window(farm, farm_crs="EPSG:3857")["dem_array"],
+        geotiff_store.read_window(farm, farm_crs="EPSG:3857")["dem_array"],
+    )
+
+
+def test_memmap_requires_georeferencing(tmp_path, dem_values):
+    npy_path = tmp_path / "DEM.npy"
+    np.save(npy_path, dem_values)
+
+    with pytest.raises(ValueError):
+        LocalDemTileStore(npy_path)
+
+
+def test_window_drives_sapling_estimation(create_tiled_dem):
+    store = LocalDemTileStore(create_tiled_dem)
+    farm = box(100, 100, 300, 300)
+
+    result = sapling_estimation(
+        farm_polygon=farm,
+        spacing_x=10,
+        spacing_y=10,
+        max_slope=15,
+        farm_boundary_crs="EPSG:3857",
+        **store.read_window(farm, farm_crs="EPSG:3857"),
+    )
+
+    assert result["aligned_count"] > 0
+    assert result["aligned_count"] == result["pre_slope_count"]
@@ -63,3 +63,36 @@ def test_sapling_estimation(create_farm_polygon, create_dem_array):
 
     assert result["rotation_std_dev"] >= 0
     assert result["rotation_average"] >= 0
+
+
+def test_sapling_estimation_with_precomputed_slope(create_farm_polygon, create_dem_array):
+    common = dict(
+        farm_polygon=create_farm_polygon,
+        spacing_x=10,
+        spacing_y=10,
+        max_slope=15,
+        farm_boundary_crs="EPSG:3857",
+        dem_upper_left_x=0,
+        dem_upper_left_y=100,
+        pixel_width=10,
+        pixel_height=10,
+        dem_crs="EPSG:3857",
+    )
+
+    from_dem = sapling_estimation(dem_array=create_dem_array, **common)
+    from_slope = sapling_estimation(slope_array=np.zeros((10, 10)), **common)
+
+    assert from_slope["aligned_count"] == from_dem["aligned_count"]
+    assert from_slope["slope_values"] == from_dem["slope_values"]
+
+
+def test_sapling_estimation_requires_terrain(create_farm_polygon):
+    with pytest.raises(ValueError, match="DEM array must be provided"):
+        sapling_estimation(
+            farm_polygon=create_farm_polygon,
+            spacing_x=10,
+            spacing_y=10,
+            max_slope=15,
+            dem_upper_left_x=0,
+            dem_upper_left_y=100,
+        )
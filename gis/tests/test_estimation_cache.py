@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+
+from sapling_estimation.estimate import sapling_estimation
+from sapling_estimation.estimation_cache import EstimationCache
+
+
+@pytest.fixture
+def create_farm_polygon():
+    # Creates a 100m x 100m square polygon
+    return Polygon([(0, 0), (0, 100), (100, 100), (100, 0)])
+
+
+@pytest.fixture
+def create_dem_kwargs():
+    # Flat on the western half, steep (~45°) on the eastern half
+    cols = np.arange(10)
+    dem = np.tile(np.where(cols < 5, 10.0, 10.0 + (cols - 4) * 10.0), (10, 1))
+
+    return dict(
+        dem_array=dem,
+        dem_upper_left_x=0,
+        dem_upper_left_y=100,
+        pixel_width=10,
+        pixel_height=10,
+        dem_crs="EPSG:3857",
+    )
+
+
+def run(farm, cache, max_slope=15, spacing=10, **dem_kwargs):
+    return sapling_estimation(
+        farm_polygon=farm,
+        spacing_x=spacing,
+        spacing_y=spacing,
+        max_slope=max_slope,
+        farm_boundary_crs="EPSG:3857",
+        cache=cache,
+        **dem_kwargs,
+    )
+
+
+def test_cached_result_matches_uncached(create_farm_polygon, create_dem_kwargs):
+    cache = EstimationCache()
+
+    uncached = run(create_farm_polygon, None, **create_dem_kwargs)
+    run(create_farm_polygon, cache, **create_dem_kwargs)
+    cached = run(create_farm_polygon, cache, **create_dem_kwargs)
+
+    assert cached["aligned_count"] == uncached["aligned_count"]
+    assert cached["slope_values"] == uncached["slope_values"]
+    assert cached["optimal_angle"] == uncached["optimal_angle"]
+    assert cache.cache_info()["layout_hits"] == 1
+
+
+def test_terrain_hit_does_not_need_dem(create_farm_polygon, create_dem_kwargs):
+    cache = EstimationCache()
+    run(create_farm_polygon, cache, **create_dem_kwargs)
+
+    assert cache.has_terrain(create_farm_polygon, "EPSG:3857")
+
+    # Only the farm boundary is needed once its terrain is cached
+    result = run(create_farm_polygon, cache)
+
+    assert result["aligned_count"] > 0
+
+
+def test_max_slope_change_reuses_layout(create_farm_polygon, create_dem_kwargs):
+    cache = EstimationCache()
+
+    strict = run(create_farm_polygon, cache, max_slope=5, **create_dem_kwargs)
+    relaxed = run(create_farm_polygon, cache, max_slope=90)
+
+    assert strict["pre_slope_count"] == relaxed["pre_slope_count"]
+    assert strict["aligned_count"] < relaxed["aligned_count"]
+    assert max(strict["slope_values"]) <= 5
+    assert cache.cache_info()["layout_misses"] == 1
+
+
+def test_spacing_change_reuses_terrain(create_farm_polygon, create_dem_kwargs):
+    cache = EstimationCache()
+
+    run(create_farm_polygon, cache, spacing=10, **create_dem_kwargs)
+    result = run(create_farm_polygon, cache, spacing=20)
+
+    info = cache.cache_info()
+    assert result["pre_slope_count"] > 0
+    assert info["farm_hits"] == 1
+    assert info["layout_misses"] == 2
+
+
+def test_edited_boundary_misses(create_farm_polygon, create_dem_kwargs):
+    cache = EstimationCache()
+    run(create_farm_polygon, cache, **create_dem_kwargs)
+
+    edited = Polygon([(0, 0), (0, 90), (90, 90), (90, 0)])
+
+    assert not cache.has_terrain(edited, "EPSG:3857")
+    with pytest.raises(ValueError, match="DEM array must be provided"):
+        run(edited, cache)
+
+
+def test_lru_bounds_farms_and_layouts(create_farm_polygon, create_dem_kwargs):
+    cache = EstimationCache(max_farms=1, max_layouts_per_farm=1)
+
+    run(create_farm_polygon, cache, spacing=10, **create_dem_kwargs)
+    run(create_farm_polygon, cache, spacing=20)
+    run(Polygon([(0, 0), (0, 90), (90, 90), (90, 0)]), cache, **create_dem_kwargs)
+
+    assert cache.cache_info()["farms"] == 1
+    assert not cache.has_terrain(create_farm_polygon, "EPSG:3857")
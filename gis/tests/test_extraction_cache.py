@@ -0,0 +1,111 @@
+import pytest
+
+import core.extract_data as extract_data
+import core.extraction_cache as extraction_cache
+from core.extract_data import extract_profile_values, get_area_ha, get_rainfall
+from core.extraction_cache import ExtractionCache, cached_value, geometry_hash
+
+FARM = [[(-8.020, 125.010), (-8.020, 125.020), (-8.030, 125.020), (-8.030, 125.010), (-8.020, 125.010)]]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ExtractionCache(str(tmp_path / "extraction_cache.sqlite"))
+    monkeypatch.setattr(extraction_cache, "_cache", cache)
+    yield cache
+    cache.close()
+
+
+def test_geometry_hash_ignores_ring_start_and_orientation():
+    ring = FARM[0][:-1]
+    rotated = [ring[2:] + ring[:2] + [ring[2]]]
+    reversed_ring = [list(reversed(FARM[0]))]
+
+    assert geometry_hash(FARM) == geometry_hash(rotated) == geometry_hash(reversed_ring)
+    assert geometry_hash(FARM) != geometry_hash((-8.02, 125.01))
+
+
+def test_round_trip_including_no_data(cache):
+    cache.put(FARM, {"rainfall": 91734.0, "soil_ph": None, "centroid": [125.015, -8.025]}, year=2024)
+
+    hits = cache.get(FARM, ["rainfall", "soil_ph", "centroid", "elevation"], year=2024)
+
+    assert hits == {"rainfall": 91734.0, "soil_ph": None, "centroid": [125.015, -8.025]}
+
+
+def test_temporal_datasets_are_keyed_by_year(cache):
+    cache.put(FARM, {"rainfall": 1.0, "elevation": 412.0}, year=2023)
+
+    # Rainfall is yearly, elevation is static
+    assert cache.get(FARM, ["rainfall", "elevation"], year=2024) == {"elevation": 412.0}
+
+
+def test_entries_expire_after_dataset_ttl(cache, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(extraction_cache.time, "time", lambda: now)
+    cache.put(FARM, {"rainfall": 1.0, "elevation": 412.0}, year=2024)
+
+    now += 366 * 24 * 3600
+
+    # CHIRPS has a yearly TTL, SRTM is kept until its asset changes
+    assert cache.get(FARM, ["rainfall", "elevation"], year=2024) == {"elevation": 412.0}
+
+
+def test_asset_change_misses(cache, monkeypatch):
+    cache.put(FARM, {"elevation": 412.0})
+    monkeypatch.setitem(extract_data.get_dataset_config("elevation"), "asset_id", "USGS/SRTMGL1_003")
+
+    assert cache.get(FARM, ["elevation"]) == {}
+
+
+def test_clear_one_dataset(cache):
+    cache.put(FARM, {"elevation": 412.0, "soil_ph": 62.0})
+
+    cache.clear("elevation")
+
+    assert cache.get(FARM, ["elevation", "soil_ph"]) == {"soil_ph": 62.0}
+
+
+def test_cached_value_computes_once(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 25000.0
+
+    assert cached_value(FARM, "area_m2", compute) == 25000.0
+    assert cached_value(FARM, "area_m2", compute) == 25000.0
+    assert len(calls) == 1
+
+
+def test_getters_served_from_cache_without_gee(cache):
+    # Earth Engine is not initialised here, so any GEE request would fail
+    cache.put(FARM, {"rainfall": 1834.6, "area_m2": 25000.0}, year=2024)
+
+    assert get_rainfall(FARM, year=2024) == 1835
+    assert get_area_ha(FARM) == 2.5
+
+
+def test_profile_values_served_from_cache_without_gee(cache):
+    cache.put(
+        FARM,
+        {
+            "rainfall": 1834.6,
+            "temperature": 15000.0,
+            "elevation": 412.4,
+            "soil_ph": 62.0,
+            "soil_texture": 4.0,
+            "slope": 4.12345,
+            "area_m2": 25000.0,
+            "centroid": [125.015, -8.025],
+        },
+        year=2024,
+    )
+
+    values = extract_profile_values(FARM, year=2024)
+
+    assert values["rainfall"] == 1835
+    assert values["soil_ph"] == 6.2
+    assert values["soil_texture_id"] == 4
+    assert values["slope"] == 4.123
+    assert (values["latitude"], values["longitude"]) == (-8.025, 125.015)
@@ -11,6 +11,7 @@ OpenLandMap pH:   r=0.18, MAE=1.21   - POOR (not recommended)
 """
 
 import os
+import time
 
 import pandas as pd
 import pytest
@@ -22,7 +23,10 @@ from config.settings import (
     get_dataset_config,
 )
 from core.extract_data import (
+    _finalize_profile_values,
     _normalize_texture_name,
+    extract_batch,
+    extract_profile_values,
     get_area_ha,
     get_centroid_lat_lon,
     get_elevation,
@@ -33,6 +37,7 @@ from core.extract_data import (
     get_texture,
 )
 from core.farm_profile import (
+    batch_create_profiles,
     build_farm_profile,
     bulk_create_profiles,
     bulk_update_profiles,
@@ -333,6 +338,107 @@ def test_build_farm_profile_point(gee_initialized, test_point):
         print(f"  {key}: {value}")
 
 
+@pytest.fixture
+def fake_extractors(monkeypatch):
+    """Replace the per-dataset getters with slow fakes, so concurrency is measurable without GEE."""
+    import core.farm_profile as farm_profile
+
+    def slow(value, delay=0.2):
+        def extractor(*args, **kwargs):
+            time.sleep(delay)
+            return value
+
+        return extractor
+
+    for name, value in [
+        ("get_rainfall", 1500),
+        ("get_temperature", 24.5),
+        ("get_ph", 6.1),
+        ("get_elevation", 80),
+        ("get_slope", 4.2),
+        ("get_area_ha", 1.2),
+        ("get_texture_id", 4),
+        ("get_centroid_lat_lon", (-8.55, 125.57)),
+    ]:
+        monkeypatch.setattr(farm_profile, name, slow(value))
+
+    return farm_profile, monkeypatch, slow
+
+
+def test_build_farm_profile_concurrent(fake_extractors):
+    """Concurrent extraction takes about as long as the slowest dataset, not the sum."""
+    start = time.perf_counter()
+    profile = build_farm_profile((-8.55, 125.57), year=2024, farm_id=1, concurrent=True, timeout=5)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0
+    assert profile["status"] == "success"
+    assert profile["rainfall_mm"] == 1500
+    assert profile["soil_texture_id"] == 4
+    assert (profile["latitude"], profile["longitude"]) == (-8.55, 125.57)
+    assert profile["coastal"] is True
+
+
+def test_build_farm_profile_concurrent_partial_failure(fake_extractors):
+    """A failing or slow dataset leaves its fields empty instead of failing the profile."""
+    farm_profile, monkeypatch, slow = fake_extractors
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("quota exceeded")
+
+    monkeypatch.setattr(farm_profile, "get_temperature", broken)
+    monkeypatch.setattr(farm_profile, "get_slope", slow(4.2, delay=2))
+
+    profile = build_farm_profile((-8.55, 125.57), year=2024, farm_id=1, concurrent=True, timeout=0.5, soil_ph=6.4)
+
+    assert profile["status"] == "partial"
+    assert profile["temperature_celsius"] is None
+    assert profile["slope_degrees"] is None
+    assert sorted(profile["failed_fields"]) == ["slope_degrees", "temperature_celsius"]
+    assert "quota exceeded" in profile["error"]
+    assert "timed out" in profile["error"]
+    assert profile["rainfall_mm"] == 1500
+    assert profile["soil_ph"] == 6.4
+
+
+def test_build_farm_profile_concurrent_all_failed(fake_extractors):
+    farm_profile, monkeypatch, _ = fake_extractors
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("network unreachable")
+
+    for name in ["get_rainfall", "get_temperature", "get_ph", "get_elevation", "get_slope", "get_area_ha", "get_texture_id", "get_centroid_lat_lon"]:
+        monkeypatch.setattr(farm_profile, name, broken)
+
+    profile = build_farm_profile((-8.55, 125.57), farm_id=1, concurrent=True, timeout=1)
+
+    assert profile["status"] == "failed"
+    assert "network unreachable" in profile["error"]
+
+
+def test_batch_create_profiles_stops_at_deadline(monkeypatch):
+    """Batches not started before the deadline are not sent to GEE; records keep integer fields as ints."""
+    import core.farm_profile as farm_profile
+
+    calls = []
+
+    def fake_extract_batch(geometries, year=None, batch_size=None):
+        calls.append(len(geometries))
+        time.sleep(0.2)
+        return [{"rainfall": 1500, "soil_texture_id": 4, "area_ha": 1.2, "latitude": -8.55, "longitude": 125.57} for _ in geometries]
+
+    monkeypatch.setattr(farm_profile, "extract_batch", fake_extract_batch)
+    farms = [{"farm_id": farm_id, "geometry": (-8.55, 125.57)} for farm_id in range(1, 6)]
+
+    profiles = batch_create_profiles(farms, year=2024, batch_size=2, records=True, deadline=time.monotonic() + 0.1)
+
+    assert calls == [2]
+    assert [profile["id"] for profile in profiles] == [1, 2, 3, 4, 5]
+    assert [profile["status"] for profile in profiles] == ["success", "success", "failed", "failed", "failed"]
+    assert profiles[2]["error"] == "GEE extraction deadline exceeded"
+    assert type(profiles[0]["soil_texture_id"]) is int
+
+
 def test_build_farm_profile_polygon(gee_initialized, test_polygon):
     """Test building a complete farm profile for a polygon."""
     profile = build_farm_profile(geometry=test_polygon, year=2024, farm_id=2)
@@ -675,6 +781,79 @@ def test_bulk_update_profiles(gee_initialized):
     print(comparison)
 
 
+def test_batch_create_profiles_matches_single(gee_initialized, test_point, test_polygon):
+    """Batched extraction returns the same values as the per-farm getters."""
+    farms = [
+        {"farm_id": 1, "geometry": test_point, "farmer_name": "Alice"},
+        {"farm_id": 2, "geometry": test_polygon},
+        {"farm_id": 3, "geometry": "not a geometry"},
+    ]
+
+    profiles_df = batch_create_profiles(farms, year=2024, batch_size=2)
+
+    assert list(profiles_df["id"]) == [1, 2, 3]
+    assert list(profiles_df["status"]) == ["success", "success", "failed"]
+    assert profiles_df.iloc[0]["farmer_name"] == "Alice"
+
+    for index, farm in enumerate(farms[:2]):
+        single = build_farm_profile(farm["geometry"], year=2024, farm_id=farm["farm_id"])
+        for field in ["rainfall_mm", "temperature_celsius", "elevation_m", "slope_degrees", "soil_ph", "soil_texture_id", "area_ha", "latitude", "longitude"]:
+            assert profiles_df.iloc[index][field] == pytest.approx(single[field], abs=0.01), field
+
+
+def test_extract_profile_values_matches_getters(gee_initialized, test_polygon):
+    """The combined single round trip returns the same values as the per-dataset getters."""
+    values = extract_profile_values(test_polygon, year=2024)
+
+    assert values["rainfall"] == get_rainfall(test_polygon, year=2024)
+    assert values["temperature"] == get_temperature(test_polygon, year=2024)
+    assert values["elevation"] == get_elevation(test_polygon)
+    assert values["soil_ph"] == get_ph(test_polygon)
+    assert values["slope"] == pytest.approx(get_slope(test_polygon), abs=0.001)
+    assert values["area_ha"] == get_area_ha(test_polygon)
+    assert (values["latitude"], values["longitude"]) == get_centroid_lat_lon(test_polygon)
+
+
+def test_extract_profile_values_excludes_local_datasets(gee_initialized, test_point):
+    """Datasets resolved locally are not requested from GEE."""
+    values = extract_profile_values(test_point, year=2024, exclude=["soil_ph", "soil_texture"])
+
+    assert "soil_ph" not in values
+    assert "soil_texture_id" not in values
+    assert values["rainfall"] is not None
+
+
+def test_extract_batch_empty():
+    """No geometries means no GEE requests."""
+    assert extract_batch([]) == []
+
+
+def test_finalize_profile_values():
+    """Batched raw values get the same conversions as the per-farm getters."""
+    raw = {
+        "rainfall": 1834.6,
+        "temperature": 15000.0,
+        "elevation": 412.4,
+        "soil_ph": 62.0,
+        "soil_texture": 7.6,
+        "slope": 4.12345,
+        "area_m2": 25000.0,
+        "centroid": [125.57, -8.55],
+    }
+
+    values = _finalize_profile_values(raw)
+
+    assert values["rainfall"] == 1835
+    assert values["temperature"] == round(15000.0 * 0.02 - 273.15 - 4.43, 1)
+    assert values["elevation"] == 412
+    assert values["soil_ph"] == 6.2
+    assert values["soil_texture_id"] == 8
+    assert values["slope"] == 4.123
+    assert values["area_ha"] == 2.5
+    assert (values["latitude"], values["longitude"]) == (-8.55, 125.57)
+    assert _finalize_profile_values({"error": "bad geometry"}) == {"error": "bad geometry"}
+
+
 def test_bulk_operations_error_handling(gee_initialized):
     """Test error handling in bulk operations."""
     # Mix of valid and invalid geometries
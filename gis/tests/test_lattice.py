@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+from scipy.spatial import cKDTree
+from shapely.geometry import Polygon
+
+from sapling_estimation.estimate import sapling_estimation
+from sapling_estimation.estimation_cache import EstimationCache
+from sapling_estimation.lattice import LATTICE_TYPES, count_in_polygon, lattice_points, rotate_lattice
+from sapling_estimation.planting_points import generate_planting_points
+from sapling_estimation.rotation import rotate_grid
+
+
+@pytest.fixture
+def create_farm_polygon():
+    # Irregular quadrilateral so the rotation search has a clear optimum
+    return Polygon([(0, 0), (10, 120), (130, 90), (100, -20)])
+
+
+def neighbour_stats(xs, ys, bounds=(20, 20, 180, 180)):
+    # Nearest neighbour distance and how many neighbours sit at it, for interior points
+    distances, _ = cKDTree(np.column_stack([xs, ys])).query(np.column_stack([xs, ys]), k=7)
+    interior = (xs > bounds[0]) & (ys > bounds[1]) & (xs < bounds[2]) & (ys < bounds[3])
+    nearest = distances[interior, 1].min()
+    return nearest, int(np.median((np.abs(distances[interior, 1:] - nearest) < 1e-6).sum(axis=1)))
+
+
+@pytest.mark.parametrize(
+    "lattice, expected_neighbours",
+    [("rectangular", 4), ("staggered", 2), ("triangular", 6), ("hexagonal", 6)],
+)
+def test_lattices_keep_minimum_spacing(lattice, expected_neighbours):
+    xs, ys = lattice_points((0, 0, 200, 200), 3, 3, lattice)
+
+    nearest, neighbours = neighbour_stats(xs, ys)
+
+    assert nearest == pytest.approx(3)
+    assert neighbours == expected_neighbours
+
+
+def test_triangular_packs_more_trees_than_square():
+    square = len(lattice_points((0, 0, 300, 300), 3, 3, "rectangular")[0])
+    triangular = len(lattice_points((0, 0, 300, 300), 3, 3, "triangular")[0])
+
+    assert triangular / square == pytest.approx(2 / np.sqrt(3), rel=0.02)
+
+
+@pytest.mark.parametrize("lattice", LATTICE_TYPES)
+def test_lattices_plant_at_least_rectangular_density(lattice):
+    # Trees per hectare at 3 m spacing over a 300 m x 300 m (9 ha) block
+    rectangular = len(lattice_points((0, 0, 300, 300), 3, 3, "rectangular")[0]) / 9
+    per_hectare = len(lattice_points((0, 0, 300, 300), 3, 3, lattice)[0]) / 9
+
+    assert per_hectare >= rectangular
+
+
+def test_hexagonal_is_the_equilateral_layout():
+    hexagonal = lattice_points((0, 0, 50, 50), 3, 3, "hexagonal")
+    triangular = lattice_points((0, 0, 50, 50), 3, 3, "triangular")
+
+    np.testing.assert_array_equal(hexagonal, triangular)
+
+
+def test_unknown_lattice_raises():
+    with pytest.raises(ValueError, match="Unknown lattice"):
+        lattice_points((0, 0, 10, 10), 1, 1, "circular")
+
+
+def test_rotate_lattice_matches_rotate_grid(create_farm_polygon):
+    planting_grid = generate_planting_points(create_farm_polygon, "EPSG:3857", create_farm_polygon.bounds, 7, 5)
+    expected_grid, expected_angle, expected_results = rotate_grid(create_farm_polygon, planting_grid, 7, 5)
+
+    xs, ys = lattice_points(create_farm_polygon.bounds, 7, 5, "rectangular")
+    rot_x, rot_y, angle, results = rotate_lattice(create_farm_polygon, xs, ys)
+
+    assert angle == expected_angle
+    assert len(rot_x) == len(expected_grid)
+    assert results == [(a, int(c)) for a, c in expected_results]
+
+
+def test_count_in_polygon(create_farm_polygon):
+    xs, ys = np.array([50.0, 500.0]), np.array([50.0, 500.0])
+
+    assert count_in_polygon(create_farm_polygon, xs, ys) == 1
+
+
+@pytest.mark.parametrize("lattice", LATTICE_TYPES)
+def test_sapling_estimation_with_lattice(create_farm_polygon, lattice):
+    result = sapling_estimation(
+        farm_polygon=create_farm_polygon,
+        spacing_x=5,
+        spacing_y=5,
+        max_slope=15,
+        farm_boundary_crs="EPSG:3857",
+        slope_array=np.zeros((20, 20)),
+        dem_upper_left_x=-50,
+        dem_upper_left_y=150,
+        pixel_width=10,
+        pixel_height=10,
+        dem_crs="EPSG:3857",
+        lattice=lattice,
+    )
+
+    assert result["aligned_count"] == result["pre_slope_count"] > 0
+    assert len(result["slope_values"]) == len(result["final_grid"])
+
+
+def test_lattices_are_cached_separately(create_farm_polygon):
+    cache = EstimationCache()
+    common = dict(
+        farm_polygon=create_farm_polygon,
+        spacing_x=5,
+        spacing_y=5,
+        max_slope=15,
+        farm_boundary_crs="EPSG:3857",
+        slope_array=np.zeros((20, 20)),
+        dem_upper_left_x=-50,
+        dem_upper_left_y=150,
+        pixel_width=10,
+        pixel_height=10,
+        dem_crs="EPSG:3857",
+        cache=cache,
+    )
+
+    rectangular = sapling_estimation(**common)
+    triangular = sapling_estimation(lattice="triangular", **common)
+
+    assert triangular["aligned_count"] > rectangular["aligned_count"]
+    assert cache.cache_info()["layout_misses"] == 2
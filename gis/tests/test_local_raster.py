@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+import core.extract_data as extract_data
+import core.local_raster as local_raster
+from config.settings import DATASETS
+from core.extract_data import get_rainfall, get_slope, get_temperature
+from core.farm_profile import build_farm_profile
+from core.local_raster import local_area_m2, local_centroid, zonal_stat
+
+# 0.001 degree pixels (~110 m) from 125.0E, 8.0S
+ORIGIN_X, ORIGIN_Y, PIXEL = 125.0, -8.0, 0.001
+
+# Farm polygon as (lat, lon) rings, covering pixel columns 10-19 and rows 20-29
+FARM = [[(-8.020, 125.010), (-8.020, 125.020), (-8.030, 125.020), (-8.030, 125.010), (-8.020, 125.010)]]
+
+
+def write_raster(path, values, crs="EPSG:4326", transform=None, nodata=None):
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        height=values.shape[0],
+        width=values.shape[1],
+        count=1,
+        dtype="float32",
+        crs=crs,
+        transform=transform or from_origin(ORIGIN_X, ORIGIN_Y, PIXEL, PIXEL),
+        nodata=nodata,
+    ) as dst:
+        dst.write(values.astype(np.float32), 1)
+    return path
+
+
+@pytest.fixture
+def gradient_raster(tmp_path):
+    # Value = column index, so the mean over a set of columns is easy to check
+    return write_raster(tmp_path / "gradient.tif", np.tile(np.arange(50, dtype=float), (50, 1)))
+
+
+@pytest.fixture
+def local_datasets(tmp_path, monkeypatch):
+    """Every profile dataset and the geometry read from synthetic local clips."""
+    flat = np.ones((50, 50))
+    write_raster(tmp_path / "chirps_precipitation_2024.tif", flat * 1834.6)
+    write_raster(tmp_path / "modis_lst_day_2024.tif", flat * 15000.0)
+    write_raster(tmp_path / "srtm_elevation.tif", flat * 412.4)
+    write_raster(tmp_path / "openlandmap_soil_ph.tif", flat * 62.0)
+    write_raster(tmp_path / "openlandmap_soil_texture.tif", flat * 4.0)
+
+    monkeypatch.setattr(local_raster, "LOCAL_RASTER_DIR", str(tmp_path))
+    monkeypatch.setattr(extract_data, "GEOMETRY_SOURCE", "local")
+    for name in ["rainfall", "temperature", "elevation", "soil_ph", "soil_texture", "dem"]:
+        monkeypatch.setitem(DATASETS[name], "source", "local")
+
+    return tmp_path
+
+
+def test_zonal_stat_reduces_pixels_inside_polygon(gradient_raster):
+    geometry = local_raster.parse_geometry_shapely(FARM)
+
+    assert zonal_stat(geometry, gradient_raster, "mean") == pytest.approx(14.5)
+    assert zonal_stat(geometry, gradient_raster, "sum") == pytest.approx(14.5 * 100)
+    assert zonal_stat(geometry, gradient_raster, "max") == 19
+
+
+def test_zonal_stat_small_polygon_falls_back_to_centroid(gradient_raster):
+    # Smaller than a pixel and away from any pixel centre
+    tiny = local_raster.parse_geometry_shapely([[(-8.0101, 125.0301), (-8.0101, 125.0303), (-8.0103, 125.0303), (-8.0103, 125.0301), (-8.0101, 125.0301)]])
+
+    assert zonal_stat(tiny, gradient_raster) == 30
+
+
+def test_zonal_stat_point_and_outside(gradient_raster):
+    assert zonal_stat(local_raster.parse_geometry_shapely((-8.0105, 125.0055)), gradient_raster) == 5
+    assert zonal_stat(local_raster.parse_geometry_shapely((-9.5, 127.0)), gradient_raster) is None
+
+
+def test_zonal_stat_ignores_nodata(tmp_path):
+    values = np.full((50, 50), 10.0)
+    values[20:25, :] = -9999
+    path = write_raster(tmp_path / "nodata.tif", values, nodata=-9999)
+
+    assert zonal_stat(local_raster.parse_geometry_shapely(FARM), path, "sum") == pytest.approx(50 * 10.0)
+
+
+def test_zonal_slope_of_inclined_plane(tmp_path):
+    # 30 m pixels in UTM 51S rising 10 degrees to the east
+    x = np.arange(100) * 30.0
+    dem = np.tile(x * np.tan(np.radians(10)), (100, 1))
+    path = write_raster(tmp_path / "dem.tif", dem, crs="EPSG:32751", transform=from_origin(700000, 9115000, 30, 30))
+
+    farm = local_raster.parse_geometry_shapely([[(-8.01, 124.84), (-8.01, 124.85), (-8.02, 124.85), (-8.02, 124.84), (-8.01, 124.84)]])
+
+    assert zonal_stat(farm, path, slope=True) == pytest.approx(10, abs=0.01)
+
+
+def test_local_area_and_centroid():
+    # 0.01 x 0.01 degrees at 8S is about 1.102 km x 1.106 km
+    assert local_area_m2(FARM) == pytest.approx(1.219e6, rel=0.01)
+    assert local_centroid(FARM) == pytest.approx((125.015, -8.025))
+
+
+def test_getters_use_local_source(local_datasets):
+    assert get_rainfall(FARM, year=2024) == 1835
+    assert get_temperature(FARM, year=2024) == round(15000.0 * 0.02 - 273.15 - 4.43, 1)
+    assert get_slope(FARM) == 0
+
+
+def test_local_source_missing_year_clip(local_datasets):
+    with pytest.raises(rasterio.errors.RasterioIOError):
+        get_rainfall(FARM, year=2019)
+
+
+def test_build_farm_profile_offline(local_datasets):
+    """With every dataset and the geometry local, profiling needs no Earth Engine."""
+    profile = build_farm_profile(FARM, year=2024, farm_id=7, riparian=False)
+
+    assert profile["status"] == "success"
+    assert profile["rainfall_mm"] == 1835
+    assert profile["temperature_celsius"] == round(15000.0 * 0.02 - 273.15 - 4.43, 1)
+    assert profile["elevation_m"] == 412
+    assert profile["soil_ph"] == 6.2
+    assert profile["soil_texture_id"] == 4
+    assert profile["slope_degrees"] == 0
+    assert profile["area_ha"] == pytest.approx(121.9, rel=0.01)
+    assert (profile["latitude"], profile["longitude"]) == (-8.025, 125.015)
+    assert profile["coastal"] is False
+
+
+def test_unknown_source_raises(local_datasets, monkeypatch):
+    monkeypatch.setitem(DATASETS["rainfall"], "source", "s3")
+
+    with pytest.raises(ValueError, match="Unknown source"):
+        get_rainfall(FARM, year=2024)
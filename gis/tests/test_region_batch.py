@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from shapely.geometry import box
+
+from sapling_estimation import region_batch
+from sapling_estimation.dem_source import LocalDemTileStore
+from sapling_estimation.region_batch import partition_farms, run_region_estimation, summarize_region_run
+
+
+@pytest.fixture
+def create_region_dem(tmp_path):
+    dem_path = tmp_path / "DEM.tif"
+
+    # Flat 64x64 DEM of ~11m pixels at 125E 9S, internally tiled in 16x16 blocks
+    dem_values = np.full((64, 64), 100, dtype=np.float32)
+
+    with rasterio.open(
+        dem_path,
+        "w",
+        driver="GTiff",
+        height=64,
+        width=64,
+        count=1,
+        dtype="float32",
+        crs="EPSG:4326",
+        transform=from_origin(125.0, -9.0, 0.0001, 0.0001),
+        tiled=True,
+        blockxsize=16,
+        blockysize=16,
+    ) as dst:
+        dst.write(dem_values, 1)
+
+    return dem_path
+
+
+def farm(farm_id, col, row, size=0.0008):
+    # Farm with its upper-left corner at DEM pixel (row, col)
+    left, top = 125.0 + col * 0.0001, -9.0 - row * 0.0001
+    return farm_id, box(left, top - size, left + size, top).wkb
+
+
+def test_partition_groups_farms_by_tile(create_region_dem):
+    store = LocalDemTileStore(create_region_dem)
+    farms = [farm(1, 2, 2), farm(2, 40, 40), farm(3, 4, 4), farm(4, 42, 42)]
+
+    chunks = partition_farms(farms, store, chunk_size=8)
+
+    assert sorted(sorted(farm_id for farm_id, _ in chunk) for chunk in chunks) == [[1, 3], [2, 4]]
+
+
+def test_partition_respects_chunk_size(create_region_dem):
+    store = LocalDemTileStore(create_region_dem)
+    farms = [farm(farm_id, 1, 1) for farm_id in range(5)]
+
+    chunks = partition_farms(farms, store, chunk_size=2)
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+
+def test_run_region_estimation(create_region_dem):
+    farms = [farm(1, 2, 2), farm(2, 40, 40), (3, box(0, 0, 0.001, 0.001).wkb)]
+
+    results = [result for chunk in run_region_estimation(farms, create_region_dem, 10, 10, 15, workers=2) for result in chunk]
+    by_farm = {result["farm_id"]: result for result in results}
+
+    assert by_farm[1]["status"] == "success"
+    assert by_farm[1]["aligned_count"] == len(by_farm[1]["xs"]) == len(by_farm[1]["slopes"]) > 0
+    assert by_farm[3]["status"] == "failed"  # Outside the DEM
+
+    summary = summarize_region_run(results, elapsed_seconds=2.0)
+    assert summary["farm_count"] == 3
+    assert summary["succeeded"] == 2
+    assert summary["farms_per_second"] == 1.5
+    assert summary["farm_seconds_max"] >= summary["farm_seconds_p50"]
+
+
+def test_closing_run_region_estimation_cancels_queued_chunks(create_region_dem, monkeypatch):
+    shutdowns = []
+
+    class RecordingExecutor(region_batch.ProcessPoolExecutor):
+        def shutdown(self, wait=True, *, cancel_futures=False):
+            shutdowns.append(cancel_futures)
+            super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    monkeypatch.setattr(region_batch, "ProcessPoolExecutor", RecordingExecutor)
+    farms = [farm(1, 2, 2), farm(2, 40, 40), farm(3, 70, 70)]
+
+    chunks = run_region_estimation(farms, create_region_dem, 10, 10, 15, workers=1, chunk_size=1)
+    next(chunks)
+    chunks.close()
+
+    assert shutdowns == [True]
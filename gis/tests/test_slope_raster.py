@@ -5,7 +5,8 @@ import rasterio
 from rasterio.transform import from_origin
 from shapely.geometry import box
 
-from sapling_estimation.slope_raster import compute_farm_slope
+from sapling_estimation.dem_source import LocalDemTileStore
+from sapling_estimation.slope_raster import build_slope_raster, compute_farm_slope, compute_slope_from_array, iter_slope_blocks, slope_tester
 
 
 @pytest.fixture
@@ -64,3 +65,60 @@ def test_compute_farm_slope(create_dem, create_farm_polygon):
     assert slope.shape == (5, 5)  # Ensure slope array has the expected 5x5 shape
     assert np.all(slope >= 0)  # Ensure slope values are not negative
     assert np.all(slope <= 90)  # Ensure slope values are not greater than 90 degrees
+
+
+def test_build_slope_raster_matches_full_gradient(tmp_path, create_dem):
+    slope_path = tmp_path / "slope.tif"
+
+    # A 2 pixel block size forces every block edge to rely on the halo
+    build_slope_raster(create_dem, slope_path, block_size=2)
+
+    with rasterio.open(create_dem) as dem_src:
+        expected = compute_slope_from_array(dem_src.read(1).astype(float), pixel_width=1, pixel_height=1)
+        dem_transform = dem_src.transform
+
+    with rasterio.open(slope_path) as slope_src:
+        assert slope_src.transform == dem_transform
+        np.testing.assert_allclose(slope_src.read(1), expected, rtol=1e-6)
+
+
+def test_slope_blocks_carry_the_elevation_they_were_computed_from(create_dem):
+    with rasterio.open(create_dem) as dem_src:
+        dem = dem_src.read(1).astype(float)
+        elevation = np.full_like(dem, np.nan)
+        for row_off, col_off, block, slope in iter_slope_blocks(dem_src, block_size=2):
+            assert block.shape == slope.shape
+            elevation[row_off : row_off + block.shape[0], col_off : col_off + block.shape[1]] = block
+
+    np.testing.assert_array_equal(elevation, dem)
+
+
+def test_slope_window_reads_through_tile_store(tmp_path, create_dem):
+    slope_path = build_slope_raster(create_dem, tmp_path / "slope.tif")
+
+    store = LocalDemTileStore(slope_path, array_key="slope_array")
+    window = store.read_window(box(1, 1, 4, 4), farm_crs="EPSG:4326")
+
+    assert "slope_array" in window
+    assert slope_tester(window["slope_array"])
+
+
+def test_slope_tester_accepts_valid_range():
+    assert slope_tester(np.array([[0.0, 45.0], [89.9, 90.0]]))
+
+
+@pytest.mark.parametrize(
+    "value, message",
+    [
+        (np.nan, "NaN"),
+        (np.inf, "infinite"),
+        (-1.0, "negative"),
+        (91.0, "greater than 90"),
+    ],
+)
+def test_slope_tester_reports_failed_rule(value, message):
+    slope = np.full((3, 3), 10.0)
+    slope[1, 1] = value
+
+    with pytest.raises(ValueError, match=message):
+        slope_tester(slope)
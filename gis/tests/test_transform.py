@@ -0,0 +1,87 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+from rasterio.crs import CRS
+from shapely.geometry import Polygon, box
+
+from sapling_estimation.estimate import sapling_estimation
+from sapling_estimation.transform import get_transformer, resolve_working_crs, transform_geometry, transform_xy, utm_crs_for
+
+
+def test_transformers_are_cached():
+    assert get_transformer("EPSG:4326", "EPSG:3857") is get_transformer("EPSG:4326", "EPSG:3857")
+    # rasterio CRS objects share the entry of their EPSG string
+    assert get_transformer(CRS.from_epsg(4326), "EPSG:3857") is get_transformer("EPSG:4326", "EPSG:3857")
+
+
+def test_transform_xy_round_trip():
+    lon = np.array([125.0, 125.5])
+    lat = np.array([-9.0, -8.5])
+
+    x, y = transform_xy(lon, lat, "EPSG:4326", "EPSG:32751")
+    back_lon, back_lat = transform_xy(x, y, "EPSG:32751", "EPSG:4326")
+
+    np.testing.assert_allclose(back_lon, lon)
+    np.testing.assert_allclose(back_lat, lat)
+
+
+def test_same_crs_is_a_no_op():
+    xs, ys = transform_xy([1.0, 2.0], [3.0, 4.0], "EPSG:3857", CRS.from_epsg(3857))
+
+    np.testing.assert_array_equal(xs, [1.0, 2.0])
+    np.testing.assert_array_equal(ys, [3.0, 4.0])
+
+
+def test_transform_geometry_matches_geopandas():
+    farm = box(125.0, -9.002, 125.002, -9.0)
+
+    projected = transform_geometry(farm, "EPSG:4326", "EPSG:3857")
+    expected = gpd.GeoSeries([farm], crs="EPSG:4326").to_crs("EPSG:3857").iloc[0]
+
+    assert projected.equals_exact(expected, tolerance=1e-6)
+
+
+@pytest.mark.parametrize(
+    "lon, lat, expected",
+    [
+        (125.5, -8.8, "EPSG:32751"),
+        (126.5, -8.8, "EPSG:32752"),
+        (151.2, -33.9, "EPSG:32756"),
+        (-0.1, 51.5, "EPSG:32630"),
+    ],
+)
+def test_utm_crs_for(lon, lat, expected):
+    assert utm_crs_for(lon, lat) == expected
+
+
+def test_resolve_working_crs_utm():
+    farm = box(125.0, -9.002, 125.002, -9.0)
+
+    assert resolve_working_crs("utm", farm, "EPSG:4326") == "EPSG:32751"
+    assert resolve_working_crs("EPSG:3857", farm, "EPSG:4326") == "EPSG:3857"
+
+
+def test_estimation_in_utm_uses_true_spacing():
+    # 100m x 100m farm in UTM zone 51S; a 10m grid holds at most 100 points in true metres
+    farm = Polygon([(700000, 9000000), (700000, 9000100), (700100, 9000100), (700100, 9000000)])
+    common = dict(
+        farm_polygon=farm,
+        spacing_x=10,
+        spacing_y=10,
+        max_slope=15,
+        farm_boundary_crs="EPSG:32751",
+        slope_array=np.zeros((10, 10)),
+        dem_upper_left_x=700000,
+        dem_upper_left_y=9000100,
+        pixel_width=10,
+        pixel_height=10,
+        dem_crs="EPSG:32751",
+    )
+
+    in_utm = sapling_estimation(working_crs="EPSG:32751", **common)
+    in_mercator = sapling_estimation(**common)
+
+    assert 0 < in_utm["aligned_count"] <= 100
+    # Web Mercator stretches distances by 1/cos(latitude), packing more "10m" cells into the farm
+    assert in_mercator["aligned_count"] > in_utm["aligned_count"]
+    assert sapling_estimation(working_crs="utm", **common)["aligned_count"] == in_utm["aligned_count"]